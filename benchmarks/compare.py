@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Any, Dict, List, Tuple
+
+#Poredi dva rezultata benchmark-a (python -m benchmarks.run) i vraća izlazni kod 1 ako je nešto regresiralo
+#
+#   python -m benchmarks.compare baseline.json current.json --threshold 0.15
+#
+#Promena je regresija ako je metrika gora od baseline-a za više od threshold (relativno),
+#u smeru koji metrika nosi ("better": "lower" za latenciju, "higher" za propusnost)
+#Metrika iz baseline-a koje nema u novom rezultatu (nestala faza, suite bez rezultata) je takođe greška,
+#osim uz --allow-missing (namerno uklonjena metrika)
+
+
+def relative_change(old: float, new: float, better: str) -> float:
+    #> 0 znači poboljšanje, < 0 pogoršanje, bez obzira na smer metrike
+
+    if old == 0:
+        return 0.0
+    delta = (new - old) / abs(old)
+    return delta if better == "higher" else -delta
+
+
+def compare(baseline: Dict[str, Any],
+            current: Dict[str, Any],
+            *,
+            threshold: float = 0.15,
+            allow_missing: bool = False) -> Tuple[List[Dict[str, Any]], List[str]]:
+    #(redovi poređenja, imena regresiralih metrika); nove metrike (samo u current) se preskaču,
+    #a metrike kojih nema u current dobijaju red sa "missing" i računaju se kao regresija (osim uz allow_missing)
+
+    rows: List[Dict[str, Any]] = []
+    regressions: List[str] = []
+    base_metrics = baseline.get("metrics", {})
+    cur_metrics = current.get("metrics", {})
+
+    for name in sorted(set(base_metrics) - set(cur_metrics)):
+        rows.append({
+            "name": name,
+            "baseline": base_metrics[name]["value"],
+            "current": None,
+            "unit": base_metrics[name].get("unit", ""),
+            "change": None,
+            "regressed": not allow_missing,
+            "missing": True,
+        })
+        if not allow_missing:
+            regressions.append(name)
+
+    for name, cur in sorted(cur_metrics.items()):
+        base = base_metrics.get(name)
+        if base is None:
+            continue
+        change = relative_change(base["value"], cur["value"], cur.get("better", "lower"))
+        regressed = change < -threshold
+        rows.append({
+            "name": name,
+            "baseline": base["value"],
+            "current": cur["value"],
+            "unit": cur.get("unit", ""),
+            "change": change,
+            "regressed": regressed,
+        })
+        if regressed:
+            regressions.append(name)
+    return rows, regressions
+
+
+def format_rows(rows: List[Dict[str, Any]]) -> str:
+
+    width = max((len(r["name"]) for r in rows), default=10)
+    lines = [f"{'metric':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}"]
+    for r in rows:
+        if r.get("missing"):
+            flag = "  MISSING" if r["regressed"] else "  missing (dozvoljeno)"
+            lines.append(f"{r['name']:<{width}}  {r['baseline']:>12.3f}  {'-':>12}  {'-':>8}{flag}")
+            continue
+        flag = "  REGRESSION" if r["regressed"] else ""
+        lines.append(
+            f"{r['name']:<{width}}  {r['baseline']:>12.3f}  {r['current']:>12.3f}  "
+            f"{r['change'] * 100:>+7.1f}%{flag}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Regresiona provera benchmark rezultata")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Dozvoljeno relativno pogoršanje (0.15 = 15%%)")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="Metrike iz baseline-a kojih nema u novom rezultatu samo prijavi, bez greške")
+    args = parser.parse_args()
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+
+    if baseline.get("env", {}).get("machine") != current.get("env", {}).get("machine"):
+        print(">>> [COMPARE] upozorenje: rezultati su sa različitih mašina")
+
+    rows, regressions = compare(baseline, current, threshold=args.threshold, allow_missing=args.allow_missing)
+    print(format_rows(rows))
+    missing = [r["name"] for r in rows if r.get("missing")]
+    if missing:
+        print(f"\n>>> [COMPARE] {len(missing)} metrika iz baseline-a nema u novom rezultatu: {', '.join(missing)}")
+    if regressions:
+        print(f"\n>>> [COMPARE] {len(regressions)} regresija (prag {args.threshold:.0%})")
+        raise SystemExit(1)
+    print(f"\n>>> [COMPARE] bez regresija (prag {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+#Sintetički korpus za benchmark-e - deterministički (seed), bez mreže i bez pravih PDF-ova
+#Svaki dokument pripada jednoj temi; upiti nose temu kojoj pripadaju, pa se može meriti i kvalitet pretrage
+
+TOPICS: Dict[str, List[str]] = {
+    "recursion": [
+        "recursion", "rekurzija", "base case", "bazni slučaj", "call stack", "stack overflow",
+        "tail call", "memoization", "factorial", "fibonacci", "divide and conquer",
+    ],
+    "sorting": [
+        "quicksort", "mergesort", "heapsort", "pivot", "sortiranje", "stable sort",
+        "comparison", "in-place", "O(n log n)", "insertion sort", "partition",
+    ],
+    "graphs": [
+        "graph", "graf", "vertex", "edge", "Dijkstra", "BFS", "DFS", "shortest path",
+        "najkraći put", "adjacency list", "spanning tree", "topological order",
+    ],
+    "databases": [
+        "database", "baza podataka", "normalization", "normalna forma", "primary key",
+        "foreign key", "SQL", "index", "transaction", "ACID", "join", "query planner",
+    ],
+    "networking": [
+        "TCP", "UDP", "packet", "paket", "IP address", "routing", "handshake",
+        "congestion control", "latency", "bandwidth", "DNS", "socket",
+    ],
+    "machine_learning": [
+        "gradient descent", "gradijentni spust", "loss function", "overfitting", "regularization",
+        "neural network", "neuronska mreža", "backpropagation", "learning rate", "epoch", "dataset",
+    ],
+    "operating_systems": [
+        "process", "proces", "thread", "nit", "scheduler", "deadlock", "mutex", "semaphore",
+        "virtual memory", "page fault", "context switch", "kernel",
+    ],
+    "hashing": [
+        "hash table", "heš tabela", "hash function", "collision", "kolizija", "open addressing",
+        "chaining", "load factor", "rehashing", "bucket", "SHA-256",
+    ],
+}
+
+FILLER = [
+    "the", "a", "is", "of", "and", "in", "to", "that", "this", "algorithm", "example", "we",
+    "je", "i", "u", "se", "na", "da", "koji", "primer", "algoritam", "kada", "zato", "then",
+    "uses", "important", "because", "students", "course", "lecture", "predavanje", "zadatak",
+]
+
+TEMPLATES = [
+    "{a} is closely related to {b}, and {c} appears in almost every {f} about it.",
+    "U ovom poglavlju objašnjavamo {a} kroz {b} i pokazujemo kako {c} utiče na rešenje.",
+    "A typical exam question asks how {a} differs from {b} when {c} is involved.",
+    "Primer: kada je {a} pogrešno implementiran, {b} i {c} postaju problem.",
+    "{a}, {b} and {c} are the three ideas to remember from this {f}.",
+]
+
+
+@dataclass
+class SyntheticDoc:
+    doc_id: str
+    topic: str
+    pages: List[str]
+
+    @property
+    def text(self) -> str:
+        return "\n\n".join(self.pages)
+
+
+@dataclass
+class SyntheticQuery:
+    text: str
+    topic: str
+
+
+def _sentence(rng: random.Random, terms: List[str]) -> str:
+
+    a, b, c = rng.sample(terms, 3)
+    sentence = rng.choice(TEMPLATES).format(a=a, b=b, c=c, f=rng.choice(FILLER))
+    filler = " ".join(rng.choice(FILLER) for _ in range(rng.randint(4, 12)))
+    return f"{sentence} {filler.capitalize()}."
+
+
+def make_page(rng: random.Random, topic: str, *, words: int = 300) -> str:
+
+    terms = TOPICS[topic]
+    parts: List[str] = []
+    n = 0
+    while n < words:
+        paragraph = " ".join(_sentence(rng, terms) for _ in range(rng.randint(3, 6)))
+        parts.append(paragraph)
+        n += len(paragraph.split())
+    return "\n\n".join(parts)
+
+
+def make_corpus(n_docs: int,
+                *,
+                pages_per_doc: int = 4,
+                words_per_page: int = 300,
+                seed: int = 13) -> List[SyntheticDoc]:
+
+    rng = random.Random(seed)
+    topics = sorted(TOPICS)
+    docs: List[SyntheticDoc] = []
+    for i in range(n_docs):
+        topic = topics[i % len(topics)]
+        pages = [make_page(rng, topic, words=words_per_page) for _ in range(pages_per_doc)]
+        docs.append(SyntheticDoc(doc_id=f"{topic}_{i:05d}.pdf", topic=topic, pages=pages))
+    return docs
+
+
+def make_chunks(n_chunks: int, *, words: int = 120, seed: int = 13) -> List[Tuple[str, str]]:
+    #(tema, tekst) parovi veličine jednog chunka - za direktno punjenje FaissStore-a bez chunkovanja
+
+    rng = random.Random(seed)
+    topics = sorted(TOPICS)
+    return [(topics[i % len(topics)], make_page(rng, topics[i % len(topics)], words=words))
+            for i in range(n_chunks)]
+
+
+def make_queries(n: int, *, seed: int = 7) -> List[SyntheticQuery]:
+
+    rng = random.Random(seed)
+    topics = sorted(TOPICS)
+    patterns = [
+        "Šta je {a}?",
+        "Objasni {a} i {b}.",
+        "What is the difference between {a} and {b}?",
+        "{a} {b}",
+        "Kako {a} utiče na {b}?",
+    ]
+    queries: List[SyntheticQuery] = []
+    for i in range(n):
+        topic = topics[i % len(topics)]
+        a, b = rng.sample(TOPICS[topic], 2)
+        queries.append(SyntheticQuery(text=rng.choice(patterns).format(a=a, b=b), topic=topic))
+    return queries
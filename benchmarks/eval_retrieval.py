@@ -0,0 +1,448 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import math
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+from pipeline.chunking import chunk_documents
+from pipeline.embeddings.base import EmbeddingModel
+from pipeline.retriever.faiss import FaissStore, IndexedDocument
+
+from benchmarks.corpus import make_corpus, make_queries
+
+#Kvalitet pretrage naspram brzine za različite FaissStore konfiguracije
+#
+#Ulaz: korpus (JSONL {"doc_id", "text"}) i označena pitanja (JSONL {"question", "relevant": [doc_id, ...]});
+#bez njih se koristi sintetički korpus gde su relevantni svi dokumenti iste teme
+#Relevantnost je na nivou dokumenta, pa važi i kad se menja veličina chunka: rangirani chunkovi
+#se svode na rangirane jedinstvene doc_id-jeve, pa se računa recall@k, MRR i nDCG@k
+#ANN recall@k = preklapanje top-k chunkova sa tačnim (flat) indeksom iste veličine chunka i istog moda
+#Pitanja se enkodiraju jednom po sweep-u; p50/p99/QPS mere samo pretragu indeksa (+ BM25 i fuziju u hybrid
+#modu), a latencija embeddinga upita je posebna kolona (embed_p50_ms) - ista za sve konfiguracije
+#
+#   python -m benchmarks.eval_retrieval --corpus data/eval/corpus.jsonl --labels data/eval/labels.jsonl \
+#       --index-types flat,ivf_flat,ivf_pq,hnsw --nprobe 1,4,16 --ef-search 16,64,128 \
+#       --pq-bits 4,8 --chunk-sizes 600,900,1200 --modes dense,hybrid --out data/eval/sweep.json
+
+
+ChunkKey = Tuple[str, int]   # (doc_id, redni broj chunka u dokumentu) - jedinstveno u jednom indeksu
+
+
+@dataclass
+class LabelledQuery:
+    question: str
+    relevant: Set[str]
+
+
+@dataclass(frozen=True)
+class EvalConfig:
+
+    #Parametri gradnje (chunk_size, index_type, nlist, pq_bits, hnsw_m) + parametri pretrage (nprobe, ef_search, mode)
+
+    index_type: str = "flat"
+    chunk_size: Optional[int] = None   # None = CHUNK_CONFIG po tipu dokumenta
+    nlist: Optional[int] = None
+    pq_bits: int = 8
+    hnsw_m: int = 32
+    nprobe: Optional[int] = None
+    ef_search: Optional[int] = None
+    mode: str = "dense"
+
+    @property
+    def build_key(self) -> Tuple[Any, ...]:
+        return (self.chunk_size, self.index_type, self.nlist, self.pq_bits, self.hnsw_m)
+
+    @property
+    def label(self) -> str:
+
+        parts = [self.index_type]
+        if self.index_type.startswith("ivf"):
+            parts.append(f"nprobe={self.nprobe or 'auto'}")
+            if self.nlist:
+                parts.append(f"nlist={self.nlist}")
+        if self.index_type == "ivf_pq":
+            parts.append(f"bits={self.pq_bits}")
+        if self.index_type == "hnsw":
+            parts.append(f"M={self.hnsw_m}")
+            parts.append(f"ef={self.ef_search or 16}")
+        parts.append(f"chunk={self.chunk_size or 'default'}")
+        parts.append(self.mode)
+        return " ".join(parts)
+
+
+# Metrike kvaliteta (binarna relevantnost, nivo dokumenta)
+
+def unique_doc_ranking(results: Iterable[Tuple[IndexedDocument, float]]) -> List[str]:
+
+    seen: Set[str] = set()
+    ranking: List[str] = []
+    for doc, _ in results:
+        if doc.doc_id not in seen:
+            seen.add(doc.doc_id)
+            ranking.append(doc.doc_id)
+    return ranking
+
+
+def recall_at_k(ranking: Sequence[str], relevant: Set[str], k: int) -> float:
+    #Deli se sa min(k, |relevant|), da 1.0 bude dostižno i kad ima više relevantnih nego k
+
+    if not relevant:
+        return 0.0
+    hits = sum(1 for d in ranking[:k] if d in relevant)
+    return hits / min(k, len(relevant))
+
+
+def reciprocal_rank(ranking: Sequence[str], relevant: Set[str]) -> float:
+
+    for rank, d in enumerate(ranking, 1):
+        if d in relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(ranking: Sequence[str], relevant: Set[str], k: int) -> float:
+
+    dcg = sum(1.0 / math.log2(rank + 1) for rank, d in enumerate(ranking[:k], 1) if d in relevant)
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(k, len(relevant)) + 1))
+    return dcg / ideal if ideal else 0.0
+
+
+# Ulazni podaci
+
+def load_jsonl(path: str) -> List[Dict[str, Any]]:
+
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_dataset(corpus_path: str, labels_path: str) -> Tuple[List[Document], List[LabelledQuery]]:
+
+    docs = [
+        Document(page_content=row["text"], metadata={"doc_id": str(row["doc_id"]), "source": row.get("source", "pdf")})
+        for row in load_jsonl(corpus_path)
+    ]
+    queries = [
+        LabelledQuery(question=row["question"], relevant={str(d) for d in row["relevant"]})
+        for row in load_jsonl(labels_path)
+    ]
+    return docs, queries
+
+
+def synthetic_dataset(n_docs: int = 200, n_queries: int = 100, seed: int = 13) -> Tuple[List[Document], List[LabelledQuery]]:
+
+    corpus = make_corpus(n_docs, pages_per_doc=2, seed=seed)
+    docs = [Document(page_content=d.text, metadata={"doc_id": d.doc_id, "source": "pdf"}) for d in corpus]
+    by_topic: Dict[str, Set[str]] = {}
+    for d in corpus:
+        by_topic.setdefault(d.topic, set()).add(d.doc_id)
+    queries = [LabelledQuery(question=q.text, relevant=by_topic[q.topic]) for q in make_queries(n_queries, seed=seed)]
+    return docs, queries
+
+
+# Gradnja indeksa
+
+def build_flat_store(docs: List[Document],
+                     embedding_model: EmbeddingModel,
+                     *,
+                     chunk_size: Optional[int] = None,
+                     overlap_ratio: float = 1 / 6) -> FaissStore:
+
+    overlap = int(chunk_size * overlap_ratio) if chunk_size else None
+    chunks = chunk_documents(docs, override_chunk_size=chunk_size, override_chunk_overlap=overlap)
+    indexed = [
+        IndexedDocument(
+            doc_id=str(ch.metadata.get("doc_id", "unknown_doc")),
+            chunk_id=int(ch.metadata.get("chunk_index_in_doc", 0)),
+            text=ch.page_content,
+            source=str(ch.metadata.get("source_type", "generic")),
+        )
+        for ch in chunks
+    ]
+    store = FaissStore(embedding_model=embedding_model)
+    for i in range(0, len(indexed), 4096):
+        store.add_chunks(indexed[i:i + 4096])
+    return store
+
+
+def build_ann_store(flat: FaissStore, config: EvalConfig) -> FaissStore:
+    #Isti chunkovi, vektori i BM25 kao flat; menja se samo FAISS indeks
+
+    store = FaissStore(
+        embedding_model=flat.embedding_model, index=flat.index, metadata=flat.metadata, bm25=flat.bm25
+    )
+    if config.index_type != "flat":
+        store.rebuild_index(
+            config.index_type, nlist=config.nlist, pq_bits=config.pq_bits, hnsw_m=config.hnsw_m
+        )
+    return store
+
+
+def index_bytes(store: FaissStore) -> int:
+
+    return int(faiss.serialize_index(store.index).size)
+
+
+# Evaluacija
+
+def embed_queries(embedding_model: EmbeddingModel, queries: List[LabelledQuery]) -> Tuple[np.ndarray, List[float]]:
+    #(vektori pitanja (n, d), latencija embeddinga po pitanju u sekundama) - jedno pitanje po pozivu, kao u produkciji
+
+    embedding_model.embed_texts_np([queries[0].question])   # zagrevanje
+    rows, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        rows.append(embedding_model.embed_texts_np([q.question])[0])
+        latencies.append(time.perf_counter() - start)
+    return np.ascontiguousarray(np.stack(rows), dtype="float32"), latencies
+
+
+def _search(store: FaissStore,
+            config: EvalConfig,
+            question: str,
+            vector: np.ndarray,
+            k: int) -> List[Tuple[IndexedDocument, float]]:
+    #Pretraga sa već izračunatim vektorom pitanja - meri se samo indeks (i BM25 + fuzija u hybrid modu)
+
+    params = {"nprobe": config.nprobe, "ef_search": config.ef_search, "query_vectors": vector}
+    if config.mode == "hybrid":
+        return store.hybrid_search_batch([question], k, **params)[0]
+    return store.search_batch([question], k, **params)[0]
+
+
+def evaluate_config(store: FaissStore,
+                    config: EvalConfig,
+                    queries: List[LabelledQuery],
+                    *,
+                    k: int = 5,
+                    ground_truth: Optional[List[List[ChunkKey]]] = None,
+                    query_vectors: Optional[np.ndarray] = None) -> Dict[str, Any]:
+
+    if query_vectors is None:
+        query_vectors, _ = embed_queries(store.embedding_model, queries)
+
+    recalls, rrs, ndcgs, ann_recalls, latencies = [], [], [], [], []
+    chunk_ids: List[List[ChunkKey]] = []
+
+    _search(store, config, queries[0].question, query_vectors[0:1], k)   # zagrevanje
+    for i, q in enumerate(queries):
+        vector = query_vectors[i:i + 1]
+        start = time.perf_counter()
+        results = _search(store, config, q.question, vector, k)
+        latencies.append(time.perf_counter() - start)
+
+        ranking = unique_doc_ranking(results)
+        recalls.append(recall_at_k(ranking, q.relevant, k))
+        rrs.append(reciprocal_rank(ranking, q.relevant))
+        ndcgs.append(ndcg_at_k(ranking, q.relevant, k))
+
+        ids = [(doc.doc_id, doc.chunk_id) for doc, _ in results]
+        chunk_ids.append(ids)
+        if ground_truth is not None:
+            exact = set(ground_truth[i][:k])
+            ann_recalls.append(len(exact & set(ids[:k])) / max(1, len(exact)))
+
+    lat_ms = np.asarray(latencies) * 1000.0
+    return {
+        "config": asdict(config),
+        "label": config.label,
+        f"recall@{k}": float(np.mean(recalls)),
+        "mrr": float(np.mean(rrs)),
+        f"ndcg@{k}": float(np.mean(ndcgs)),
+        f"ann_recall@{k}": float(np.mean(ann_recalls)) if ann_recalls else 1.0,
+        "p50_ms": float(np.percentile(lat_ms, 50)),
+        "p99_ms": float(np.percentile(lat_ms, 99)),
+        "qps": float(len(queries) / max(1e-9, sum(latencies))),
+        "index_mb": index_bytes(store) / 1e6,
+        "chunks": len(store.metadata),
+        "_chunk_ids": chunk_ids,
+    }
+
+
+def pareto_front(rows: List[Dict[str, Any]], *, quality: str, cost: str = "p50_ms") -> List[Dict[str, Any]]:
+    #Konfiguracije koje nijedna druga ne nadmašuje (bolji ili jednak kvalitet i manja ili jednaka cena, bar jedno strogo)
+
+    front = []
+    for r in rows:
+        dominated = any(
+            o is not r
+            and o[quality] >= r[quality] and o[cost] <= r[cost]
+            and (o[quality] > r[quality] or o[cost] < r[cost])
+            for o in rows
+        )
+        if not dominated:
+            front.append(r)
+    return sorted(front, key=lambda r: r[cost])
+
+
+def expand_grid(*,
+                index_types: Sequence[str],
+                chunk_sizes: Sequence[Optional[int]] = (None,),
+                nprobes: Sequence[int] = (1,),
+                ef_searches: Sequence[int] = (16,),
+                pq_bits: Sequence[int] = (8,),
+                hnsw_ms: Sequence[int] = (32,),
+                nlists: Sequence[Optional[int]] = (None,),
+                modes: Sequence[str] = ("dense",)) -> List[EvalConfig]:
+    #Samo smisleni parametri po tipu indeksa (nprobe za IVF, efSearch/M za HNSW, bits za PQ)
+
+    configs: List[EvalConfig] = []
+    for chunk_size, index_type, mode in itertools.product(chunk_sizes, index_types, modes):
+        if index_type == "flat":
+            configs.append(EvalConfig(index_type="flat", chunk_size=chunk_size, mode=mode))
+        elif index_type == "hnsw":
+            for m, ef in itertools.product(hnsw_ms, ef_searches):
+                configs.append(EvalConfig(index_type="hnsw", chunk_size=chunk_size, hnsw_m=m, ef_search=ef, mode=mode))
+        elif index_type in ("ivf_flat", "ivf_pq"):
+            bits_options = pq_bits if index_type == "ivf_pq" else (8,)
+            for nlist, bits, nprobe in itertools.product(nlists, bits_options, nprobes):
+                configs.append(EvalConfig(
+                    index_type=index_type, chunk_size=chunk_size, nlist=nlist, pq_bits=bits,
+                    nprobe=nprobe, mode=mode,
+                ))
+        else:
+            raise ValueError(f"Unknown index_type='{index_type}'")
+    return configs
+
+
+def run_sweep(docs: List[Document],
+              queries: List[LabelledQuery],
+              configs: List[EvalConfig],
+              embedding_model: EmbeddingModel,
+              *,
+              k: int = 5,
+              overlap_ratio: float = 1 / 6) -> List[Dict[str, Any]]:
+    #Jedan flat indeks po veličini chunka je i ground truth i osnova za ANN indekse (isti vektori)
+
+    query_vectors, embed_latencies = embed_queries(embedding_model, queries)
+    embed_ms = np.asarray(embed_latencies) * 1000.0
+    embed_p50_ms = float(np.percentile(embed_ms, 50))
+    print(f">>> [EVAL] embedding pitanja: p50={embed_p50_ms:.2f}ms (nije uračunato u p50/p99 indeksa)")
+
+    rows: List[Dict[str, Any]] = []
+    flats: Dict[Optional[int], FaissStore] = {}
+    truths: Dict[Tuple[Optional[int], str], List[List[ChunkKey]]] = {}
+    built: Dict[Tuple[Any, ...], Tuple[FaissStore, float]] = {}
+
+    for config in configs:
+        if config.chunk_size not in flats:
+            flats[config.chunk_size] = build_flat_store(
+                docs, embedding_model, chunk_size=config.chunk_size, overlap_ratio=overlap_ratio
+            )
+        flat = flats[config.chunk_size]
+
+        truth_key = (config.chunk_size, config.mode)
+        if truth_key not in truths:
+            exact = EvalConfig(index_type="flat", chunk_size=config.chunk_size, mode=config.mode)
+            truths[truth_key] = evaluate_config(flat, exact, queries, k=k, query_vectors=query_vectors)["_chunk_ids"]
+
+        if config.build_key not in built:
+            start = time.perf_counter()
+            store = build_ann_store(flat, config)
+            built[config.build_key] = (store, time.perf_counter() - start)
+        store, build_seconds = built[config.build_key]
+
+        row = evaluate_config(store, config, queries, k=k, ground_truth=truths[truth_key], query_vectors=query_vectors)
+        row["build_seconds"] = build_seconds
+        row["embed_p50_ms"] = embed_p50_ms
+        row.pop("_chunk_ids")
+        rows.append(row)
+        print(f">>> [EVAL] {row['label']}: recall@{k}={row[f'recall@{k}']:.3f} p50={row['p50_ms']:.3f}ms")
+
+    return rows
+
+
+def format_table(rows: List[Dict[str, Any]], *, k: int, quality: str) -> str:
+
+    front = {id(r) for r in pareto_front(rows, quality=quality)}
+    cols = [f"recall@{k}", "mrr", f"ndcg@{k}", f"ann_recall@{k}", "p50_ms", "p99_ms", "index_mb"]
+    if all("embed_p50_ms" in r for r in rows):
+        cols.append("embed_p50_ms")
+    width = max(len(r["label"]) for r in rows)
+    lines = [f"{'config':<{width}}  " + "  ".join(f"{c:>13}" for c in cols) + "  pareto"]
+    for r in sorted(rows, key=lambda r: r["p50_ms"]):
+        values = "  ".join(f"{r[c]:>13.3f}" for c in cols)
+        lines.append(f"{r['label']:<{width}}  {values}  {'*' if id(r) in front else ''}")
+    return "\n".join(lines)
+
+
+def _ints(raw: Optional[str]) -> List[Optional[int]]:
+
+    if not raw:
+        return [None]
+    return [int(x) for x in raw.split(",") if x]
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Recall@k / MRR / nDCG naspram latencije i memorije po FaissStore konfiguraciji")
+    parser.add_argument("--corpus", help="JSONL {doc_id, text}; bez njega sintetički korpus")
+    parser.add_argument("--labels", help="JSONL {question, relevant: [doc_id]}")
+    parser.add_argument("--index-types", default="flat,ivf_flat,hnsw")
+    parser.add_argument("--chunk-sizes", default=None, help="npr. 600,900,1200 (podrazumevano CHUNK_CONFIG)")
+    parser.add_argument("--overlap-ratio", type=float, default=1 / 6)
+    parser.add_argument("--nprobe", default="1,4,16")
+    parser.add_argument("--nlist", default=None)
+    parser.add_argument("--ef-search", default="16,64,128")
+    parser.add_argument("--hnsw-m", default="32")
+    parser.add_argument("--pq-bits", default="8")
+    parser.add_argument("--modes", default="dense", help="dense,hybrid")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--quality", default=None, help="Metrika za Pareto (podrazumevano recall@k)")
+    parser.add_argument("--embedding", choices=("real", "hashing"), default="real")
+    parser.add_argument("--synthetic-docs", type=int, default=400)
+    parser.add_argument("--synthetic-queries", type=int, default=100)
+    parser.add_argument("--out", default=None, help="JSON sa svim redovima i Pareto frontom")
+    args = parser.parse_args()
+
+    if bool(args.corpus) != bool(args.labels):
+        parser.error("--corpus i --labels se zadaju zajedno")
+    if args.corpus:
+        docs, queries = load_dataset(args.corpus, args.labels)
+    else:
+        docs, queries = synthetic_dataset(args.synthetic_docs, args.synthetic_queries)
+
+    if args.embedding == "real":
+        from pipeline.embeddings.factory import get_embedding_model
+        embedding_model = get_embedding_model()
+    else:
+        from benchmarks.fakes import HashingEmbeddingModel
+        embedding_model = HashingEmbeddingModel()
+
+    configs = expand_grid(
+        index_types=[t for t in args.index_types.split(",") if t],
+        chunk_sizes=_ints(args.chunk_sizes),
+        nprobes=[n for n in _ints(args.nprobe) if n] or [1],
+        ef_searches=[n for n in _ints(args.ef_search) if n] or [16],
+        pq_bits=[n for n in _ints(args.pq_bits) if n] or [8],
+        hnsw_ms=[n for n in _ints(args.hnsw_m) if n] or [32],
+        nlists=_ints(args.nlist),
+        modes=[m for m in args.modes.split(",") if m],
+    )
+
+    rows = run_sweep(docs, queries, configs, embedding_model, k=args.k, overlap_ratio=args.overlap_ratio)
+    quality = args.quality or f"recall@{args.k}"
+
+    print()
+    print(format_table(rows, k=args.k, quality=quality))
+
+    if args.out:
+        parent = os.path.dirname(args.out)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"k": args.k, "quality": quality, "rows": rows,
+                       "pareto": [r["label"] for r in pareto_front(rows, quality=quality)]},
+                      f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from pipeline.common import tokenize_query
+from pipeline.embeddings.base import EmbeddingModel
+from pipeline.llm.base import LLMAdapter
+
+#Zamene za Ollama/Groq i HF embedding model, da benchmark radi bez mreže i bez GPU-a
+#Brzine su podesive, pa se meri pipeline oko modela, a ne sam model
+
+
+class HashingEmbeddingModel(EmbeddingModel):
+
+    #Deterministički "bag of tokens" embedding: svaki token dobija fiksan slučajan vektor (seed = hash tokena),
+    #tekst je normalizovan zbir - slični tekstovi (isti termini) su blizu, kao kod pravog modela
+
+    def __init__(self, dimension: int = 384, *, delay_per_text: float = 0.0) -> None:
+        self._dimension = dimension
+        self.delay_per_text = delay_per_text
+        self._token_vectors: Dict[str, np.ndarray] = {}
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def _token_vector(self, token: str) -> np.ndarray:
+
+        vec = self._token_vectors.get(token)
+        if vec is None:
+            seed = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+            vec = np.random.default_rng(seed).standard_normal(self._dimension).astype("float32")
+            self._token_vectors[token] = vec
+        return vec
+
+    def embed_texts_np(self, texts: List[str]) -> np.ndarray:
+
+        out = np.zeros((len(texts), self._dimension), dtype="float32")
+        for i, text in enumerate(texts):
+            for token in tokenize_query(text):
+                out[i] += self._token_vector(token)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        out /= np.clip(norms, 1e-9, None)
+        if self.delay_per_text:
+            time.sleep(self.delay_per_text * len(texts))
+        return out
+
+    def embed_text(self, text: str) -> List[float]:
+        return self.embed_texts_np([text])[0].tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [row.tolist() for row in self.embed_texts_np(texts)]
+
+
+class FakeLLMAdapter(LLMAdapter):
+
+    #Odgovor bez modela; latency = vreme do prvog tokena, token_latency = vreme po sledećem tokenu
+
+    REWRITE_MARKER = "search query rewriting assistant"
+
+    def __init__(self,
+                 *,
+                 latency: float = 0.0,
+                 token_latency: float = 0.0,
+                 answer_tokens: int = 64,
+                 num_ctx: Optional[int] = 4096,
+                 reserved_output_tokens: int = 768) -> None:
+
+        self.model_name = "fake-llm"
+        self.latency = latency
+        self.token_latency = token_latency
+        self.answer_tokens = answer_tokens
+        self.num_ctx = num_ctx
+        self.reserved_output_tokens = reserved_output_tokens
+        self.prompts = 0
+
+    def get_model(self) -> Any:
+        return self
+
+    def _answer(self, prompt: str) -> List[str]:
+
+        self.prompts += 1
+        if self.REWRITE_MARKER in prompt:
+            # Rewrite prompt: vraća nekoliko engleskih reči iz pitanja kao search upit
+            question = prompt.rsplit("Q:", 1)[-1].rsplit("A:", 1)[0]
+            words = [w for w in tokenize_query(question) if w.isascii()]
+            return [" ".join(words[-4:]) or "computer science"]
+        return [f"token{i} " for i in range(self.answer_tokens)]
+
+    def generate(self, prompt: str) -> str:
+
+        parts = self._answer(prompt)
+        time.sleep(self.latency + self.token_latency * max(0, len(parts) - 1))
+        return "".join(parts).strip()
+
+    def ask(self, prompt: str, **kwargs) -> str:
+        return self.generate(prompt)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+
+        parts = self._answer(prompt)
+        time.sleep(self.latency)
+        for i, part in enumerate(parts):
+            if i:
+                time.sleep(self.token_latency)
+            yield part
+
+    def prompt_token_budget(self) -> Optional[int]:
+
+        if self.num_ctx is None:
+            return None
+        return max(256, self.num_ctx - self.reserved_output_tokens)
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+from pipeline.common import tokenize_query
+from pipeline.http_client import HttpTransport
+from pipeline.metrics import incr
+
+from benchmarks.corpus import TOPICS, make_page
+
+#HTTP fixture-i za live klijente (Wikipedia, StackOverflow, OpenAlex) - benchmark radi bez mreže
+#
+#FixtureTransport je zamena za HttpTransport: odgovor se traži u JSON fajlu snimljenih odgovora,
+#a ako ga nema, pravi se sintetički odgovor istog oblika kao pravi API (deterministički, po upitu)
+#Snimanje pravih odgovora (jednom, sa mrežom):
+#   python -m benchmarks.run --suite rag --record-fixtures benchmarks/fixtures/http.json
+
+IGNORED_PARAMS = {"key", "mailto"}   # tajne i kontakt ne ulaze u ključ (ni u fajl)
+
+
+def fixture_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+
+    parts = urllib.parse.urlsplit(url)
+    query = sorted((k, str(v)) for k, v in (params or {}).items() if k not in IGNORED_PARAMS)
+    return f"{parts.netloc.lower()}{parts.path}?{urllib.parse.urlencode(query)}"
+
+
+def _response(url: str, params: Optional[Dict[str, Any]], status: int, body: str) -> requests.Response:
+
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = body.encode("utf-8")
+    resp.encoding = "utf-8"
+    resp.headers["Content-Type"] = "application/json"
+    resp.url = requests.Request("GET", url, params=params).prepare().url or url
+    return resp
+
+
+class FixtureTransport(HttpTransport):
+
+    #Reprodukuje snimljene odgovore; record=True propušta promašaje na pravu mrežu i snima ih u fajl
+    #latency simulira mrežu (sekundi po zahtevu), da se vidi kako se preklapaju paralelni izvori
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 *,
+                 record: bool = False,
+                 synthetic: bool = True,
+                 latency: float = 0.0) -> None:
+
+        super().__init__(max_retries=0)
+        self.path = path
+        self.record = record
+        self.synthetic = synthetic
+        self.latency = latency
+        self.fixtures: Dict[str, Dict[str, Any]] = {}
+        self.misses = 0
+        self._fixture_lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.fixtures = json.load(f)
+
+    def get(self,
+            url: str,
+            *,
+            params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None,
+            timeout: float = 20) -> requests.Response:
+
+        key = fixture_key(url, params)
+        with self._fixture_lock:
+            fixture = self.fixtures.get(key)
+
+        if fixture is None and self.record:
+            resp = super().get(url, params=params, headers=headers, timeout=timeout)
+            with self._fixture_lock:
+                self.fixtures[key] = {"status": resp.status_code, "body": resp.text}
+            return resp
+
+        if fixture is None:
+            self.misses += 1
+            if not self.synthetic:
+                raise KeyError(f"Nema HTTP fixture-a za {key}")
+            status, body = synthetic_response(url, params or {})
+            fixture = {"status": status, "body": body}
+
+        if self.latency:
+            time.sleep(self.latency)
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        incr("http_requests_total", host=host, status=fixture["status"])
+        incr("http_bytes_fetched_total", len(fixture["body"]), host=host)
+        return _response(url, params, fixture["status"], fixture["body"])
+
+    def save(self, path: Optional[str] = None) -> None:
+
+        path = path or self.path
+        if not path:
+            raise ValueError("FixtureTransport.save: putanja nije zadata")
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with self._fixture_lock:
+            data = dict(sorted(self.fixtures.items()))
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(path + ".tmp", path)
+
+
+# Sintetički odgovori (isti oblik JSON-a kao pravi API-ji)
+
+def _seed(*parts: Any) -> int:
+
+    raw = "|".join(str(p) for p in parts).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "little")
+
+
+def _topic_for(text: str) -> str:
+    #Tema čiji se termini najviše poklapaju sa upitom; bez poklapanja - stabilan izbor po hash-u
+
+    tokens = set(tokenize_query(text))
+    scores = {
+        topic: sum(1 for term in terms if set(tokenize_query(term)) & tokens)
+        for topic, terms in TOPICS.items()
+    }
+    best = max(sorted(scores), key=lambda t: scores[t])
+    if scores[best]:
+        return best
+    topics = sorted(TOPICS)
+    return topics[_seed(text) % len(topics)]
+
+
+def _page_ids(query: str, n: int) -> list:
+
+    topics = sorted(TOPICS)
+    topic_no = topics.index(_topic_for(query))
+    rng = random.Random(_seed("ids", query))
+    # ID stranice kodira temu (id % broj_tema), pa fetch zna o čemu da "piše"
+    return [rng.randrange(1, 10**6) * len(topics) + topic_no for _ in range(n)]
+
+
+def _topic_of_id(pid: int) -> str:
+
+    topics = sorted(TOPICS)
+    return topics[pid % len(topics)]
+
+
+def _wikipedia(params: Dict[str, Any]) -> Dict[str, Any]:
+
+    if params.get("list") == "search":
+        query = str(params.get("srsearch", ""))
+        limit = int(params.get("srlimit", 5))
+        return {"query": {"search": [
+            {"title": f"{_topic_of_id(pid).replace('_', ' ').title()} ({pid})", "pageid": pid,
+             "snippet": f"<span>{query}</span> ...", "timestamp": "2024-01-01T00:00:00Z"}
+            for pid in _page_ids(query, limit)
+        ]}}
+
+    pages = {}
+    for raw in str(params.get("pageids", "")).split("|"):
+        if not raw:
+            continue
+        pid = int(raw)
+        topic = _topic_of_id(pid)
+        pages[str(pid)] = {
+            "pageid": pid,
+            "title": f"{topic.replace('_', ' ').title()} ({pid})",
+            "extract": make_page(random.Random(_seed("wiki", pid)), topic, words=1200),
+            "canonicalurl": f"https://en.wikipedia.org/?curid={pid}",
+        }
+    return {"query": {"pages": pages}}
+
+
+def _stackoverflow(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+
+    if path.endswith("/search/advanced"):
+        query = str(params.get("q", ""))
+        return {"items": [{"question_id": qid} for qid in _page_ids(query, int(params.get("pagesize", 5)))]}
+
+    ids_part = path.split("/questions/", 1)[1]
+    answers = ids_part.endswith("/answers")
+    ids = [int(x) for x in ids_part.replace("/answers", "").split(";") if x]
+
+    items = []
+    for qid in ids:
+        topic = _topic_of_id(qid)
+        if answers:
+            for n in range(int(params.get("pagesize", 2))):
+                body = make_page(random.Random(_seed("so-a", qid, n)), topic, words=150)
+                items.append({"question_id": qid, "body": f"<p>{body}</p>"})
+        else:
+            body = make_page(random.Random(_seed("so-q", qid)), topic, words=120)
+            items.append({
+                "question_id": qid,
+                "title": f"How does {TOPICS[topic][0]} work?",
+                "body": f"<p>{body}</p>",
+                "link": f"https://stackoverflow.com/questions/{qid}",
+            })
+    return {"items": items}
+
+
+def _openalex(params: Dict[str, Any]) -> Dict[str, Any]:
+
+    query = str(params.get("search", ""))
+    results = []
+    for wid in _page_ids(query, int(params.get("per_page", 5))):
+        topic = _topic_of_id(wid)
+        words = make_page(random.Random(_seed("oa", wid)), topic, words=200).split()
+        inverted: Dict[str, list] = {}
+        for pos, w in enumerate(words):
+            inverted.setdefault(w, []).append(pos)
+        results.append({
+            "title": f"A study of {TOPICS[topic][0]} ({wid})",
+            "abstract_inverted_index": inverted,
+            "doi": f"https://doi.org/10.0000/{wid}",
+            "publication_year": 2020,
+            "primary_location": {"landing_page_url": f"https://openalex.org/W{wid}"},
+        })
+    return {"results": results}
+
+
+def synthetic_response(url: str, params: Dict[str, Any]) -> Tuple[int, str]:
+
+    parts = urllib.parse.urlsplit(url)
+    host = parts.netloc.lower()
+    if host.endswith("wikipedia.org"):
+        body = _wikipedia(params)
+    elif host == "api.stackexchange.com":
+        body = _stackoverflow(parts.path, params)
+    elif host == "api.openalex.org":
+        body = _openalex(params)
+    else:
+        return 404, json.dumps({"error": f"no synthetic fixture for {host}"})
+    return 200, json.dumps(body, ensure_ascii=False)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from typing import Any, Dict, List
+
+import faiss
+import numpy as np
+
+from pipeline.metrics import REGISTRY
+
+from benchmarks.suites import SUITES, bench_chunking, bench_ingest, bench_rag, bench_search
+
+#Offline benchmark: bez mreže, Ollama/Groq i HF modela (HashingEmbeddingModel + FakeLLMAdapter + FixtureTransport)
+#
+#   python -m benchmarks.run                                   # sve svite -> benchmarks/results/latest.json
+#   python -m benchmarks.run --quick --out /tmp/pr.json        # manji korpus, za brzu proveru
+#   python -m benchmarks.compare benchmarks/results/baseline.json /tmp/pr.json
+#
+#--embedding real koristi pravi model (EMBEDDING_BACKEND), za merenje samog embeddinga
+
+DEFAULT_OUT = "benchmarks/results/latest.json"
+DEFAULT_FIXTURES = "benchmarks/fixtures/http.json"
+
+
+def _git_commit() -> str:
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def environment_info() -> Dict[str, Any]:   #Da se rezultati sa različitih mašina ne porede naslepo
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "faiss": getattr(faiss, "__version__", ""),
+        "faiss_omp_threads": faiss.omp_get_max_threads(),
+        "git_commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def run_suites(suites: List[str], config: Dict[str, Any]) -> Dict[str, Any]:
+
+    embedding_model = None
+    if config["embedding"] == "real":
+        from pipeline.embeddings.factory import get_embedding_model
+        embedding_model = get_embedding_model()
+
+    REGISTRY.reset()
+    metrics: Dict[str, Dict[str, Any]] = {}
+    durations: Dict[str, float] = {}
+    for name in suites:
+        start = time.perf_counter()
+        if name == "chunking":
+            metrics.update(bench_chunking(n_docs=config["chunking_docs"], seed=config["seed"]))
+        elif name == "ingest":
+            metrics.update(bench_ingest(
+                n_docs=config["ingest_docs"], embedding_model=embedding_model, seed=config["seed"]
+            ))
+        elif name == "search":
+            metrics.update(bench_search(
+                sizes=config["sizes"],
+                index_types=config["index_types"],
+                n_queries=config["queries"],
+                embedding_model=embedding_model,
+                seed=config["seed"],
+            ))
+        elif name == "rag":
+            metrics.update(bench_rag(
+                n_queries=config["rag_queries"],
+                llm_latency=config["llm_latency"],
+                llm_token_latency=config["llm_token_latency"],
+                http_latency=config["http_latency"],
+                fixtures_path=config["fixtures"],
+                record_fixtures=config["record_fixtures"],
+                embedding_model=embedding_model,
+                seed=config["seed"],
+            ))
+        durations[name] = time.perf_counter() - start
+        print(f">>> [BENCH] {name}: {durations[name]:.1f}s")
+
+    return {
+        "env": environment_info(),
+        "config": config,
+        "durations": durations,
+        "metrics": dict(sorted(metrics.items())),
+        "stages": REGISTRY.snapshot()["stages"],
+    }
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Offline benchmark za retrieval i ceo RAG pipeline")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES),
+                        help="Može više puta; podrazumevano sve svite")
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--quick", action="store_true", help="Manji korpus i manje upita")
+    parser.add_argument("--sizes", type=str, default=None, help="Veličine korpusa za search, npr. 1000,10000")
+    parser.add_argument("--index-types", type=str, default="flat", help="npr. flat,hnsw,ivf_flat")
+    parser.add_argument("--embedding", choices=("hashing", "real"), default="hashing")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Sekundi do prvog tokena lažnog LLM-a")
+    parser.add_argument("--llm-token-latency", type=float, default=0.0)
+    parser.add_argument("--http-latency", type=float, default=0.0, help="Simulirana latencija po HTTP zahtevu")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    parser.add_argument("--record-fixtures", action="store_true",
+                        help="Promašaji idu na pravu mrežu i snimaju se u --fixtures")
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    if args.sizes:
+        sizes = [int(s) for s in args.sizes.split(",") if s]
+    else:
+        sizes = [1000, 5000] if args.quick else [1000, 10000, 50000]
+
+    config = {
+        "sizes": sizes,
+        "index_types": [t for t in args.index_types.split(",") if t],
+        "queries": 50 if args.quick else 200,
+        "rag_queries": 10 if args.quick else 40,
+        "chunking_docs": 50 if args.quick else 200,
+        "ingest_docs": 25 if args.quick else 100,
+        "embedding": args.embedding,
+        "llm_latency": args.llm_latency,
+        "llm_token_latency": args.llm_token_latency,
+        "http_latency": args.http_latency,
+        "fixtures": args.fixtures,
+        "record_fixtures": args.record_fixtures,
+        "seed": args.seed,
+    }
+
+    result = run_suites(args.suite or list(SUITES), config)
+
+    parent = os.path.dirname(args.out)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f">>> [BENCH] {len(result['metrics'])} metrika sačuvano u {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from unittest import mock
+
+import numpy as np
+from langchain_core.documents import Document
+
+import pipeline.rag_pipeline as rag_module
+from pipeline.chunking import chunk_documents
+from pipeline.embeddings.base import EmbeddingModel
+from pipeline.llm.base import LLMAdapter
+from pipeline.rag_pipeline import RAGPipeline
+from pipeline.retriever.faiss import FaissStore, IndexedDocument
+
+from benchmarks.corpus import make_chunks, make_corpus, make_queries
+from benchmarks.fakes import FakeLLMAdapter, HashingEmbeddingModel
+from benchmarks.http_fixtures import FixtureTransport
+
+#Benchmark svite - svaka vraća ravan rečnik metrika {ime: {"value", "unit", "better"}}
+#better = "higher" (propusnost) ili "lower" (latencija), da compare zna šta je regresija
+
+Metrics = Dict[str, Dict[str, Any]]
+
+
+def metric(value: float, unit: str, better: str) -> Dict[str, Any]:
+
+    return {"value": float(value), "unit": unit, "better": better}
+
+
+def latency_metrics(prefix: str, samples: List[float]) -> Metrics:   #p50/p99/mean u ms
+
+    arr = np.asarray(samples, dtype="float64") * 1000.0
+    if arr.size == 0:
+        return {}
+    return {
+        f"{prefix}.p50_ms": metric(np.percentile(arr, 50), "ms", "lower"),
+        f"{prefix}.p99_ms": metric(np.percentile(arr, 99), "ms", "lower"),
+        f"{prefix}.mean_ms": metric(arr.mean(), "ms", "lower"),
+    }
+
+
+def best_of(fn: Callable[[], Any], repeats: int = 3) -> float:
+
+    best = float("inf")
+    for _ in range(max(1, repeats)):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@contextlib.contextmanager
+def offline_pipeline(index_dir: str,
+                     *,
+                     llm: Optional[LLMAdapter] = None,
+                     embedding_model: Optional[EmbeddingModel] = None,
+                     transport: Optional[FixtureTransport] = None) -> Iterator[RAGPipeline]:
+    #Pravi RAGPipeline bez Ollama/Groq, HF modela i mreže; keševi su isključeni da se meri "hladan" put
+
+    env = {
+        "RERANK_ENABLED": "0",
+        "SEMANTIC_CACHE_ENABLED": "0",
+        "LIVE_CACHE_PATH": "",
+        "FAISS_RELOAD_INTERVAL": "3600",
+        "FAISS_MMAP": "0",
+        "RETRIEVAL_MODE": "hybrid",
+    }
+    llm = llm or FakeLLMAdapter()
+    embedding_model = embedding_model or HashingEmbeddingModel()
+
+    with mock.patch.dict(os.environ, env), \
+            mock.patch.object(rag_module, "get_llm_adapter", lambda: llm), \
+            mock.patch.object(rag_module, "get_embedding_model", lambda: embedding_model), \
+            mock.patch.object(rag_module, "start_metrics_server", lambda: None):
+        rag = RAGPipeline(index_dir=index_dir)
+        rag.transport = transport or FixtureTransport()
+        rag.live_cache = None
+        try:
+            yield rag
+        finally:
+            rag._executor.shutdown(wait=True)
+
+
+# Chunkovanje
+
+def bench_chunking(*, n_docs: int = 200, repeats: int = 3, seed: int = 13) -> Metrics:
+
+    corpus = make_corpus(n_docs, pages_per_doc=1, words_per_page=1200, seed=seed)
+    docs = [Document(page_content=d.text, metadata={"source": "wikipedia"}) for d in corpus]
+    n_bytes = sum(len(d.page_content.encode("utf-8")) for d in docs)
+
+    n_chunks = len(chunk_documents(docs))
+    elapsed = best_of(lambda: chunk_documents(docs), repeats)
+
+    return {
+        "chunking.docs_per_sec": metric(n_docs / elapsed, "docs/s", "higher"),
+        "chunking.chunks_per_sec": metric(n_chunks / elapsed, "chunks/s", "higher"),
+        "chunking.mb_per_sec": metric(n_bytes / elapsed / 1e6, "MB/s", "higher"),
+    }
+
+
+# Ingest (chunkovanje + embedding + FAISS/BM25 + čuvanje)
+
+def bench_ingest(*,
+                 n_docs: int = 100,
+                 pages_per_doc: int = 4,
+                 batch_pages: int = 256,
+                 embedding_model: Optional[EmbeddingModel] = None,
+                 seed: int = 13) -> Metrics:
+
+    corpus = make_corpus(n_docs, pages_per_doc=pages_per_doc, seed=seed)
+    items = [
+        (page, {"source": "pdf", "doc_id": d.doc_id, "page": i + 1})
+        for d in corpus
+        for i, page in enumerate(d.pages)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            offline_pipeline(os.path.join(tmp, "index"), embedding_model=embedding_model) as rag:
+        start = time.perf_counter()
+        n_chunks = 0
+        for i in range(0, len(items), batch_pages):
+            n_chunks += rag.ingest_many(items[i:i + batch_pages], save=False)
+        elapsed = time.perf_counter() - start
+
+        save_start = time.perf_counter()
+        rag.save_index()
+        save_elapsed = time.perf_counter() - save_start
+
+    return {
+        "ingest.pages_per_sec": metric(len(items) / elapsed, "pages/s", "higher"),
+        "ingest.chunks_per_sec": metric(n_chunks / elapsed, "chunks/s", "higher"),
+        "ingest.save_ms": metric(save_elapsed * 1000, "ms", "lower"),
+    }
+
+
+# FaissStore.search / hybrid_search
+
+def build_store(n_chunks: int,
+                *,
+                embedding_model: Optional[EmbeddingModel] = None,
+                index_type: str = "flat",
+                seed: int = 13) -> FaissStore:
+
+    store = FaissStore(embedding_model=embedding_model or HashingEmbeddingModel())
+    chunks = [
+        IndexedDocument(doc_id=f"{topic}_{i:06d}", chunk_id=0, text=text, source=topic)
+        for i, (topic, text) in enumerate(make_chunks(n_chunks, seed=seed))
+    ]
+    for i in range(0, len(chunks), 4096):
+        store.add_chunks(chunks[i:i + 4096])
+    if index_type != "flat":
+        store.rebuild_index(index_type)
+    return store
+
+
+def bench_search(*,
+                 sizes: List[int] = (1000, 10000, 50000),
+                 index_types: List[str] = ("flat",),
+                 n_queries: int = 200,
+                 top_k: int = 5,
+                 embedding_model: Optional[EmbeddingModel] = None,
+                 seed: int = 13) -> Metrics:
+
+    queries = [q.text for q in make_queries(n_queries, seed=seed)]
+    embedding_model = embedding_model or HashingEmbeddingModel()
+    out: Metrics = {}
+
+    for size in sizes:
+        for index_type in index_types:
+            build_start = time.perf_counter()
+            store = build_store(size, embedding_model=embedding_model, index_type=index_type, seed=seed)
+            build_elapsed = time.perf_counter() - build_start
+            prefix = f"search.{index_type}.{size}"
+            out[f"{prefix}.build_chunks_per_sec"] = metric(size / build_elapsed, "chunks/s", "higher")
+
+            for name, fn in (("dense", store.search), ("hybrid", store.hybrid_search)):
+                fn(queries[0], top_k)   # zagrevanje
+                samples = []
+                for q in queries:
+                    start = time.perf_counter()
+                    fn(q, top_k)
+                    samples.append(time.perf_counter() - start)
+                out.update(latency_metrics(f"{prefix}.{name}", samples))
+
+            batch_elapsed = best_of(lambda: store.search_batch(queries, top_k), 3)
+            out[f"{prefix}.batch_queries_per_sec"] = metric(len(queries) / batch_elapsed, "queries/s", "higher")
+    return out
+
+
+# RAGPipeline.run po fazama
+
+def bench_rag(*,
+              n_queries: int = 40,
+              n_docs: int = 200,
+              llm_latency: float = 0.0,
+              llm_token_latency: float = 0.0,
+              http_latency: float = 0.0,
+              fixtures_path: Optional[str] = None,
+              record_fixtures: bool = False,
+              embedding_model: Optional[EmbeddingModel] = None,
+              seed: int = 13) -> Metrics:
+
+    transport = FixtureTransport(fixtures_path, record=record_fixtures, latency=http_latency)
+    llm = FakeLLMAdapter(latency=llm_latency, token_latency=llm_token_latency)
+    corpus = make_corpus(n_docs, pages_per_doc=2, seed=seed)
+    queries = [q.text for q in make_queries(n_queries, seed=seed)]
+
+    stage_samples: Dict[str, List[float]] = {}
+    with tempfile.TemporaryDirectory() as tmp, \
+            offline_pipeline(os.path.join(tmp, "index"), llm=llm, embedding_model=embedding_model,
+                             transport=transport) as rag:
+        rag.ingest_many(
+            [(page, {"source": "pdf", "doc_id": d.doc_id}) for d in corpus for page in d.pages],
+            save=False,
+        )
+        rag.run(queries[0])   # zagrevanje (tiktoken, tokenizer, FAISS)
+
+        for q in queries:
+            timings = rag.run(q)["timings"]
+            for stage, seconds in timings.items():
+                stage_samples.setdefault(stage, []).append(seconds)
+
+        first_token = []
+        for q in queries[: max(1, n_queries // 4)]:
+            for event in rag.run_stream(q):
+                if event["type"] == "done":
+                    first_token.append(event["timings"]["first_token"])
+
+    if record_fixtures:
+        transport.save()
+
+    out: Metrics = {}
+    for stage, samples in sorted(stage_samples.items()):
+        out.update(latency_metrics(f"rag.{stage}", samples))
+    out.update(latency_metrics("rag.stream_first_token", first_token))
+    return out
+
+
+SUITES: Dict[str, Callable[..., Metrics]] = {
+    "chunking": bench_chunking,
+    "ingest": bench_ingest,
+    "search": bench_search,
+    "rag": bench_rag,
+}
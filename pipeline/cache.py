@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pipeline.metrics import incr
+
+#Keš za odgovore live izvora (Wikipedia, StackOverflow, OpenAlex, Google)
+#Memorijski LRU sloj + opcioni SQLite fajl na disku, TTL po izvoru
+#
+#Disk sloj je takođe LRU (last_used se osvežava i na pogodak sa diska): preko max_disk_entries prvo se brišu
+#istekli, pa najdavnije korišćeni redovi, bez obzira na namespace. Upisi i oznake korišćenja se skupljaju
+#i upisuju jednim commit-om na flush_every stavki / flush_seconds sekundi (i na close / izlazu iz procesa)
+
+DEFAULT_TTLS: Dict[str, float] = {
+    "wikipedia": 24 * 3600,
+    "wikipedia_page": 24 * 3600,
+    "stackoverflow": 6 * 3600,
+    "openalex": 24 * 3600,
+    "gcs": 3600,
+    "rewrite": 7 * 24 * 3600,
+    "rerank": 24 * 3600,
+}
+
+
+def normalize_query(q: str) -> str:   #Isto pitanje sa drugačijim razmacima/velikim slovima daje isti ključ
+
+    return " ".join((q or "").lower().split())
+
+
+def make_key(*parts: Any) -> str:
+
+    return json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+
+
+def live_key(query: str, lang: str, limit: int) -> str:   #Ključ (normalizovan upit, jezik, limit) unutar namespace-a izvora
+
+    return make_key(normalize_query(query), lang, int(limit))
+
+
+class TTLCache:
+
+    #Thread-safe keš; vrednosti se čuvaju kao pickle bajtovi pa svaki pogodak vraća svežu kopiju
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 3600,
+        path: Optional[str] = None,
+        max_disk_entries: int = 100_000,
+        flush_every: int = 64,
+        flush_seconds: float = 5.0,
+    ) -> None:
+
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_disk_entries = max_disk_entries
+        self.flush_every = max(1, flush_every)
+        self.flush_seconds = flush_seconds
+
+        self._mem: "OrderedDict[Tuple[str, str], Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+
+        # Još neupisano na disk: novi unosi i ključevi pogođeni sa diska (za last_used)
+        self._pending: Dict[Tuple[str, str], Tuple[float, bytes]] = {}
+        self._touched: set = set()
+        self._last_flush = time.monotonic()
+        self._disk_rows = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            parent = os.path.dirname(path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, "
+                "value BLOB NOT NULL, expires_at REAL NOT NULL, "
+                "last_used REAL NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            # Stari fajlovi nemaju last_used - takvi redovi se prvi brišu
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(cache)")}
+            if "last_used" not in columns:
+                self._db.execute("ALTER TABLE cache ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+            self._db.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires_at)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS cache_last_used ON cache (last_used)")
+            self._db.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+            self._disk_rows = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            atexit.register(self.flush)
+
+    def ttl_for(self, namespace: str) -> float:
+
+        return float(self.ttls.get(namespace, self.default_ttl))
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+
+        now = time.time()
+        with self._lock:
+            entry = self._mem.get((namespace, key))
+            if entry is not None:
+                expires_at, blob = entry
+                if expires_at > now:
+                    self._mem.move_to_end((namespace, key))
+                    self._count(self._hits, namespace)
+                    if self._db is not None:
+                        self._touched.add((namespace, key))
+                        self._maybe_flush()
+                    return pickle.loads(blob)
+                del self._mem[(namespace, key)]
+
+            pending = self._pending.get((namespace, key))
+            if pending is not None and pending[0] > now:
+                self._remember(namespace, key, pending[0], pending[1])
+                self._count(self._hits, namespace)
+                return pickle.loads(pending[1])
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                    (namespace, key),
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self._remember(namespace, key, row[1], row[0])
+                    self._count(self._hits, namespace)
+                    self._touched.add((namespace, key))
+                    self._maybe_flush()
+                    return pickle.loads(row[0])
+
+            self._count(self._misses, namespace)
+            return None
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+
+        expires_at = time.time() + self.ttl_for(namespace)
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            self._remember(namespace, key, expires_at, blob)
+
+            if self._db is not None:
+                self._pending[(namespace, key)] = (expires_at, blob)
+                self._maybe_flush()
+
+    def flush(self) -> None:   #Upisuje sve što čeka na disk jednim commit-om
+
+        with self._lock:
+            self._flush()
+
+    def get_or_load(self, namespace: str, key: str, loader: Callable[[], Any]) -> Any:
+
+        #Prazni rezultati se ne keširaju - izvor je možda samo privremeno bio nedostupan
+        cached = self.get(namespace, key)
+        if cached is not None:
+            return cached
+
+        value = loader()
+        if value:
+            self.set(namespace, key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+
+        with self._lock:
+            hits = sum(self._hits.values())
+            misses = sum(self._misses.values())
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "entries": len(self._mem),
+                "by_namespace": {
+                    ns: {"hits": self._hits.get(ns, 0), "misses": self._misses.get(ns, 0)}
+                    for ns in sorted(set(self._hits) | set(self._misses))
+                },
+            }
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._mem.clear()
+            self._pending.clear()
+            self._touched.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache")
+                self._db.commit()
+                self._disk_rows = 0
+
+    def close(self) -> None:
+
+        with self._lock:
+            if self._db is not None:
+                self._flush()
+                self._db.close()
+                self._db = None
+        atexit.unregister(self.flush)
+
+    def _maybe_flush(self) -> None:
+
+        # Oznake korišćenja idu uz sledeći upis (ili posle flush_seconds), same ne pokreću commit
+        if (len(self._pending) >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_seconds):
+            self._flush()
+
+    def _flush(self) -> None:   #Poziva se pod self._lock
+
+        self._last_flush = time.monotonic()
+        if self._db is None or not (self._pending or self._touched):
+            return
+
+        now = time.time()
+        touched = [k for k in self._touched if k not in self._pending]
+        if self._pending:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                [(ns, key, blob, expires_at, now) for (ns, key), (expires_at, blob) in self._pending.items()],
+            )
+        if touched:
+            self._db.executemany(
+                "UPDATE cache SET last_used = ? WHERE namespace = ? AND key = ?",
+                [(now, ns, key) for ns, key in touched],
+            )
+        self._disk_rows += len(self._pending)
+        self._pending.clear()
+        self._touched.clear()
+
+        # INSERT OR REPLACE postojećeg ključa ne povećava broj redova - tačan broj tek kad procena pređe granicu
+        if self._disk_rows > self.max_disk_entries:
+            self._db.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+            self._disk_rows = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            extra = self._disk_rows - self.max_disk_entries
+            if extra > 0:
+                self._db.execute(
+                    "DELETE FROM cache WHERE rowid IN "
+                    "(SELECT rowid FROM cache ORDER BY last_used LIMIT ?)",
+                    (extra,),
+                )
+                self._disk_rows -= extra
+        self._db.commit()
+
+    def _remember(self, namespace: str, key: str, expires_at: float, blob: bytes) -> None:
+
+        self._mem[(namespace, key)] = (expires_at, blob)
+        self._mem.move_to_end((namespace, key))
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _count(self, counter: Dict[str, int], namespace: str) -> None:
+
+        counter[namespace] = counter.get(namespace, 0) + 1
+        incr("cache_requests_total", cache=namespace, result="hit" if counter is self._hits else "miss")
@@ -1,5 +1,50 @@
 from __future__ import annotations
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import logging
+import math
+import os
+import re
+
+#tiktoken je opcion - brz lokalni BPE tokenizer; bez njega se koristi procena po broju znakova
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+from pipeline.metrics import incr, span
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4   # gruba procena za tokenizere LLM-ova (engleski/srpski tekst)
+
+_encoding: Any = None
+_encoding_loaded = False
+
+
+def estimate_tokens(text: str) -> int:    #Procena broja tokena bez učitavanja tokenizera
+
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def _get_encoding() -> Any:
+
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.get_encoding(os.getenv("PROMPT_TOKENIZER", "cl100k_base"))
+            except Exception:
+                _encoding = None   # npr. BPE fajl ne može da se preuzme - ostaje procena
+    return _encoding
+
+
+def count_tokens(text: str) -> int:    #Broj tokena (tiktoken ako postoji, inače procena)
+
+    enc = _get_encoding()
+    if enc is None:
+        return estimate_tokens(text)
+    return len(enc.encode(text or "", disallowed_special=()))
 
 
 def reclean_text(text: str) -> str:    #Reformatiranje chunkova ukoliko je potrebno (višestrucci razmaci i prazni redovi)
@@ -33,11 +78,130 @@ def format_context_block(chunks: List[Dict[str, Any]]) -> str:    #Spaja chunkov
     return "\n\n".join(formatted)
 
 
-def build_prompt(question: str, chunks: List[Dict[str, Any]]) -> str:   #LLM prompt
+# Pakovanje konteksta u budžet tokena
+MIN_OVERLAP_CHARS = 40       # kraće poklapanje je verovatno slučajno
+MAX_OVERLAP_CHARS = 400      # chunk_overlap je 120-200 znakova, uz rezervu
+MIN_TRUNCATED_TOKENS = 48    # kraći ostatak chunka nije vredan slanja
+NEAR_DUPLICATE_JACCARD = 0.8
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def _shingles(text: str, n: int = 3) -> set:
+
+    words = text.lower().split()
+    if len(words) < n:
+        return {tuple(words)}
+    return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _overlap_len(left: str, right: str) -> int:   #Dužina najdužeg sufiksa od left koji je prefiks od right
+
+    limit = min(len(left), len(right), MAX_OVERLAP_CHARS)
+    for k in range(limit, MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:k]):
+            return k
+    return 0
+
+
+def _strip_overlaps(text: str, selected: List[str]) -> str:
+    #Susedni chunkovi istog dokumenta dele chunk_overlap znakova - deljeni deo se šalje samo jednom
+
+    for other in selected:
+        k = _overlap_len(other, text)
+        if k:
+            text = text[k:]
+        k = _overlap_len(text, other)
+        if k:
+            text = text[:-k]
+    return text.strip()
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    #Skraćuje tekst na max_tokens, na granici rečenice; "" ako ni prva rečenica ne staje
+
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    out = ""
+    for m in _SENTENCE_END.finditer(text):
+        candidate = text[:m.start()]
+        if count_tokens(candidate) > max_tokens:
+            break
+        out = candidate
+    return out.strip()
+
+
+def pack_context(chunks: List[Dict[str, Any]], max_tokens: int) -> List[Dict[str, Any]]:
+    #Pohlepno puni budžet: najrelevantniji chunkovi prvi (po "score" ako postoji, inače zadati redosled),
+    #bez skoro identičnih chunkova i ponovljenih preklapanja, a poslednji se skraćuje na granici rečenice
+
+    order = sorted(range(len(chunks)), key=lambda i: -float(chunks[i].get("score", 0.0)))
+
+    packed: List[Dict[str, Any]] = []
+    selected_texts: List[str] = []
+    selected_shingles: List[set] = []
+    used = 0
+
+    for i in order:
+        chunk = chunks[i]
+        text = reclean_text(chunk.get("text", ""))
+        if not text:
+            continue
+
+        sh = _shingles(text)
+        if any(_jaccard(sh, other) >= NEAR_DUPLICATE_JACCARD for other in selected_shingles):
+            continue
+
+        text = _strip_overlaps(text, selected_texts)
+        if not text:
+            continue
+
+        # zaglavlje "### Chunk N — Source: X" + razmak između chunkova
+        overhead = count_tokens(format_single_chunk({**chunk, "text": ""}, len(packed) + 1)) + 2
+        remaining = max_tokens - used - overhead
+        if remaining < MIN_TRUNCATED_TOKENS:
+            break
+
+        tokens = count_tokens(text)
+        if tokens > remaining:
+            text = truncate_to_tokens(text, remaining)
+            tokens = count_tokens(text)
+            if tokens < MIN_TRUNCATED_TOKENS:
+                continue
+
+        packed.append({**chunk, "text": text})
+        selected_texts.append(text)
+        selected_shingles.append(sh)
+        used += tokens + overhead
+
+    incr("context_tokens_total", used)
+    return packed
+
+
+def build_prompt(question: str,
+                 chunks: List[Dict[str, Any]],
+                 max_prompt_tokens: Optional[int] = None) -> str:   #LLM prompt; sa max_prompt_tokens kontekst se pakuje u budžet
+
+    with span("prompt_build"):
+        n_in = len(chunks)
+        if max_prompt_tokens is not None:
+            base_tokens = count_tokens(_render_prompt(question, ""))
+            chunks = pack_context(chunks, max(0, max_prompt_tokens - base_tokens))
+        logger.debug("build_prompt: %d chunkova, posle pakovanja %d", n_in, len(chunks))
+        incr("context_chunks_total", len(chunks))
+
+        return _render_prompt(question, format_context_block(chunks))
+
 
-    print(">>> [DEBUG] build_prompt POZVAN, broj chunkova:", len(chunks))
-    
-    context_block = format_context_block(chunks)
+def _render_prompt(question: str, context_block: str) -> str:
 
     prompt = f"""
         You are an educational AI assistant with access to retrieved knowledge.
@@ -2,6 +2,8 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import List
 
+import numpy as np
+
 
 class EmbeddingModel(ABC):
     
@@ -20,3 +22,13 @@ class EmbeddingModel(ABC):
     @abstractmethod
     def dimension(self) -> int:   #Dimenzija vektora
         raise NotImplementedError
+
+    def embed_texts_np(self, texts: List[str]) -> np.ndarray:  #Matrica (n, dimension), float32, C-contiguous - ide direktno u FAISS
+        #Podrazumevano preko embed_documents; modeli koji već rade sa numpy-jem ovo prepisuju bez liste float-ova
+
+        if not texts:
+            return np.zeros((0, self.dimension), dtype="float32")
+        mat = np.asarray(self.embed_documents(list(texts)), dtype="float32")
+        if mat.ndim == 1:
+            mat = np.expand_dims(mat, axis=0)
+        return np.ascontiguousarray(mat)
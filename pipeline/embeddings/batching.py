@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, List, Optional
+
+import numpy as np
+
+from pipeline.embeddings.base import EmbeddingModel
+from pipeline.metrics import REGISTRY, incr, span
+
+#Dinamičko batchovanje upita: pozivi sa jednim (ili par) tekstova iz više niti skupljaju se
+#najviše max_wait_ms ili do max_batch tekstova, pa idu u JEDAN encode - umesto mnogo batch-of-one
+#prolaza kroz transformer koji se otimaju za ista CPU jezgra
+#
+#Veliki pozivi (ingest, len(texts) >= max_batch) idu direktno u model, bez čekanja
+
+
+def batching_from_env(model: EmbeddingModel) -> EmbeddingModel:   #EMBEDDING_MICROBATCH=1 uključuje batcher oko modela
+
+    if os.getenv("EMBEDDING_MICROBATCH", "0") != "1":
+        return model
+    return BatchingEmbeddingModel(
+        model,
+        max_batch=int(os.getenv("EMBEDDING_MICROBATCH_MAX_BATCH", "32")),
+        max_wait_ms=float(os.getenv("EMBEDDING_MICROBATCH_MAX_WAIT_MS", "2")),
+    )
+
+
+def _size_bucket(n: int) -> str:   #Labela za brojač batch-eva: 1, 2, 4, 8, ... (gornja granica)
+
+    bucket = 1
+    while bucket < n:
+        bucket *= 2
+    return str(bucket)
+
+
+class _Pending:
+
+    __slots__ = ("texts", "future", "enqueued")
+
+    def __init__(self, texts: List[str]) -> None:
+        self.texts = texts
+        self.future: "Future[np.ndarray]" = Future()
+        self.enqueued = time.perf_counter()
+
+
+class BatchingEmbeddingModel(EmbeddingModel):
+
+    #Omotač oko bilo kog EmbeddingModel-a; jedna pozadinska nit radi encode, pozivaoci čekaju svoj Future
+    #Ostali atributi (cache, _model_name, ...) prosleđuju se unutrašnjem modelu
+
+    def __init__(
+        self,
+        inner: EmbeddingModel,
+        *,
+        max_batch: int = 32,
+        max_wait_ms: float = 2.0,
+    ) -> None:
+
+        self._inner = inner
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue: List[_Pending] = []
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self._batches = 0
+        self._batched_texts = 0
+        self._largest_batch = 0
+
+        self._worker = threading.Thread(target=self._loop, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._inner, name)
+
+    @property
+    def dimension(self) -> int:
+        return self._inner.dimension
+
+    def embed_texts_np(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension), dtype="float32")
+        if len(texts) >= self.max_batch:
+            return self._inner.embed_texts_np(list(texts))
+
+        # _closed se proverava pod istim lock-om kao i dodavanje u red - posle close() worker više ne uzima zahteve
+        item = _Pending(list(texts))
+        with self._cond:
+            closed = self._closed
+            if not closed:
+                self._queue.append(item)
+                self._cond.notify()
+        if closed:
+            return self._inner.embed_texts_np(list(texts))
+
+        with span("embedding_batched"):
+            return item.future.result()
+
+    def embed_text(self, text: str) -> List[float]:
+        return self.embed_texts_np([text])[0].tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return [row.tolist() for row in self.embed_texts_np(texts)]
+
+    def stats(self) -> dict:
+
+        with self._cond:
+            return {
+                "batches": self._batches,
+                "texts": self._batched_texts,
+                "avg_batch": self._batched_texts / self._batches if self._batches else 0.0,
+                "largest_batch": self._largest_batch,
+                "queued": len(self._queue),
+            }
+
+    def close(self) -> None:   #Zahtevi koji su već u redu se još obrade, novi idu direktno u model
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join(timeout=5)
+
+    # Pozadinska nit
+
+    def _take_batch(self) -> Optional[List[_Pending]]:
+        #Čeka prvi zahtev, pa skuplja dalje do max_batch tekstova ili dok ne istekne max_wait
+
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+
+            deadline = self._queue[0].enqueued + self.max_wait
+            while not self._closed and sum(len(p.texts) for p in self._queue) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch: List[_Pending] = []
+            size = 0
+            while self._queue and (not batch or size + len(self._queue[0].texts) <= self.max_batch):
+                item = self._queue.pop(0)
+                batch.append(item)
+                size += len(item.texts)
+            return batch
+
+    def _loop(self) -> None:
+
+        #Svaki Future iz batch-a se uvek razreši (rezultat ili greška), a nit nastavlja i posle greške
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            try:
+                self._run_batch(batch)
+            except BaseException as exc:
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(exc)
+                if not isinstance(exc, Exception):
+                    raise
+
+    def _run_batch(self, batch: List[_Pending]) -> None:
+
+        if REGISTRY.enabled:
+            started = time.perf_counter()
+            for item in batch:
+                REGISTRY.observe("embedding_queue_wait", started - item.enqueued)
+
+        # Isti tekst iz više zahteva (npr. isto pitanje od više korisnika) enkodira se jednom
+        unique = list(dict.fromkeys(t for item in batch for t in item.texts))
+        mat = np.asarray(self._inner.embed_texts_np(unique))
+        if mat.ndim != 2 or mat.shape[0] != len(unique):
+            raise RuntimeError(f"embedding model returned {mat.shape} for {len(unique)} texts")
+
+        rows = {text: i for i, text in enumerate(unique)}
+        incr("embedding_batches_total", size=_size_bucket(len(unique)))
+        incr("embedding_batch_texts_total", len(unique))
+        with self._cond:
+            self._batches += 1
+            self._batched_texts += len(unique)
+            self._largest_batch = max(self._largest_batch, len(unique))
+
+        for item in batch:
+            idx = [rows[t] for t in item.texts]
+            item.future.set_result(np.ascontiguousarray(mat[idx], dtype="float32"))
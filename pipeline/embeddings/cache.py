@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import atexit
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from pipeline.metrics import incr, span
+
+#Keš embeddinga adresiran sadržajem: sha256(model + tekst) -> float32 vektor
+#Memorijski LRU sloj + opcioni SQLite fajl na disku (vektori kao sirovi float32 bajtovi)
+#
+#Disk sloj: upisi i oznake korišćenja (last_used) se skupljaju i upisuju jednim commit-om na
+#flush_every stavki / flush_seconds sekundi (i na close / izlazu iz procesa) - ne jedan fsync po pitanju;
+#preko disk_max_entries redova brišu se najdavnije korišćeni (LRU)
+
+
+def embedding_key(model_name: str, text: str) -> str:
+
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8", "ignore")).hexdigest()
+
+
+def encode_with_cache(
+    cache: Optional["EmbeddingCache"],
+    model_name: str,
+    texts: List[str],
+    encode: Callable[[List[str]], np.ndarray],
+) -> np.ndarray:
+    #Batch lookup u kešu; encode() dobija samo jedinstvene tekstove kojih nema u kešu
+
+    if cache is None:
+        with span("embedding"):
+            mat = encode(texts)
+        incr("embedding_texts_total", len(texts), result="encoded")
+        return np.ascontiguousarray(mat, dtype="float32")
+
+    keys = [embedding_key(model_name, t) for t in texts]
+    found = cache.get_many(keys)
+
+    missing: Dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key not in found and key not in missing:
+            missing[key] = text
+
+    incr("embedding_texts_total", len(texts) - len(missing), result="cached")
+    if missing:
+        with span("embedding"):
+            mat = encode(list(missing.values()))
+        incr("embedding_texts_total", len(missing), result="encoded")
+        fresh = {key: row.astype("float32", copy=False) for key, row in zip(missing, mat)}
+        cache.set_many(fresh)
+        found.update(fresh)
+
+    return np.stack([found[k] for k in keys])
+
+
+def cache_from_env() -> Optional["EmbeddingCache"]:   #EMBEDDING_CACHE_ENABLED=0 isključuje keš, EMBEDDING_CACHE_PATH="" disk sloj
+
+    if os.getenv("EMBEDDING_CACHE_ENABLED", "1") != "1":
+        return None
+    return EmbeddingCache(
+        max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000")),
+        path=os.getenv("EMBEDDING_CACHE_PATH", "data/cache/embeddings.sqlite") or None,
+        disk_max_entries=int(os.getenv("EMBEDDING_CACHE_DISK_MAX_ENTRIES", "500000")),
+    )
+
+
+class EmbeddingCache:
+
+    #Thread-safe; get_many/set_many rade sa celim batch-em, da se do modela šalju samo promašaji
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 50_000,
+        path: Optional[str] = None,
+        disk_max_entries: int = 500_000,
+        flush_every: int = 256,
+        flush_seconds: float = 5.0,
+    ) -> None:
+
+        self.max_entries = max_entries
+        self.disk_max_entries = disk_max_entries
+        self.flush_every = max(1, flush_every)
+        self.flush_seconds = flush_seconds
+        self._mem: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        # Još neupisano na disk: novi vektori i ključevi pogođeni sa diska (za last_used)
+        self._pending: Dict[str, bytes] = {}
+        self._touched: set = set()
+        self._last_flush = time.monotonic()
+        self._disk_rows = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            parent = os.path.dirname(path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, "
+                "last_used REAL NOT NULL DEFAULT 0)"
+            )
+            # Stari fajlovi nemaju last_used - takvi redovi se prvi brišu
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(embeddings)")}
+            if "last_used" not in columns:
+                self._db.execute("ALTER TABLE embeddings ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+            self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            self._db.commit()
+            self._disk_rows = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            atexit.register(self.flush)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:   #Samo pronađeni ključevi
+
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            disk_keys: List[str] = []
+            for key in keys:
+                vec = self._mem.get(key)
+                if vec is not None:
+                    self._mem.move_to_end(key)
+                    found[key] = vec
+                    if self._db is not None:
+                        self._touched.add(key)
+                elif key in self._pending:
+                    vec = np.frombuffer(self._pending[key], dtype="float32")
+                    found[key] = vec
+                    self._remember(key, vec)
+                elif key not in found:
+                    disk_keys.append(key)
+
+            if self._db is not None and disk_keys:
+                # SQLite ima ograničen broj parametara po upitu
+                for start in range(0, len(disk_keys), 500):
+                    part = disk_keys[start:start + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})",
+                        part,
+                    ).fetchall()
+                    for key, blob in rows:
+                        vec = np.frombuffer(blob, dtype="float32")
+                        found[key] = vec
+                        self._remember(key, vec)
+                        self._touched.add(key)
+            if self._db is not None:
+                self._maybe_flush()
+
+            self._hits += sum(1 for k in keys if k in found)
+            self._misses += sum(1 for k in keys if k not in found)
+        return found
+
+    def set_many(self, items: Dict[str, np.ndarray]) -> None:
+
+        if not items:
+            return
+        with self._lock:
+            for key, vec in items.items():
+                self._remember(key, np.asarray(vec, dtype="float32"))
+            if self._db is not None:
+                for key, vec in items.items():
+                    self._pending[key] = np.asarray(vec, dtype="float32").tobytes()
+                self._maybe_flush()
+
+    def flush(self) -> None:   #Upisuje sve što čeka na disk jednim commit-om
+
+        with self._lock:
+            self._flush()
+
+    def stats(self) -> Dict[str, float]:
+
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+                "entries": len(self._mem),
+            }
+
+    def close(self) -> None:
+
+        with self._lock:
+            if self._db is not None:
+                self._flush()
+                self._db.close()
+                self._db = None
+        atexit.unregister(self.flush)
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+
+        self._mem[key] = vec
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _maybe_flush(self) -> None:
+
+        # Oznake korišćenja idu uz sledeći upis (ili posle flush_seconds), same ne pokreću commit
+        if (len(self._pending) >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_seconds):
+            self._flush()
+
+    def _flush(self) -> None:   #Poziva se pod self._lock
+
+        self._last_flush = time.monotonic()
+        if self._db is None or not (self._pending or self._touched):
+            return
+
+        now = time.time()
+        touched = [k for k in self._touched if k not in self._pending]
+        with span("embedding_cache_flush"):
+            if self._pending:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                    [(k, blob, now) for k, blob in self._pending.items()],
+                )
+            if touched:
+                self._db.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, k) for k in touched])
+            self._disk_rows += len(self._pending)
+            self._pending.clear()
+            self._touched.clear()
+
+            # INSERT OR REPLACE postojećeg ključa ne povećava broj redova - tačan broj tek kad procena pređe granicu
+            if self._disk_rows > self.disk_max_entries:
+                self._disk_rows = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                extra = self._disk_rows - self.disk_max_entries
+                if extra > 0:
+                    self._db.execute(
+                        "DELETE FROM embeddings WHERE key IN "
+                        "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                        (extra,),
+                    )
+                    self._disk_rows -= extra
+                    incr("embedding_cache_evicted_total", extra)
+            self._db.commit()
@@ -0,0 +1,27 @@
+from __future__ import annotations
+import os
+
+from .base import EmbeddingModel
+from .batching import batching_from_env
+
+
+def get_embedding_model(backend: str | None = None) -> EmbeddingModel:
+
+    #Na osnovu .env bira embedding backend: torch (sentence-transformers) ili onnx (CPU, opciono int8)
+    #EMBEDDING_MICROBATCH=1 dodaje dinamičko batchovanje upita ispred modela (za servis pod konkurentnim opterećenjem)
+
+    backend = backend or os.getenv("EMBEDDING_BACKEND", "torch").lower()
+
+    if backend == "torch":
+        from .local import LocalHFEmbeddingModel
+        return batching_from_env(LocalHFEmbeddingModel())
+    elif backend == "onnx":
+        from .onnx_backend import OnnxEmbeddingModel
+        threads = os.getenv("EMBEDDING_THREADS")
+        return batching_from_env(OnnxEmbeddingModel(
+            os.getenv("ONNX_MODEL_DIR", "data/models/minilm-onnx"),
+            model_file=os.getenv("ONNX_MODEL_FILE", "model_int8.onnx"),
+            num_threads=int(threads) if threads else None,
+        ))
+    else:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND='{backend}', koristi 'torch' ili 'onnx'.")
@@ -1,21 +1,27 @@
 from __future__ import annotations
 from typing import List, Optional
 
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
 from pipeline.embeddings.base import EmbeddingModel
+from pipeline.embeddings.cache import EmbeddingCache, cache_from_env, encode_with_cache
 
 
-class LocalHFEmbeddingModel():
+class LocalHFEmbeddingModel(EmbeddingModel):
 
     #Lokalni embedding model - sentence-transformers, all-MiniLM-L6-v2
 
     def __init__(self, model_name: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
-                 device: Optional[str] = None) -> None:
+                 device: Optional[str] = None,
+                 cache: Optional[EmbeddingCache] = None) -> None:
         
         self._model_name = model_name
         self._model = SentenceTransformer(model_name, device=device)
 
+        # Keš embeddinga - isti tekst (npr. Wikipedia chunk ili nepromenjena PDF stranica) se ne enkodira ponovo
+        self.cache = cache if cache is not None else cache_from_env()
+
         # Jedan probni encode da se dobije dimenzija
         test_vec = self._model.encode("test", convert_to_numpy=True)
         self._dimension = int(test_vec.shape[0])
@@ -24,12 +30,20 @@ class LocalHFEmbeddingModel():
     def dimension(self) -> int:
         return self._dimension
 
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self._model.encode(texts, convert_to_numpy=True, batch_size=32)
+
+    def embed_texts_np(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self._dimension), dtype="float32")
+        return encode_with_cache(self.cache, self._model_name, list(texts), self._encode)
+
     def embed_text(self, text: str) -> List[float]:
-        vec = self._model.encode(text, convert_to_numpy=True)
+        vec = self.embed_texts_np([text])[0]
         return vec.tolist()
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         if not texts:
             return []
-        mat = self._model.encode(texts, convert_to_numpy=True, batch_size=32)
+        mat = self.embed_texts_np(texts)
         return [row.tolist() for row in mat]
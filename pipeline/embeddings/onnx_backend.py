@@ -0,0 +1,278 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from pipeline.embeddings.base import EmbeddingModel
+from pipeline.embeddings.cache import EmbeddingCache, cache_from_env, encode_with_cache
+
+#onnxruntime je opcion - potreban samo za EMBEDDING_BACKEND=onnx
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+#ONNX (fp32 ili int8 dinamički kvantizovan) izvoz istog MiniLM modela, za CPU-only servere
+#
+#Folder modela (export_onnx): tokenizer fajlovi + model.onnx + model_int8.onnx
+#   python -m pipeline.embeddings.onnx_backend export --out data/models/minilm-onnx
+#   python -m pipeline.embeddings.onnx_backend parity --model-dir data/models/minilm-onnx
+#   python -m pipeline.embeddings.onnx_backend bench --model-dir data/models/minilm-onnx
+
+DEFAULT_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+FP32_FILE = "model.onnx"
+INT8_FILE = "model_int8.onnx"
+
+
+class OnnxEmbeddingModel(EmbeddingModel):
+
+    #Isti embedding kao LocalHFEmbeddingModel (mean pooling poslednjeg sloja), ali preko onnxruntime-a
+
+    def __init__(self,
+                 model_dir: str,
+                 *,
+                 model_file: str = INT8_FILE,
+                 num_threads: Optional[int] = None,
+                 max_length: int = 128,
+                 batch_size: int = 32,
+                 cache: Optional[EmbeddingCache] = None) -> None:
+
+        if ort is None:
+            raise RuntimeError("onnxruntime nije instaliran (pip install onnxruntime).")
+
+        from transformers import AutoTokenizer
+
+        self.model_dir = model_dir
+        self.model_file = model_file
+        self.max_length = max_length
+        self.batch_size = batch_size
+
+        opts = ort.SessionOptions()
+        if num_threads:
+            opts.intra_op_num_threads = num_threads
+            opts.inter_op_num_threads = 1
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self._session = ort.InferenceSession(
+            os.path.join(model_dir, model_file), sess_options=opts, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self._session.get_inputs()}
+        self._tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        # fp32 i int8 daju malo različite vektore, pa ključ keša uključuje i fajl modela
+        self._model_name = f"{os.path.basename(os.path.normpath(model_dir))}:{model_file}"
+        self.cache = cache if cache is not None else cache_from_env()
+
+        self._dimension = int(self._encode(["test"]).shape[1])
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+
+        parts: List[np.ndarray] = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            enc = self._tokenizer(
+                batch, padding=True, truncation=True, max_length=self.max_length, return_tensors="np"
+            )
+            feeds = {k: v.astype("int64") for k, v in enc.items() if k in self._input_names}
+            if "token_type_ids" in self._input_names and "token_type_ids" not in feeds:
+                feeds["token_type_ids"] = np.zeros_like(feeds["input_ids"])
+
+            hidden = self._session.run(None, feeds)[0]
+
+            # Mean pooling preko tokena koji nisu padding (isto kao sentence-transformers Pooling sloj)
+            mask = enc["attention_mask"].astype("float32")[..., None]
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            parts.append(pooled.astype("float32", copy=False))
+
+        if not parts:
+            return np.zeros((0, 0), dtype="float32")
+        return np.ascontiguousarray(np.concatenate(parts))
+
+    def embed_texts_np(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self._dimension), dtype="float32")
+        return encode_with_cache(self.cache, self._model_name, list(texts), self._encode)
+
+    def embed_text(self, text: str) -> List[float]:
+        return self.embed_texts_np([text])[0].tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return [row.tolist() for row in self.embed_texts_np(texts)]
+
+
+# Izvoz modela
+
+def export_onnx(model_name: str, out_dir: str, *, quantize: bool = True, opset: int = 17) -> Dict[str, str]:
+    #HF model -> model.onnx (fp32) i, opciono, model_int8.onnx (dinamička int8 kvantizacija težina)
+
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    tokenizer.save_pretrained(out_dir)
+    model = AutoModel.from_pretrained(model_name).eval()
+
+    class _LastHidden(torch.nn.Module):   # ONNX graf vraća samo poslednji sloj; pooling radi OnnxEmbeddingModel
+        def __init__(self, inner: torch.nn.Module) -> None:
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.inner(
+                input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+            ).last_hidden_state
+
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    sample = tokenizer(["primer rečenice za izvoz"], return_tensors="pt")
+    args = tuple(sample.get(n, torch.zeros_like(sample["input_ids"])) for n in names)
+
+    fp32_path = os.path.join(out_dir, FP32_FILE)
+    torch.onnx.export(
+        _LastHidden(model),
+        args,
+        fp32_path,
+        input_names=names,
+        output_names=["last_hidden_state"],
+        dynamic_axes={n: {0: "batch", 1: "seq"} for n in names + ["last_hidden_state"]},
+        opset_version=opset,
+        dynamo=False,
+    )
+    paths = {"fp32": fp32_path}
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        int8_path = os.path.join(out_dir, INT8_FILE)
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        paths["int8"] = int8_path
+
+    return paths
+
+
+# Provera tačnosti i benchmark
+
+PARITY_TEXTS = [
+    "Šta je rekurzija?",
+    "Objasni razliku između steka i reda.",
+    "What is the time complexity of binary search?",
+    "Kako radi gradijentni spust u mašinskom učenju?",
+    "Normalizacija baze podataka - prva, druga i treća normalna forma.",
+    "A hash table maps keys to values using a hash function.",
+    "Dijkstrin algoritam nalazi najkraće puteve u grafu sa nenegativnim težinama.",
+    "TCP garantuje isporuku paketa, UDP ne.",
+]
+
+
+def parity_check(reference: EmbeddingModel,
+                 candidate: EmbeddingModel,
+                 texts: Optional[List[str]] = None,
+                 threshold: float = 0.99) -> Dict[str, float | bool]:
+    #Kosinusna sličnost vektora kandidata i referentnog enkodera, tekst po tekst
+
+    texts = texts or PARITY_TEXTS
+    a = reference.embed_texts_np(texts)
+    b = candidate.embed_texts_np(texts)
+    cos = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1) + 1e-12)
+    return {
+        "min_cosine": float(cos.min()),
+        "mean_cosine": float(cos.mean()),
+        "threshold": threshold,
+        "passed": bool(cos.min() >= threshold),
+    }
+
+
+def benchmark(models: Dict[str, EmbeddingModel],
+              texts: List[str],
+              *,
+              repeats: int = 3,
+              queries: int = 50) -> Dict[str, Dict[str, float]]:
+    #Propusnost batch enkodiranja (tekstova/s) i latencija jednog upita (ms), najbolje od `repeats`
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, model in models.items():
+        cache, model_cache = None, getattr(model, "cache", None)
+        if model_cache is not None:
+            cache, model.cache = model_cache, None   # keš bi merio sebe, ne model
+
+        model.embed_texts_np(texts[:4])   # zagrevanje
+        batch_best = min(_elapsed(model.embed_texts_np, texts) for _ in range(repeats))
+        query_best = min(
+            _elapsed(lambda: [model.embed_texts_np([t]) for t in texts[:queries]]) for _ in range(repeats)
+        )
+        n_queries = min(queries, len(texts))
+
+        results[name] = {
+            "texts_per_sec": len(texts) / batch_best,
+            "query_latency_ms": 1000 * query_best / max(1, n_queries),
+        }
+        if cache is not None:
+            model.cache = cache
+    return results
+
+
+def _elapsed(fn, *args) -> float:
+
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="ONNX embedding backend: izvoz, provera tačnosti i benchmark")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_export = sub.add_parser("export")
+    p_export.add_argument("--model", default=DEFAULT_MODEL)
+    p_export.add_argument("--out", default=os.getenv("ONNX_MODEL_DIR", "data/models/minilm-onnx"))
+    p_export.add_argument("--no-quantize", action="store_true")
+
+    for name in ("parity", "bench"):
+        p = sub.add_parser(name)
+        p.add_argument("--model", default=DEFAULT_MODEL)
+        p.add_argument("--model-dir", default=os.getenv("ONNX_MODEL_DIR", "data/models/minilm-onnx"))
+        p.add_argument("--threads", type=int, default=int(os.getenv("EMBEDDING_THREADS", "0")) or None)
+        p.add_argument("--threshold", type=float, default=0.99)
+        p.add_argument("--n-texts", type=int, default=512)
+
+    args = parser.parse_args()
+
+    if args.cmd == "export":
+        print(json.dumps(export_onnx(args.model, args.out, quantize=not args.no_quantize), indent=2))
+        return
+
+    from pipeline.embeddings.local import LocalHFEmbeddingModel
+
+    reference = LocalHFEmbeddingModel(args.model, device="cpu")
+    candidates = {
+        f: OnnxEmbeddingModel(args.model_dir, model_file=f, num_threads=args.threads)
+        for f in (FP32_FILE, INT8_FILE)
+        if os.path.exists(os.path.join(args.model_dir, f))
+    }
+    for m in candidates.values():
+        m.cache = None
+
+    if args.cmd == "parity":
+        report = {f: parity_check(reference, m, threshold=args.threshold) for f, m in candidates.items()}
+        print(json.dumps(report, indent=2))
+        if not all(r["passed"] for r in report.values()):
+            raise SystemExit(1)
+        return
+
+    texts = [PARITY_TEXTS[i % len(PARITY_TEXTS)] + f" ({i})" for i in range(args.n_texts)]
+    print(json.dumps(benchmark({"torch": reference, **candidates}, texts), indent=2))
+
+
+if __name__ == "__main__":
+    main()
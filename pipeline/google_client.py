@@ -1,28 +1,33 @@
 from __future__ import annotations
 
+import logging
 import os
-from typing import List
+from typing import List, Optional
 
-import requests
 from langchain_core.documents import Document
 
+from pipeline.http_client import HttpTransport, get_default_transport
+
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 #Google custom search klijent
 def load_gcs_results(
     query: str,
     *,
     top_k: int = 5,
     timeout: int = 15,
+    transport: Optional[HttpTransport] = None,
 ) -> List[Document]:
 
     api_key = os.getenv("GOOGLE_API_KEY")
     cse_id = os.getenv("GOOGLE_CSE_ID")
 
     if not api_key or not cse_id:
-        print("[GCS] Missing GOOGLE_API_KEY or GOOGLE_CSE_ID in environment.")
+        logger.debug("[GCS] Missing GOOGLE_API_KEY or GOOGLE_CSE_ID in environment.")
         return []
 
     url = "https://www.googleapis.com/customsearch/v1"
@@ -34,13 +39,13 @@ def load_gcs_results(
     }
 
     try:
-        r = requests.get(url, params=params, timeout=timeout)
+        r = (transport or get_default_transport()).get(url, params=params, timeout=timeout)
     except Exception as e:
-        print(f"[GCS] Request error: {e}")
+        logger.warning("[GCS] Request error: %s", e)
         return []
 
     if r.status_code != 200:
-        print(f"[GCS] HTTP {r.status_code}: {r.text[:300]}")
+        logger.warning("[GCS] HTTP %s: %s", r.status_code, r.text[:300])
         return []
 
     data = r.json()
@@ -60,5 +65,5 @@ def load_gcs_results(
         }
         docs.append(Document(page_content=text, metadata=meta))
 
-    print(f"[GCS] Loaded {len(docs)} documents for query='{query}'")
+    logger.debug("[GCS] Loaded %d documents for query=%r", len(docs), query)
     return docs
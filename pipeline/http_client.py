@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+import threading
+import urllib.parse
+from typing import Any, Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pipeline.metrics import incr
+
+#Zajednički HTTP sloj za sve live klijente (Wikipedia, StackOverflow, OpenAlex, Google)
+#Jedna keep-alive sesija po hostu, pa se TCP+TLS konekcije ponovo koriste između poziva
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HttpTransport:
+
+    #Pool sesija po hostu, sa retry/backoff za 429/5xx i gzip kompresijom
+
+    def __init__(
+        self,
+        *,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_factor: Optional[float] = None,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+    ) -> None:
+
+        self.pool_connections = (
+            pool_connections if pool_connections is not None
+            else int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))
+        )
+        self.pool_maxsize = (
+            pool_maxsize if pool_maxsize is not None
+            else int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+        )
+        self.max_retries = (
+            max_retries if max_retries is not None
+            else int(os.getenv("HTTP_MAX_RETRIES", "2"))
+        )
+        self.backoff_factor = (
+            backoff_factor if backoff_factor is not None
+            else float(os.getenv("HTTP_BACKOFF_FACTOR", "0.3"))
+        )
+        self.retry_statuses = tuple(retry_statuses)
+
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def _build_session(self) -> requests.Session:
+
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.retry_statuses,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,   # klijenti sami proveravaju status_code
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        return session
+
+    def session_for(self, url: str) -> requests.Session:   #Sesija za host iz URL-a, pravi se po potrebi
+
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._build_session()
+                self._sessions[host] = session
+            return session
+
+    def get(
+        self,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 20,
+    ) -> requests.Response:
+
+        resp = self.session_for(url).get(url, params=params, headers=headers, timeout=timeout)
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        incr("http_requests_total", host=host, status=resp.status_code)
+        incr("http_bytes_fetched_total", len(resp.content), host=host)
+        return resp
+
+    def close(self) -> None:
+
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for s in sessions:
+            s.close()
+
+
+_default_transport: Optional[HttpTransport] = None
+_default_lock = threading.Lock()
+
+
+def get_default_transport() -> HttpTransport:   #Deljeni transport za ceo proces
+
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HttpTransport()
+        return _default_transport
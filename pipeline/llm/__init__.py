@@ -1,5 +1,5 @@
 # src/llm_adapters/__init__.py
-from .base import LLMAdapter
+from .base import LLMAdapter, LLMGenerationError
 from .factory import get_llm_adapter
 
-__all__ = ["LLMAdapter", "get_llm_adapter"]
+__all__ = ["LLMAdapter", "LLMGenerationError", "get_llm_adapter"]
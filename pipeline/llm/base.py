@@ -1,6 +1,16 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Iterator, Optional
+
+
+class LLMGenerationError(RuntimeError):
+    #Adapter nije uspeo da generiše odgovor (limit, mreža, timeout); user_message je poruka za korisnika.
+    #Pipeline je prikazuje umesto odgovora, ali je ne pamti u kešu kao da je pravi odgovor
+
+    def __init__(self, user_message: str) -> None:
+        super().__init__(user_message)
+        self.user_message = user_message
+
 
 class LLMAdapter(ABC):
     #Abstraktna klasa za LLM, za lakšu promenu između cloud i lokalnog LLM-a.
@@ -17,3 +27,11 @@ class LLMAdapter(ABC):
         if hasattr(result, "content"):
             return result.content
         return str(result)
+
+    def stream(self, prompt: str) -> Iterator[str]:   #Generator delova odgovora; podrazumevano ceo odgovor odjednom
+
+        yield self.ask(prompt)
+
+    def prompt_token_budget(self) -> Optional[int]:   #Koliko tokena sme da zauzme prompt (kontekst modela minus odgovor); None = bez ograničenja
+
+        return None
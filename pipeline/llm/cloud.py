@@ -1,11 +1,20 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from groq import Groq, RateLimitError
 
-from .base import LLMAdapter
+from .base import LLMAdapter, LLMGenerationError
+
+RATE_LIMIT_MESSAGE = (
+    "Privremeno je dostignut limit cloud LLM servisa. "
+    "Molim te pokušaj ponovo za minut ili prebaci aplikaciju u lokalni režim."
+)
+ERROR_MESSAGE = (
+    "Došlo je do greške pri generisanju odgovora. "
+    "Pokušaj ponovo."
+)
 
 
 class GroqLlamaAdapter(LLMAdapter):
@@ -32,6 +41,9 @@ class GroqLlamaAdapter(LLMAdapter):
             max_new_tokens if max_new_tokens is not None else int(max_tokens_str)
         )
 
+        # Model podržava mnogo duži kontekst, ali je prompt namerno ograničen (latencija i cena rastu linearno)
+        self.num_ctx = int(os.getenv("CLOUD_LLM_NUM_CTX", "8192"))
+
         groq_key = os.getenv("GROQ_API_KEY")
         if not groq_key:
             raise RuntimeError(
@@ -67,16 +79,43 @@ class GroqLlamaAdapter(LLMAdapter):
 
             return str(msg)
 
-        except RateLimitError:
-            return (
-                "Privremeno je dostignut limit cloud LLM servisa. "
-                "Molim te pokušaj ponovo za minut ili prebaci aplikaciju u lokalni režim."
-            )
+        except RateLimitError as e:
+            raise LLMGenerationError(RATE_LIMIT_MESSAGE) from e
 
         except Exception as e:
             # fallback za sve ostalo (network, timeout, itd.)
-            return (
-                "Došlo je do greške pri generisanju odgovora. "
-                "Pokušaj ponovo."
+            raise LLMGenerationError(ERROR_MESSAGE) from e
+
+    def prompt_token_budget(self) -> Optional[int]:
+
+        return max(256, self.num_ctx - self.max_new_tokens)
+
+    def stream(self, prompt: str) -> Iterator[str]:   #Groq chat completions stream, vraća delove odgovora čim stignu
+
+        try:
+            completion = self._client.chat.completions.create(
+                model=self.model,
+                temperature=self.temperature,
+                max_tokens=self.max_new_tokens,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": prompt,
+                    }
+                ],
+                stream=True,
             )
 
+            for chunk in completion:
+                if not chunk.choices:
+                    continue
+                content = getattr(chunk.choices[0].delta, "content", None)
+                if content:
+                    yield content
+
+        except RateLimitError as e:
+            raise LLMGenerationError(RATE_LIMIT_MESSAGE) from e
+
+        except Exception as e:
+            raise LLMGenerationError(ERROR_MESSAGE) from e
+
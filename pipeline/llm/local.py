@@ -1,6 +1,6 @@
 from __future__ import annotations
 import os
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from langchain_ollama import ChatOllama
 
@@ -29,11 +29,15 @@ class OllamaQwenAdapter(LLMAdapter):
         num_ctx_str = os.getenv("LOCAL_LLM_NUM_CTX", "4096")
         self.num_ctx = num_ctx if num_ctx is not None else int(num_ctx_str)
 
+        # Deo konteksta koji ostaje za odgovor - prompt ne sme da ga pojede
+        self.reserved_output_tokens = int(os.getenv("LOCAL_LLM_RESERVED_OUTPUT_TOKENS", "768"))
+
         #ChatOllama instanca
         self._llm = ChatOllama(
             model=self.model_name,
             base_url=self.base_url,
             temperature=self.temperature,
+            num_ctx=self.num_ctx,
         )
 
     def get_model(self) -> Any:    #Raw klijent
@@ -49,3 +53,14 @@ class OllamaQwenAdapter(LLMAdapter):
             return content
 
         return str(result)
+
+    def prompt_token_budget(self) -> Optional[int]:
+
+        return max(256, self.num_ctx - self.reserved_output_tokens)
+
+    def stream(self, prompt: str) -> Iterator[str]:    #Tokeni stižu postepeno sa Ollama servera
+
+        for chunk in self._llm.stream(prompt):
+            content = getattr(chunk, "content", None)
+            if content:
+                yield content
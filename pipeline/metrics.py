@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import bisect
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+#Merenje po fazama pipeline-a: span-ovi (trajanje), brojači (bajtovi, chunkovi, tokeni, keš pogoci)
+#Globalni registar se izvozi u Prometheus tekst formatu (/metrics) ili kao JSON log po zahtevu;
+#RequestTrace skuplja isto to samo za jedan run() (prolazi kroz thread pool preko contextvars)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape_label(value: Any) -> str:   #Escape vrednosti labele po Prometheus text formatu: \\ \" \n
+
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Histogram:
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # poslednji je +Inf
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.n += 1
+
+
+class MetricsRegistry:
+
+    #Thread-safe registar; stage_seconds histogram po fazi + proizvoljni brojači sa labelama
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.enabled = os.getenv("METRICS_ENABLED", "1") == "1"
+        self._hist: Dict[LabelKey, _Histogram] = {}
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, **labels: Any) -> None:
+
+        key = _label_key({"stage": stage, **labels})
+        with self._lock:
+            hist = self._hist.get(key)
+            if hist is None:
+                hist = self._hist[key] = _Histogram(self.buckets)
+            hist.observe(seconds)
+
+    def incr(self, name: str, value: float = 1, **labels: Any) -> None:
+
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self) -> Dict[str, Any]:   #JSON-serijalizabilan pregled (npr. za /metrics.json ili log)
+
+        with self._lock:
+            stages = [
+                {"labels": dict(key), "count": h.n, "sum": h.total}
+                for key, h in self._hist.items()
+            ]
+            counters = [
+                {"name": name, "labels": dict(key), "value": value}
+                for (name, key), value in self._counters.items()
+            ]
+        return {"stages": stages, "counters": counters}
+
+    def render_prometheus(self, prefix: str = "rag_") -> str:
+
+        def fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+            pairs = list(key) + ([extra] if extra else [])
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+        lines: List[str] = []
+        with self._lock:
+            name = f"{prefix}stage_seconds"
+            lines.append(f"# TYPE {name} histogram")
+            for key, h in sorted(self._hist.items()):
+                cumulative = 0
+                for bound, count in zip(list(self.buckets) + [float("inf")], h.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{fmt_labels(key, ('le', le))} {cumulative}")
+                lines.append(f"{name}_sum{fmt_labels(key)} {h.total}")
+                lines.append(f"{name}_count{fmt_labels(key)} {h.n}")
+
+            seen = set()
+            for (cname, key), value in sorted(self._counters.items()):
+                full = f"{prefix}{cname}"
+                if full not in seen:
+                    lines.append(f"# TYPE {full} counter")
+                    seen.add(full)
+                lines.append(f"{full}{fmt_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+
+        with self._lock:
+            self._hist.clear()
+            self._counters.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+
+# Praćenje jednog zahteva
+
+class RequestTrace:
+
+    #Span-ovi i brojači jednog zahteva; deli se između niti istog run()-a
+
+    def __init__(self) -> None:
+        self.spans: List[Dict[str, Any]] = []
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def add_span(self, stage: str, seconds: float, labels: Dict[str, Any]) -> None:
+        with self._lock:
+            self.spans.append({"stage": stage, "seconds": seconds, **labels})
+
+    def add_counter(self, name: str, value: float, labels: Dict[str, Any]) -> None:
+        suffix = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+        key = f"{name}{{{suffix}}}" if suffix else name
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "elapsed": time.perf_counter() - self._start,
+                "spans": list(self.spans),
+                "counters": dict(self.counters),
+            }
+
+
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar(
+    "rag_request_trace", default=None
+)
+
+
+def current_trace() -> Optional[RequestTrace]:
+
+    return _current_trace.get()
+
+
+@contextlib.contextmanager
+def trace_request() -> Iterator[RequestTrace]:
+
+    tr = RequestTrace()
+    token = _current_trace.set(tr)
+    try:
+        yield tr
+    finally:
+        _current_trace.reset(token)
+
+
+def bind_context(fn):   #Za executor.submit - nit nasleđuje trenutni RequestTrace
+
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.run(fn, *args, **kwargs)
+
+
+# API za instrumentaciju
+
+@contextlib.contextmanager
+def span(stage: str, **labels: Any) -> Iterator[None]:
+
+    if not REGISTRY.enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        REGISTRY.observe(stage, elapsed, **labels)
+        tr = _current_trace.get()
+        if tr is not None:
+            tr.add_span(stage, elapsed, labels)
+
+
+def incr(name: str, value: float = 1, **labels: Any) -> None:
+
+    if not REGISTRY.enabled:
+        return
+    REGISTRY.incr(name, value, **labels)
+    tr = _current_trace.get()
+    if tr is not None:
+        tr.add_counter(name, value, labels)
+
+
+_log_lock = threading.Lock()
+
+
+def log_request(record: Dict[str, Any]) -> None:
+    #JSON linija po zahtevu u METRICS_LOG_PATH (ako je zadat)
+
+    path = os.getenv("METRICS_LOG_PATH")
+    if not path:
+        return
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _log_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+# Profilisanje (opciono, po zahtevu)
+
+@contextlib.contextmanager
+def profile_request(mode: Optional[str], name: str = "request") -> Iterator[None]:
+    #mode: "cprofile" -> .prof fajl (snakeviz / pstats), "pyinstrument" -> .html; None = bez profilisanja
+
+    if not mode:
+        yield
+        return
+
+    out_dir = os.getenv("RAG_PROFILE_DIR", "data/profiles")
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.join(out_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**6}")
+
+    if mode == "cprofile":
+        import cProfile
+
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            prof.dump_stats(stem + ".prof")
+            logger.info("cProfile sačuvan: %s.prof", stem)
+
+    elif mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("pyinstrument nije instaliran - profilisanje preskočeno")
+            yield
+            return
+
+        prof = Profiler()
+        prof.start()
+        try:
+            yield
+        finally:
+            prof.stop()
+            with open(stem + ".html", "w", encoding="utf-8") as f:
+                f.write(prof.output_html())
+            logger.info("pyinstrument sačuvan: %s.html", stem)
+
+    else:
+        raise ValueError(f"Unknown profile mode='{mode}', koristi 'cprofile' ili 'pyinstrument'.")
+
+
+# /metrics endpoint (Prometheus scrape)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self) -> None:   # noqa: N802
+        if self.path.startswith("/metrics.json"):
+            body = json.dumps(REGISTRY.snapshot()).encode("utf-8")
+            ctype = "application/json"
+        elif self.path.startswith("/metrics"):
+            body = REGISTRY.render_prometheus().encode("utf-8")
+            ctype = "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(port: Optional[int] = None, host: Optional[str] = None) -> Optional[ThreadingHTTPServer]:
+    #Pokreće /metrics u pozadinskoj niti (jednom po procesu); port iz METRICS_PORT, bez njega ništa
+    #Host iz METRICS_HOST, podrazumevano samo localhost (0.0.0.0 ako scraper nije na istoj mašini)
+
+    global _server
+    if port is None:
+        env_port = os.getenv("METRICS_PORT")
+        if not env_port:
+            return None
+        port = int(env_port)
+    if _server is not None:
+        return _server
+
+    host = host or os.getenv("METRICS_HOST", "127.0.0.1")
+    _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=_server.serve_forever, name="rag-metrics", daemon=True).start()
+    logger.info("Metrics endpoint: http://%s:%d/metrics", host, port)
+    return _server
@@ -2,12 +2,12 @@ from __future__ import annotations
 
 import os
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-import requests
 from langchain_core.documents import Document
 
 from pipeline.common import MIN_CHARS, UA_JSON, clean_text, hash_text
+from pipeline.http_client import HttpTransport, get_default_transport
 
 from dotenv import load_dotenv
 
@@ -32,6 +32,7 @@ def openalex_search(
     *,
     top_k: int = 5,
     timeout: int = 20,
+    transport: Optional[HttpTransport] = None,
 ) -> List[Dict[str, Any]]:    #Vraća listu radova
     
     api = "https://api.openalex.org/works"
@@ -41,7 +42,8 @@ def openalex_search(
     if mailto:
         params["mailto"] = mailto
 
-    r = requests.get(api, params=params, headers=UA_JSON, timeout=timeout)
+    transport = transport or get_default_transport()
+    r = transport.get(api, params=params, headers=UA_JSON, timeout=timeout)
     if r.status_code != 200:
         return []
 
@@ -71,9 +73,10 @@ def load_openalex_by_query(
     *,
     top_k: int = 5,
     timeout: int = 20,
+    transport: Optional[HttpTransport] = None,
 ) -> List[Document]:    #Konvertuje OpenAlex rezultate u dokumente
 
-    recs = openalex_search(query, top_k=top_k, timeout=timeout)
+    recs = openalex_search(query, top_k=top_k, timeout=timeout, transport=transport)
 
     docs: List[Document] = []
     seen = set()
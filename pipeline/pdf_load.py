@@ -1,11 +1,163 @@
 from __future__ import annotations
 
+import json
 import os
+import shutil
 from pathlib import Path
+from typing import Dict, List, Tuple, Any
 from dotenv import load_dotenv
 
 from pipeline.rag_pipeline import RAGPipeline
-from pipeline.pdf_search import load_pdfs
+from pipeline.pdf_search import iter_extracted_pages, MIN_CHARS
+from pipeline.common import hash_text
+from pipeline.retriever.faiss import FaissStore, choose_index_type
+
+CHECKPOINT_FILE = "ingest_checkpoint.json"
+
+#Checkpoint-i se čuvaju u jedan radni folder (prepisuje se u mestu); nova verzija indeksa se objavljuje
+#(publish) samo jednom na kraju - inače bi svaki checkpoint pisao ceo indeks kao novu verziju
+WORK_DIR = "ingest_work"
+
+
+def _file_signature(path: Path, doc_id: str) -> Dict[str, Any]:   #Fajl se smatra istim ako se putanja, doc_id, veličina i mtime poklapaju
+
+    st = path.stat()
+    return {"size": st.st_size, "mtime": st.st_mtime, "doc_id": doc_id}
+
+
+def pdf_doc_id(pdf: Path, pdf_dir: Path) -> str:   #Putanja relativna u odnosu na PDF_DIR - isto ime u dva foldera su dva dokumenta
+
+    return pdf.relative_to(pdf_dir).as_posix()
+
+
+def _load_checkpoint(index_dir: str) -> Dict[str, Dict[str, Any]]:
+
+    path = os.path.join(index_dir, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("done", {})
+
+
+def _save_checkpoint(index_dir: str, done: Dict[str, Dict[str, Any]]) -> None:
+
+    os.makedirs(index_dir, exist_ok=True)
+    path = os.path.join(index_dir, CHECKPOINT_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"done": done}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def ingest_pdf_dir(
+    rag: RAGPipeline,
+    pdf_dir: Path,
+    index_dir: str,
+    *,
+    workers: int | None = None,
+    batch_pages: int = 256,
+    checkpoint_every: int = 2000,
+    publish: bool = True,
+) -> int:
+    #Streaming ingest: stranice stižu iz process pool-a, skupljaju se u velike embedding batch-eve,
+    #a indeks + checkpoint se periodično čuvaju pa se prekinut ingest nastavlja od poslednjeg checkpoint-a
+    #publish=False: pozivalac sam objavljuje indeks (rag.save_index) i briše radni folder (finish_ingest)
+
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+
+    # Prekinut ingest nastavlja od indeksa iz radnog foldera (checkpoint se odnosi na njega, ne na CURRENT)
+    work_dir = os.path.join(index_dir, WORK_DIR)
+    if FaissStore.exists(work_dir):
+        print(f">>> Nastavak prekinutog ingest-a iz {work_dir}")
+        rag.load_index(work_dir)
+
+    done = _load_checkpoint(index_dir)
+    files: List[Path] = []
+    for pdf in sorted(pdf_dir.glob("**/*.pdf")):
+        key = str(pdf.resolve())
+        if done.get(key) == _file_signature(pdf, pdf_doc_id(pdf, pdf_dir)):
+            continue
+        files.append(pdf)
+
+    print(f">>> {len(files)} PDF fajlova za ingest ({len(done)} već završeno ranije)")
+
+    buffer: List[Tuple[str, Dict]] = []
+    buffered_files: List[Tuple[Path, str, str]] = []
+    pages_total = 0
+    pages_since_checkpoint = 0
+
+    def flush() -> None:
+        nonlocal pages_since_checkpoint
+        if buffer:
+            rag.ingest_many(buffer, save=False)
+            buffer.clear()
+        for pdf, doc_id, content_hash in buffered_files:
+            rag.store.set_content_hash(doc_id, content_hash)
+            done[str(pdf.resolve())] = _file_signature(pdf, doc_id)
+        buffered_files.clear()
+        pages_since_checkpoint = 0
+
+    def checkpoint() -> None:
+        flush()
+        rag.store.save(work_dir)
+        _save_checkpoint(index_dir, done)
+
+    for pdf, pages in iter_extracted_pages(files, workers):
+        doc_id = pdf_doc_id(pdf, pdf_dir)
+
+        # Fajl sa istim sadržajem (npr. samo promenjen mtime) se ne indeksira ponovo;
+        # promenjen fajl prvo briše svoje stare chunkove pa se ponovo ingestuje
+        content_hash = hash_text("\n".join(raw for _, raw in pages))
+        if rag.store.is_unchanged(doc_id, content_hash):
+            done[str(pdf.resolve())] = _file_signature(pdf, doc_id)
+            continue
+        rag.store.delete_document(doc_id)
+
+        # Stariji indeksi su PDF iz podfoldera vodili pod samim imenom fajla - ti chunkovi se brišu
+        if doc_id != pdf.name and not (pdf_dir / pdf.name).exists():
+            rag.store.delete_document(pdf.name)
+
+        for page_no, raw in pages:
+            text = raw.strip()
+            if len(text) < MIN_CHARS:
+                continue
+            buffer.append((
+                text,
+                {
+                    "source": "pdf",
+                    "doc_id": doc_id,
+                    "page": page_no,
+                },
+            ))
+            pages_total += 1
+            pages_since_checkpoint += 1
+
+            if len(buffer) >= batch_pages:
+                rag.ingest_many(buffer, save=False)
+                buffer.clear()
+
+        buffered_files.append((pdf, doc_id, content_hash))
+
+        if pages_since_checkpoint >= checkpoint_every:
+            checkpoint()
+            print(f">>> Ingested {pages_total} pages (checkpoint)")
+
+    flush()
+    if publish:
+        rag.save_index()
+        finish_ingest(index_dir, done)
+    else:
+        # Stanje za finish_ingest posle pozivaočevog publish-a
+        checkpoint()
+    return pages_total
+
+
+def finish_ingest(index_dir: str, done: Dict[str, Dict[str, Any]] | None = None) -> None:
+    #Posle objavljene verzije: checkpoint sa završenim fajlovima + brisanje radnog foldera
+
+    if done is not None:
+        _save_checkpoint(index_dir, done)
+    shutil.rmtree(os.path.join(index_dir, WORK_DIR), ignore_errors=True)
 
 
 def main() -> None:
@@ -28,36 +180,36 @@ def main() -> None:
 
     rag = RAGPipeline(index_dir=FAISS_INDEX_DIR)
 
-
-    pdf_docs = load_pdfs(pdf_dir, page_level=True)
-
-    print(f">>> Loaded {len(pdf_docs)} PDF pages")
-
-    if not pdf_docs:
-        print(">>> Nema PDF dokumenata za ingest.")
-        return
-
-    # Ingest svake stranice
-    for i, doc in enumerate(pdf_docs, start=1):
-        source_path = doc.metadata.get("source", "")
-        doc_id = os.path.basename(source_path) if source_path else "unknown_pdf"
-
-        rag.ingest(
-            text=doc.page_content,
-            metadata={
-                "source": "pdf",
-                "doc_id": doc_id,
-                "page": doc.metadata.get("page"),
-            },
-            save=False,   # čuvamo FAISS samo jednom
+    workers = int(os.getenv("PDF_INGEST_WORKERS", str(os.cpu_count() or 1)))
+    batch_pages = int(os.getenv("PDF_INGEST_BATCH_PAGES", "256"))
+    checkpoint_every = int(os.getenv("PDF_INGEST_CHECKPOINT_PAGES", "2000"))
+
+    pages = ingest_pdf_dir(
+        rag,
+        pdf_dir,
+        FAISS_INDEX_DIR,
+        workers=workers,
+        batch_pages=batch_pages,
+        checkpoint_every=checkpoint_every,
+        publish=False,
+    )
+
+    if not pages:
+        print(">>> Nema novih PDF stranica za ingest.")
+
+    # Izbor tipa indeksa (flat / ivf_flat / ivf_pq / hnsw / auto) posle ingest-a
+    index_type = os.getenv("FAISS_INDEX_TYPE", "auto")
+    target = choose_index_type(len(rag.store.metadata)) if index_type == "auto" else index_type
+    if target != rag.store.index_type:
+        print(f">>> Rebuild FAISS indeksa: {rag.store.index_type} -> {target}")
+        rag.store.rebuild_index(
+            target,
+            sample_size=int(os.getenv("FAISS_TRAIN_SAMPLE", "100000")),
         )
 
-        if i % 200 == 0:
-            print(f">>> Ingested {i} pages")
-
-
-    os.makedirs(FAISS_INDEX_DIR, exist_ok=True)
-    rag.store.save(FAISS_INDEX_DIR)
+    # Jedna nova verzija indeksa po ingest-u (posle eventualnog rebuild-a)
+    rag.save_index()
+    finish_ingest(FAISS_INDEX_DIR)
 
     print(">>> PDF INGEST ZAVRŠEN")
     print(f">>> FAISS index sačuvan u: {FAISS_INDEX_DIR}")
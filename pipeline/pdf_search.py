@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import json
 import os
+import sqlite3
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from langchain_core.documents import Document
 from pypdf import PdfReader
@@ -12,41 +18,185 @@ from pipeline.common import tokenize_query
 MIN_CHARS = 50  
 
 #Pretraživač PDF fajlova
+def extract_pdf_pages(pdf: str | Path) -> List[Tuple[int, str]]:
+    #Tekst svih stranica jednog PDF-a kao (broj_stranice, tekst); top-level da bi radilo i u process pool-u
 
-def load_pdfs(root: str | Path, page_level: bool = True, dedup: bool = True) -> List[Document]:
-    root = Path(root)
-    docs: List[Document] = []
-    seen = set()
+    try:
+        reader = PdfReader(str(pdf))
+    except Exception:
+        return []
 
-    for pdf in root.glob("**/*.pdf"):
+    pages: List[Tuple[int, str]] = []
+    for i, page in enumerate(reader.pages, 1):
         try:
-            reader = PdfReader(str(pdf))
+            text = page.extract_text() or ""
         except Exception:
-            continue
-
-        if page_level:
-            for i, page in enumerate(reader.pages, 1):
-                text = (page.extract_text() or "").strip()
-                if len(text) < MIN_CHARS:
-                    continue
-                docs.append(
-                    Document(
-                        page_content=text,
-                        metadata={"type": "pdf", "source": str(pdf.resolve()), "page": i},
-                    )
-                )
-        else:
-            text = "\n\n".join((p.extract_text() or "") for p in reader.pages)
-            text = text.strip()
-            if len(text) >= MIN_CHARS:
-                docs.append(
-                    Document(
-                        page_content=text,
-                        metadata={"type": "pdf", "source": str(pdf.resolve())},
-                    )
+            text = ""
+        pages.append((i, text))
+    return pages
+
+
+def iter_extracted_pages(
+    files: List[Path],
+    workers: int = 1,
+) -> Iterator[Tuple[Path, List[Tuple[int, str]]]]:
+    #PDF-ovi se parsiraju u process pool-u; najviše 2*workers fajlova je "u letu" da memorija ostane ograničena
+
+    if workers <= 1:
+        for pdf in files:
+            yield pdf, extract_pdf_pages(pdf)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: "deque[Tuple[Path, Future]]" = deque()
+        it = iter(files)
+
+        for pdf in it:
+            pending.append((pdf, pool.submit(extract_pdf_pages, pdf)))
+            if len(pending) >= 2 * workers:
+                break
+
+        while pending:
+            pdf, fut = pending.popleft()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append((nxt, pool.submit(extract_pdf_pages, nxt)))
+            yield pdf, fut.result()
+
+
+class PdfTextCache:
+
+    #Keš izvučenog teksta po PDF fajlu, ključ (apsolutna putanja, veličina, mtime)
+    #Memorijski sloj za ceo proces + SQLite fajl (zlib kompresovane stranice) da preživi restart
+
+    def __init__(self, path: Optional[str] = None) -> None:
+
+        self._mem: Dict[str, Tuple[Tuple[int, int], List[Tuple[int, str]]]] = {}
+        self._lock = threading.Lock()
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            parent = os.path.dirname(path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pdf_pages ("
+                "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+                "pages BLOB NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def signature(pdf: Path) -> Tuple[int, int]:
+
+        st = pdf.stat()
+        return st.st_size, st.st_mtime_ns
+
+    def get(self, pdf: Path) -> Optional[List[Tuple[int, str]]]:   #None ako fajl nije keširan ili je promenjen
+
+        key = str(pdf.resolve())
+        sig = self.signature(pdf)
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None and entry[0] == sig:
+                return entry[1]
+
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT size, mtime_ns, pages FROM pdf_pages WHERE path = ?", (key,)
+            ).fetchone()
+            if row is None or (row[0], row[1]) != sig:
+                return None
+
+            pages = [(int(i), t) for i, t in json.loads(zlib.decompress(row[2]).decode("utf-8"))]
+            self._mem[key] = (sig, pages)
+            return pages
+
+    def set(self, pdf: Path, pages: List[Tuple[int, str]]) -> None:
+
+        key = str(pdf.resolve())
+        sig = self.signature(pdf)
+        with self._lock:
+            self._mem[key] = (sig, pages)
+            if self._db is not None:
+                blob = zlib.compress(json.dumps(pages, ensure_ascii=False).encode("utf-8"))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO pdf_pages (path, size, mtime_ns, pages) VALUES (?, ?, ?, ?)",
+                    (key, sig[0], sig[1], blob),
                 )
+                self._db.commit()
+
+    def close(self) -> None:
+
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_default_cache: Optional[PdfTextCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_pdf_cache() -> PdfTextCache:   #Deljeni keš za ceo proces; PDF_TEXT_CACHE_PATH="" isključuje disk
+
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            path = os.getenv("PDF_TEXT_CACHE_PATH", "data/cache/pdf_text_cache.sqlite")
+            _default_cache = PdfTextCache(path or None)
+        return _default_cache
+
+
+def _page_docs(pdf: Path, pages: List[Tuple[int, str]], page_level: bool) -> Iterator[Document]:
 
-    return docs
+    source = str(pdf.resolve())
+    if page_level:
+        for i, raw in pages:
+            text = raw.strip()
+            if len(text) < MIN_CHARS:
+                continue
+            yield Document(
+                page_content=text,
+                metadata={"type": "pdf", "source": source, "page": i},
+            )
+    else:
+        text = "\n\n".join(raw for _, raw in pages)
+        text = text.strip()
+        if len(text) >= MIN_CHARS:
+            yield Document(
+                page_content=text,
+                metadata={"type": "pdf", "source": source},
+            )
+
+
+def load_pdfs(
+    root: str | Path,
+    page_level: bool = True,
+    dedup: bool = True,
+    *,
+    cache: Optional[PdfTextCache] = None,
+    workers: Optional[int] = None,
+) -> Iterator[Document]:
+    #Lenji generator: nepromenjeni fajlovi dolaze iz keša, a samo novi/promenjeni se parsiraju (opciono u process pool-u)
+
+    root = Path(root)
+    cache = cache if cache is not None else get_default_pdf_cache()
+    workers = workers if workers is not None else int(os.getenv("PDF_TEXT_WORKERS", "1"))
+
+    changed: List[Path] = []
+    for pdf in root.glob("**/*.pdf"):
+        pages = cache.get(pdf)
+        if pages is None:
+            changed.append(pdf)
+            continue
+        yield from _page_docs(pdf, pages, page_level)
+
+    for pdf, pages in iter_extracted_pages(changed, workers):
+        cache.set(pdf, pages)
+        yield from _page_docs(pdf, pages, page_level)
 
 def search_local_pdfs_by_keywords(
     pdf_dir: str | Path | None,
@@ -64,14 +214,12 @@ def search_local_pdfs_by_keywords(
 
     pdf_dir = Path(pdf_dir)
 
-    docs = load_pdfs(pdf_dir, page_level=page_level, dedup=True)
-    if not docs:
-        return []
-
     terms = tokenize_query(query)
     if not terms:
         return []
 
+    docs = load_pdfs(pdf_dir, page_level=page_level, dedup=True)
+
     scored: List[Tuple[float, Document]] = []
     for d in docs:
         text = (d.page_content or "").lower()
@@ -1,8 +1,94 @@
 from __future__ import annotations
-from typing import Any
+import logging
+from typing import Any, Optional
+
+from pipeline.common import tokenize_query
+from pipeline.cache import TTLCache, make_key, normalize_query
+from pipeline.llm.base import LLMGenerationError
+from pipeline.metrics import incr
+
+logger = logging.getLogger(__name__)
+
+BYPASS_MAX_TOKENS = 4
+BYPASS_MIN_ASCII_RATIO = 0.98
+
+#Samo ASCII nije dovoljno - srpski se često piše bez dijakritika ("Sta je rekurzija", "Prvi svetski rat").
+#Fraza se preskače samo ako nema srpskih reči/nastavaka I ima bar jedan znak da je engleska
+#(reči koje postoje u oba jezika - "to", "do", "a" - nisu u srpskoj listi)
+SERBIAN_WORDS = frozenset("""
+    sta sto je su da li ne nije kako zasto kada kad gde koji koja koje kojim cime cemu
+    u i ili od za na se sa iz po pri kroz pod nad izmedju bez prema kod uz
+    objasni objasniti opisi navedi uporedi definisi razlika razlike primer primeri
+    prvi drugi treci cetvrti peti sve svi ovo ono taj ta mi ti vi oni
+""".split())
+SERBIAN_SUFFIXES = ("ija", "iju", "ije", "ijom", "ski", "ska", "sko", "skog", "ckog", "ckih", "ost", "osti", "anje", "enje")
+
+#Engleske funkcijske/česte reči i obrasci kojih nema u srpskoj latinici (q, w, x, y, th, sh, ch)
+ENGLISH_WORDS = frozenset("""
+    the of and or in on for to with without by from vs versus how what why when which
+    use uses used cases case example examples introduction basics overview difference between
+    a an is are does best practice practices
+""".split())
+ENGLISH_SUFFIXES = ("ing", "tion", "tions", "ness", "ity", "ics", "ous")
+ENGLISH_MARKERS = ("q", "w", "x", "y", "th", "sh", "ch")
+
+
+def _looks_serbian(token: str) -> bool:
+
+    return token in SERBIAN_WORDS or (len(token) > 4 and token.endswith(SERBIAN_SUFFIXES))
+
+
+def _looks_english(token: str) -> bool:
+
+    return (
+        token in ENGLISH_WORDS
+        or (len(token) > 4 and token.endswith(ENGLISH_SUFFIXES))
+        or any(m in token for m in ENGLISH_MARKERS)
+    )
+
+
+def is_short_english_phrase(question: str) -> bool:   #Kratka fraza na engleskom je već dobar search upit, LLM nije potreban
+
+    q = (question or "").strip()
+    if not q or q.endswith("?"):
+        return False
+
+    tokens = tokenize_query(q)
+    if not tokens or len(tokens) > BYPASS_MAX_TOKENS:
+        return False
+
+    letters = [c for c in q if c.isalpha()]
+    if not letters:
+        return False
+    ascii_ratio = sum(1 for c in letters if c.isascii()) / len(letters)
+    if ascii_ratio < BYPASS_MIN_ASCII_RATIO:
+        return False
+
+    if any(_looks_serbian(t) for t in tokens):
+        return False
+    return any(_looks_english(t) for t in tokens)
+
+
+def _llm_model_name(llm: Any) -> str:
+
+    return str(getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__)
+
 
 #LLM za kreiranje upita na engleskom za klijente za pretraživanje
-def rewrite_query_for_search(llm: Any, question: str) -> str:
+def rewrite_query_for_search(llm: Any, question: str, cache: Optional[TTLCache] = None) -> str:
+
+    if is_short_english_phrase(question):
+        logger.debug("[REWRITE] bypass (short English phrase): %s", question.strip())
+        incr("rewrite_total", result="bypass")
+        return question.strip()
+
+    key = make_key(normalize_query(question), _llm_model_name(llm))
+    if cache is not None:
+        cached = cache.get("rewrite", key)
+        if cached is not None:
+            logger.debug("[REWRITE] cache hit: %s", cached)
+            incr("rewrite_total", result="cache_hit")
+            return cached
 
     prompt = f"""
         You are a search query rewriting assistant.
@@ -37,7 +123,11 @@ def rewrite_query_for_search(llm: Any, question: str) -> str:
         A:
         """.strip()
 
-    raw = llm.generate(prompt)
+    try:
+        raw = llm.generate(prompt)
+    except LLMGenerationError:   #Greška (npr. rate limit) se ne kešira - sledeći put se pokušava ponovo
+        incr("rewrite_total", result="error")
+        return question.strip()
     if not raw:  #Ako LLM ne radi, da koristi originalno pitanje
         return question.strip()
 
@@ -50,7 +140,10 @@ def rewrite_query_for_search(llm: Any, question: str) -> str:
     if len(parts) > 20:
         first_line = " ".join(parts[:20])
 
-    print(f">>> [REWRITE] Q: {question}")
-    print(f">>> [REWRITE] search_query (EN): {first_line}")
+    logger.debug("[REWRITE] Q: %s -> search_query (EN): %s", question, first_line)
+    incr("rewrite_total", result="llm")
+
+    if cache is not None:
+        cache.set("rewrite", key, first_line)
 
     return first_line
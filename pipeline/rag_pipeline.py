@@ -1,6 +1,11 @@
 from __future__ import annotations
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Tuple, Optional, Any, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import logging
 import os
+import threading
+import time
 
 #Ukoliko ima nepoklapanja u LLM verzijma
 try:
@@ -10,11 +15,23 @@ except ImportError:
 
 from .search_everywhere import search_everywhere
 from .chunking import chunk_documents
-from pipeline.embeddings.local import LocalHFEmbeddingModel
-from .retriever.faiss import FaissStore, IndexedDocument
+from pipeline.embeddings.factory import get_embedding_model
+from .retriever.faiss import FaissStore, IndexedDocument, current_version
 from .context_formatter import build_prompt
 from pipeline.llm.factory import get_llm_adapter
+from pipeline.llm.base import LLMGenerationError
 from .query_rewriter import rewrite_query_for_search
+from .http_client import get_default_transport
+from .cache import TTLCache
+from .common import hash_text
+from .rerank.base import Reranker, select_top
+from .semantic_cache import SemanticCache
+from .context_formatter import count_tokens
+from .metrics import (
+    bind_context, incr, log_request, profile_request, span, start_metrics_server, trace_request,
+)
+
+logger = logging.getLogger(__name__)
 
 #Ceo RAG spojen
 class RAGPipeline:
@@ -22,33 +39,164 @@ class RAGPipeline:
 
         self.llm = get_llm_adapter()
 
-        self.embedding_model = LocalHFEmbeddingModel()
+        self.embedding_model = get_embedding_model()
 
         self.index_dir = index_dir or os.getenv("FAISS_INDEX_DIR", "data/faiss_index")
 
-        index_path = os.path.join(self.index_dir, "index.faiss")
-        meta_path = os.path.join(self.index_dir, "metadata.jsonl")
+        # Zajednički rok (u sekundama) za paralelnu pretragu svih live izvora
+        self.live_search_deadline = float(os.getenv("LIVE_SEARCH_DEADLINE", "20"))
 
-        if os.path.exists(index_path) and os.path.exists(meta_path):
-            print(f">>> [FAISS] Loading existing index from: {self.index_dir}")
-            self.store = FaissStore.load(self.index_dir, embedding_model=self.embedding_model)
+        # Deljene keep-alive HTTP sesije za sve live klijente
+        self.transport = get_default_transport()
+
+        # Keš live rezultata, čuva se i na disku između restartova
+        self.live_cache = TTLCache(
+            max_entries=int(os.getenv("LIVE_CACHE_MAX_ENTRIES", "1024")),
+            path=os.getenv("LIVE_CACHE_PATH", "data/cache/live_cache.sqlite") or None,
+        )
+
+        # Keš prepisanih upita (pitanje + model -> search upit); na disku samo ako je REWRITE_CACHE_PATH zadat
+        self.rewrite_cache = TTLCache(
+            max_entries=int(os.getenv("REWRITE_CACHE_MAX_ENTRIES", "4096")),
+            path=os.getenv("REWRITE_CACHE_PATH") or None,
+        )
+
+        # Pool za paralelne faze run() - FAISS pretraga ide uporedo sa rewrite + live pretragom
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("RAG_STAGE_WORKERS", "4")),
+            thread_name_prefix="rag-stage",
+        )
+
+        # FAISS_MMAP=1: indeks se mmap-uje (read-only) i deli između worker procesa preko page cache-a
+        self.index_mmap = os.getenv("FAISS_MMAP", "0") == "1"
+        self.index_reload_interval = float(os.getenv("FAISS_RELOAD_INTERVAL", "5"))
+        self._reload_lock = threading.Lock()
+        self._last_reload_check = time.monotonic()
+
+        # Opcioni reader-writer lock (npr. iz pipeline.service) - drži se samo oko pretrage indeksa,
+        # ne oko rewrite-a i live izvora, pa ingest ne čeka najsporiji upit u toku
+        self.index_lock: Optional[Any] = None
+
+        # RETRIEVAL_MODE: "hybrid" (FAISS + BM25, spojeno sa HYBRID_FUSION = rrf | weighted) ili "dense" (samo FAISS)
+        self.retrieval_mode = os.getenv("RETRIEVAL_MODE", "hybrid")
+        self.hybrid_fusion = os.getenv("HYBRID_FUSION", "rrf")
+        self.hybrid_alpha = float(os.getenv("HYBRID_ALPHA", "0.5"))
+
+        # Rerank: cross-encoder bira najbolje chunkove iz live + FAISS kandidata (RERANK_ENABLED=1 uključuje).
+        # Podrazumevano isključen: menja koji kontekst ide LLM-u i dodaje L12 cross-encoder prolaz po upitu -
+        # uključiti tek uz merenje (benchmarks) na svojim upitima
+        self.reranker: Optional[Reranker] = None
+        if os.getenv("RERANK_ENABLED", "0") == "1":
+            from pipeline.rerank.local import LocalCrossEncoderReranker
+            self.reranker = LocalCrossEncoderReranker(
+                os.getenv("RERANK_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"),
+                batch_size=int(os.getenv("RERANK_BATCH_SIZE", "32")),
+            )
+        self.rerank_candidates = int(os.getenv("RERANK_CANDIDATES", "20"))
+        self.rerank_top_n = int(os.getenv("RERANK_TOP_N", "4"))
+        self.rerank_token_budget = int(os.getenv("RERANK_TOKEN_BUDGET", "1500"))
+        self.rerank_cache = TTLCache(max_entries=int(os.getenv("RERANK_CACHE_MAX_ENTRIES", "20000")))
+
+        # Semantički keš odgovora ispred run(); pogodak preskače rewrite, live pretragu i generisanje.
+        # Podrazumevano isključen: pitanja koja se razlikuju u jednoj reči ("Prvi"/"Drugi svetski rat")
+        # mogu da pređu prag sličnosti - uključiti (SEMANTIC_CACHE_ENABLED=1) tek uz prag proveren na svojim upitima
+        self.semantic_cache: Optional[SemanticCache] = None
+        if os.getenv("SEMANTIC_CACHE_ENABLED", "0") == "1":
+            self.semantic_cache = SemanticCache(
+                self.embedding_model,
+                threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9")),
+                ttl=float(os.getenv("SEMANTIC_CACHE_TTL", str(24 * 3600))),
+                max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000")),
+            )
+
+        # Merenje: /metrics na METRICS_PORT, JSON log po zahtevu u METRICS_LOG_PATH,
+        # RAG_PROFILE=cprofile|pyinstrument profiliše svaki run() (ili run(profile=...) za jedan zahtev)
+        start_metrics_server()
+        self.profile_mode = os.getenv("RAG_PROFILE") or None
+
+        self._index_version = current_version(self.index_dir)
+        if FaissStore.exists(self.index_dir):
+            logger.info("[FAISS] Loading existing index from: %s", self.index_dir)
+            self.store = self._load_store()
         else:
-            print(f">>> [FAISS] Creating NEW empty index in: {self.index_dir}")
+            logger.info("[FAISS] Creating NEW empty index in: %s", self.index_dir)
             self.store = FaissStore(embedding_model=self.embedding_model)
+            self._apply_search_params(self.store)
+
+
+    def _apply_search_params(self, store: FaissStore) -> None:
+        # Parametri pretrage za ANN indekse (IVF nprobe / HNSW efSearch); bez FAISS_NPROBE IVF koristi default_nprobe(nlist)
+        nprobe = os.getenv("FAISS_NPROBE")
+        ef_search = os.getenv("FAISS_EF_SEARCH")
+        store.nprobe = int(nprobe) if nprobe else None
+        store.ef_search = int(ef_search) if ef_search else None
+
+    def _load_store(self) -> FaissStore:
+        store = FaissStore.load(self.index_dir, embedding_model=self.embedding_model, mmap=self.index_mmap)
+        self._apply_search_params(store)
+        return store
+
+
+    # Čuvanje i hot-reload indeksa
+    def load_index(self, dir_path: str) -> None:   #Zamenjuje store (izmenljivim) indeksom iz zadatog foldera, npr. radnog foldera ingest-a
+        self.store = FaissStore.load(dir_path, embedding_model=self.embedding_model)
+        self._apply_search_params(self.store)
+
+    def save_index(self) -> None:
+        #Nova verzija indeksa se objavljuje atomično (CURRENT), pa je drugi procesi preuzimaju bez restarta
+        self._index_version = self.store.publish(self.index_dir)
+        self.invalidate_answers()
+
+    def reload_index_if_changed(self, force: bool = False) -> bool:
+        #Proverava CURRENT najviše jednom u index_reload_interval sekundi; ako je objavljena nova verzija,
+        #učitava je i zamenjuje self.store jednom dodelom - upiti koji su u toku završavaju sa starim indeksom
+        now = time.monotonic()
+        if not force and now - self._last_reload_check < self.index_reload_interval:
+            return False
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self._last_reload_check = now
+            version = current_version(self.index_dir)
+            if version is None or version == self._index_version:
+                return False
+
+            logger.info("[FAISS] Hot-reload index version: %s -> %s", self._index_version, version)
+            self.store = self._load_store()
+            self._index_version = version
+            self.invalidate_answers()
+            return True
+        finally:
+            self._reload_lock.release()
+
+
+    # Semantički keš odgovora
+    def invalidate_answers(self) -> None:
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
+
+    def _cached_answer(self, query: str, timings: Dict[str, float]) -> Optional[Dict]:
+        if self.semantic_cache is None:
+            return None
+        start = time.perf_counter()
+        cached = self.semantic_cache.lookup(query)
+        timings["semantic_cache"] = time.perf_counter() - start
+        if cached is not None:
+            logger.info("[SEMANTIC CACHE] hit: %r ~ %r", query, cached["cache"]["matched_query"])
+        return cached
+
+    def remember_answer(self, query: str, result: Dict) -> None:
+        #Pamti se samo uspešno generisan odgovor - poruka o grešci LLM-a ("error") nikad ne ide u keš
+        if self.semantic_cache is None or not result.get("final_answer") or result.get("error"):
+            return
+        self.semantic_cache.store(query, {k: v for k, v in result.items() if k != "timings"})
 
 
-    def ingest(
-        self,
-        text: str,
-        metadata: Dict | None = None,
-        save: bool = True,
-    ) -> None:
+    def _chunk_for_index(self, text: str, metadata: Dict | None = None) -> List[IndexedDocument]:
         meta = metadata or {}
         base_doc = Document(page_content=text, metadata=meta)
 
         chunked_docs: List[Document] = chunk_documents([base_doc])
-        if not chunked_docs:
-            return
 
         indexed_chunks: List[IndexedDocument] = []
         for i, ch in enumerate(chunked_docs):
@@ -74,43 +222,191 @@ class RAGPipeline:
                 )
             )
 
-        self.store.add_chunks(indexed_chunks)
+        return indexed_chunks
+
+
+    def ingest(
+        self,
+        text: str,
+        metadata: Dict | None = None,
+        save: bool = True,
+    ) -> None:
+        self.ingest_many([(text, metadata)], save=save)
+
+
+    def ingest_many(
+        self,
+        items: List[Tuple[str, Dict | None]],
+        save: bool = True,
+    ) -> int:
+        #Više tekstova odjednom - svi chunkovi idu u jedan veliki embedding batch
+        indexed_chunks: List[IndexedDocument] = []
+        for text, metadata in items:
+            indexed_chunks.extend(self._chunk_for_index(text, metadata))
+
+        if indexed_chunks:
+            self.store.add_chunks(indexed_chunks)
+
+        if save and indexed_chunks:
+            self.save_index()
+
+        return len(indexed_chunks)
+
+
+    def upsert_document(
+        self,
+        doc_id: str,
+        text: str,
+        metadata: Dict | None = None,
+        save: bool = True,
+    ) -> bool:
+        #Zamenjuje ceo dokument u indeksu; ako je hash sadržaja isti, ništa se ne radi
+        content_hash = hash_text(text)
+        if self.store.is_unchanged(doc_id, content_hash):
+            return False
+
+        chunks = self._chunk_for_index(text, {**(metadata or {}), "doc_id": doc_id})
+        self.store.upsert_document(doc_id, chunks, content_hash=content_hash)
 
         if save:
-            os.makedirs(self.index_dir, exist_ok=True)
-            self.store.save(self.index_dir)
+            self.save_index()
+        return True
 
 
-    # API pretraga
-    def search_live_sources(self, query: str, limit: int = 5):
+    def delete_document(self, doc_id: str, save: bool = True) -> int:
+        removed = self.store.delete_document(doc_id)
 
-        search_query = rewrite_query_for_search(self.llm, query)
+        if save and removed:
+            self.save_index()
+        return removed
 
-        print(f">>> [LIVE SEARCH] original question: {query}")
-        print(f">>> [LIVE SEARCH] rewritten search query in english: {search_query}")
 
-        results = search_everywhere(
-            query=search_query,
-            lang="en",
-            limits={"wikipedia": limit},
-            timeout=20,
-        )
+    # API pretraga
+    def search_live_sources(
+        self,
+        query: str,
+        limit: int = 5,
+        return_status: bool = False,
+        timings: Dict[str, float] | None = None,
+    ):
+
+        start = time.perf_counter()
+        with span("rewrite"):
+            search_query = rewrite_query_for_search(self.llm, query, cache=self.rewrite_cache)
+        rewrite_elapsed = time.perf_counter() - start
+        if timings is not None:
+            timings["rewrite"] = rewrite_elapsed
+
+        logger.info("[LIVE SEARCH] %r -> search query (EN): %r", query, search_query)
+
+        with span("live_search"):
+            results, status = search_everywhere(
+                query=search_query,
+                lang="en",
+                limits={"wikipedia": limit},
+                timeout=20,
+                deadline=self.live_search_deadline,
+                return_status=True,
+                transport=self.transport,
+                cache=self.live_cache,
+            )
+        if timings is not None:
+            timings["live_search"] = time.perf_counter() - start - rewrite_elapsed
 
-        wiki_docs = results.get("wikipedia", [])
-        print(f">>> [LIVE SEARCH] wikipedia docs count: {len(wiki_docs)}")
+        for source, st in status.items():
+            logger.debug("[LIVE SEARCH] %s: %s (%.2fs, %d docs)", source, st["status"], st["elapsed"], st["count"])
 
+        if return_status:
+            return results, status
         return results
 
 
     # FAISS 
-    def retrieve_context(self, query: str, top_k: int = 5) -> List[Tuple[IndexedDocument, float]]:
-        return self.store.search(query, top_k=top_k)
+    #Rezultat je (chunk, L2 rastojanje, fuzionisani skor): u dense režimu skor je None,
+    #a u hybrid režimu rastojanje je None za chunk koji je našao samo BM25
+    def _index_read(self) -> contextlib.AbstractContextManager:
+        return self.index_lock.read() if self.index_lock is not None else contextlib.nullcontext()
+
+    def retrieve_context(self, query: str, top_k: int = 5) -> List[Tuple[IndexedDocument, Optional[float], Optional[float]]]:
+        with self._index_read():
+            if self.retrieval_mode == "hybrid":
+                hits = self.store.hybrid_search(
+                    query, top_k=top_k, fusion=self.hybrid_fusion, alpha=self.hybrid_alpha, with_distance=True
+                )
+                return [(doc, dist, score) for doc, score, dist in hits]
+            return [(doc, dist, None) for doc, dist in self.store.search(query, top_k=top_k)]
+
+    def retrieve_context_batch(self, queries: List[str], top_k: int = 5) -> List[List[Tuple[IndexedDocument, Optional[float], Optional[float]]]]:
+        with self._index_read():
+            if self.retrieval_mode == "hybrid":
+                batch = self.store.hybrid_search_batch(
+                    queries, top_k=top_k, fusion=self.hybrid_fusion, alpha=self.hybrid_alpha, with_distance=True
+                )
+                return [[(doc, dist, score) for doc, score, dist in hits] for hits in batch]
+            return [[(doc, dist, None) for doc, dist in hits] for hits in self.store.search_batch(queries, top_k=top_k)]
 
 
-    # LLM generisanje
-    def generate(self, query: str, context_blocks: List[str]) -> str:
-        print(">>> [DEBUG] generate() pozvan, context_blocks:", len(context_blocks))
+    def _faiss_k(self, top_k: int) -> int:
+        #Sa rerank-om FAISS vraća više kandidata, pa reranker bira najbolje
+        if self.reranker is None:
+            return top_k
+        return max(top_k, self.rerank_candidates // 2)
+
+    def select_context(
+        self,
+        query: str,
+        live_context: List[str],
+        faiss_context: List[str],
+        timings: Dict[str, float] | None = None,
+    ) -> List[str]:
+        #Bez rerankera: prva 2 live + prva 2 FAISS chunka; sa rerankerom: najbolji po skoru u okviru budžeta tokena
+        if self.reranker is None:
+            return live_context[:2] + faiss_context[:2]
+
+        # Kandidati naizmenično iz oba izvora, da nijedan ne istisne drugi iz pool-a
+        candidates: List[str] = []
+        seen = set()
+        for i in range(max(len(live_context), len(faiss_context))):
+            for ctx in (live_context, faiss_context):
+                if i < len(ctx) and ctx[i] not in seen:
+                    seen.add(ctx[i])
+                    candidates.append(ctx[i])
+        candidates = candidates[:self.rerank_candidates]
+
+        start = time.perf_counter()
+        with span("rerank"):
+            scores = self.reranker.score(query, candidates, cache=self.rerank_cache)
+            selected = select_top(
+                candidates, scores, top_n=self.rerank_top_n, token_budget=self.rerank_token_budget
+            )
+        if timings is not None:
+            timings["rerank"] = time.perf_counter() - start
+
+        incr("rerank_candidates_total", len(candidates))
+        logger.debug("[RERANK] %d kandidata -> %d u kontekstu", len(candidates), len(selected))
+        return [text for text, _ in selected]
+
+
+    @staticmethod
+    def _timed(timings: Dict[str, float], stage: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        try:
+            with span(stage):
+                return fn(*args, **kwargs)
+        finally:
+            timings[stage] = time.perf_counter() - start
+
 
+    # LLM generisanje
+    def _prompt_token_budget(self) -> Optional[int]:
+        #PROMPT_TOKEN_BUDGET ima prednost; inače budžet zavisi od modela (kontekst minus rezerva za odgovor)
+        env_budget = os.getenv("PROMPT_TOKEN_BUDGET")
+        if env_budget:
+            return int(env_budget)
+        budget_fn = getattr(self.llm, "prompt_token_budget", None)
+        return budget_fn() if callable(budget_fn) else None
+
+    def _build_generation_prompt(self, query: str, context_blocks: List[str]) -> str:
         chunk_dicts = [
             {
                 "text": text,
@@ -120,7 +416,12 @@ class RAGPipeline:
             for text in context_blocks
         ]
 
-        prompt = build_prompt(query, chunk_dicts)
+        return build_prompt(query, chunk_dicts, max_prompt_tokens=self._prompt_token_budget())
+
+    def generate(self, query: str, context_blocks: List[str]) -> str:
+        logger.debug("generate(): %d context blokova", len(context_blocks))
+
+        prompt = self._build_generation_prompt(query, context_blocks)
 
         llm: Any = self.llm
         if hasattr(llm, "generate") and callable(getattr(llm, "generate")):
@@ -135,12 +436,60 @@ class RAGPipeline:
             f"nema ni .generate(), ni .invoke(), ni __call__."
         )
 
+    def generate_stream(self, query: str, context_blocks: List[str]) -> Iterator[str]:
+        #Isto kao generate(), ali vraća delove odgovora čim ih LLM proizvede
 
-    # Glavni RAG pipeline
-    # ----------------------------------------------------------------------
-    def run(self, query: str, top_k: int = 3) -> Dict:
+        llm: Any = self.llm
+        if hasattr(llm, "stream") and callable(getattr(llm, "stream")):
+            prompt = self._build_generation_prompt(query, context_blocks)
+            yield from llm.stream(prompt)
+            return
 
-        live_results = self.search_live_sources(query)
+        yield self.generate(query, context_blocks)
+
+    def generate_answer(self, query: str, context_blocks: List[str], timings: Dict[str, float]) -> Dict[str, Any]:
+        #{"final_answer": ...}; ako LLM ne uspe, odgovor je poruka za korisnika i dodaje se "error": "llm"
+        try:
+            return {"final_answer": self._timed(timings, "generate", self.generate, query, context_blocks=context_blocks)}
+        except LLMGenerationError as e:
+            logger.warning("[LLM] generisanje nije uspelo: %s", e.__cause__ or e)
+            incr("llm_errors_total")
+            return {"final_answer": e.user_message, "error": "llm"}
+
+    def generate_answer_stream(self, query: str, context_blocks: List[str], outcome: Dict[str, Any]) -> Iterator[str]:
+        #Kao generate_stream(); greška LLM-a postaje poslednji token (poruka za korisnika) i outcome["error"] = "llm"
+        try:
+            yield from self.generate_stream(query, context_blocks)
+        except LLMGenerationError as e:
+            logger.warning("[LLM] streaming nije uspeo: %s", e.__cause__ or e)
+            incr("llm_errors_total")
+            outcome["error"] = "llm"
+            yield e.user_message
+
+
+    # Retrieval deo pipeline-a (sve pre generisanja)
+    def _retrieve(
+        self,
+        query: str,
+        top_k: int,
+        timings: Dict[str, float],
+        faiss_results: Optional[List[Tuple[IndexedDocument, Optional[float], Optional[float]]]] = None,
+    ) -> Dict[str, Any]:
+
+        self.reload_index_if_changed()
+
+        # Graf zavisnosti: FAISS (originalni upit) ne zavisi od rewrite-a ni od live rezultata,
+        # pa se pokreće odmah i radi paralelno sa rewrite -> live pretraga -> chunking.
+        # run_many prosleđuje već izračunate (batch) FAISS rezultate.
+        faiss_future = None
+        if faiss_results is None:
+            faiss_future = self._executor.submit(
+                bind_context(self._timed), timings, "faiss", self.retrieve_context, query, top_k=self._faiss_k(top_k)
+            )
+
+        live_results, live_status = self.search_live_sources(
+            query, return_status=True, timings=timings
+        )
 
         live_docs: List[Document] = []
         for source, docs in live_results.items():
@@ -150,38 +499,185 @@ class RAGPipeline:
                 doc.metadata = meta
                 live_docs.append(doc)
 
+        chunk_start = time.perf_counter()
         live_context: List[str] = []
         if live_docs:
-            live_chunks = chunk_documents(live_docs)
+            with span("chunking"):
+                live_chunks = chunk_documents(live_docs)
             live_context = [ch.page_content for ch in live_chunks]
+            incr("chunks_total", len(live_context), source="live")
+        timings["chunking"] = time.perf_counter() - chunk_start
 
-        faiss_results = self.retrieve_context(query, top_k=top_k)
-        faiss_context = [doc.text for (doc, dist) in faiss_results]
-
-        final_context = live_context[:2] + faiss_context[:2]
+        if faiss_future is not None:
+            faiss_results = faiss_future.result()
+        faiss_context = [doc.text for (doc, _, _) in faiss_results]
 
-        ####### DEBUG ########
-        print("\n" + "=" * 60)
-        print(">>> [DEBUG] FINAL_CONTEXT length:", len(final_context))
-        for i, ctx in enumerate(final_context):
-            print(f"\n--- CONTEXT {i+1} ---\n")
-            print(ctx[:500])
-        print("=" * 60 + "\n")
+        final_context = self.select_context(query, live_context, faiss_context, timings)
 
-        answer = self.generate(query, context_blocks=final_context)
+        incr("chunks_total", len(faiss_context), source="faiss")
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, ctx in enumerate(final_context):
+                logger.debug("FINAL_CONTEXT %d/%d:\n%s", i + 1, len(final_context), ctx[:500])
 
         return {
             "query": query,
             "live_results": live_results,
+            "live_status": live_status,
             "retrieved_chunks": [
                 {
                     "doc_id": doc.doc_id,
                     "chunk_id": doc.chunk_id,
                     "source": doc.source,
                     "text": doc.text,
-                    "distance": dist,
+                    "distance": dist,   # L2 rastojanje (manje je bolje); None za chunk koji je našao samo BM25
+                    **({"score": score} if score is not None else {}),   # hybrid: fuzionisani skor (veće je bolje)
                 }
-                for (doc, dist) in faiss_results
+                for (doc, dist, score) in faiss_results
             ],
-            "final_answer": answer,
+            "final_context": final_context,
         }
+
+
+    # Javni koraci jednog zahteva (koristi ih i pipeline.service): prepare -> generate_answer(_stream) ->
+    # remember_answer + log_run
+    def prepare(self, query: str, top_k: int = 3, timings: Dict[str, float] | None = None) -> Tuple[Dict[str, Any], Optional[List[str]]]:
+        #(rezultat, kontekst za generisanje); kontekst je None kad je rezultat već gotov odgovor iz semantičkog keša
+        timings = timings if timings is not None else {}
+
+        self.reload_index_if_changed()
+        cached = self._cached_answer(query, timings)
+        if cached is not None:
+            return cached, None
+
+        result = self._retrieve(query, top_k, timings)
+        return result, result.pop("final_context")
+
+
+    # Glavni RAG pipeline
+    # ----------------------------------------------------------------------
+    def run(self, query: str, top_k: int = 3, profile: Optional[str] = None) -> Dict:
+
+        #profile: "cprofile" / "pyinstrument" za profilisanje samo ovog zahteva (podrazumevano RAG_PROFILE)
+        with trace_request() as trace, profile_request(profile or self.profile_mode, name="run"):
+            with span("request"):
+                result = self._run(query, top_k)
+        self.log_run(query, result, trace.to_dict())
+        return result
+
+    def log_run(self, query: str, result: Dict, trace: Dict[str, Any]) -> None:
+
+        cached = "cache" in result
+        incr("requests_total", cached=str(cached).lower())
+        if not cached and result.get("final_answer"):
+            incr("answer_tokens_total", count_tokens(result["final_answer"]))
+        log_request({"query": query, "cached": cached, "timings": result.get("timings", {}), **trace})
+
+    def _run(self, query: str, top_k: int) -> Dict:
+
+        timings: Dict[str, float] = {}
+        total_start = time.perf_counter()
+
+        result, final_context = self.prepare(query, top_k, timings)
+        if final_context is None:
+            timings["total"] = time.perf_counter() - total_start
+            result["timings"] = timings
+            return result
+
+        result.update(self.generate_answer(query, final_context, timings))
+        timings["total"] = time.perf_counter() - total_start
+
+        result["timings"] = timings
+        self.remember_answer(query, result)
+        return result
+
+    def run_many(
+        self,
+        questions: List[str],
+        top_k: int = 3,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Dict]:
+
+        #Više pitanja odjednom: jedan batch embedding + jedna FAISS pretraga za sva pitanja,
+        #a live pretraga i generisanje idu paralelno, ograničeno sa max_concurrency
+        if not questions:
+            return []
+
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("RAG_MAX_CONCURRENT_GENERATIONS", "2"))
+
+        self.reload_index_if_changed()
+
+        # Pogoci iz semantičkog keša se ne računaju ponovo; batch pretraga je samo za promašaje
+        results: List[Optional[Dict]] = []
+        for q in questions:
+            timings: Dict[str, float] = {}
+            cached = self._cached_answer(q, timings)
+            if cached is not None:
+                timings["total"] = timings["semantic_cache"]
+                cached["timings"] = timings
+            results.append(cached)
+        misses = [i for i, r in enumerate(results) if r is None]
+        if not misses:
+            return results  # type: ignore[return-value]
+
+        faiss_start = time.perf_counter()
+        faiss_batch = self.retrieve_context_batch([questions[i] for i in misses], top_k=self._faiss_k(top_k))
+        faiss_elapsed = time.perf_counter() - faiss_start
+
+        def _one(query: str, faiss_results: List[Tuple[IndexedDocument, Optional[float], Optional[float]]]) -> Dict:
+            timings: Dict[str, float] = {"faiss_batch": faiss_elapsed}
+            total_start = time.perf_counter()
+
+            with trace_request() as trace, span("request"):
+                result = self._retrieve(query, top_k, timings, faiss_results=faiss_results)
+                final_context = result.pop("final_context")
+
+                result.update(self.generate_answer(query, final_context, timings))
+            timings["total"] = time.perf_counter() - total_start
+
+            result["timings"] = timings
+            self.remember_answer(query, result)
+            self.log_run(query, result, trace.to_dict())
+            return result
+
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="rag-batch") as pool:
+            futures = [pool.submit(_one, questions[i], res) for i, res in zip(misses, faiss_batch)]
+            for i, f in zip(misses, futures):
+                results[i] = f.result()
+        return results  # type: ignore[return-value]
+
+    def run_stream(self, query: str, top_k: int = 3) -> Iterator[Dict[str, Any]]:
+
+        #Prvo vraća retrieval rezultate ({"type": "retrieval"}), zatim tokene odgovora
+        #({"type": "token"}) i na kraju ceo odgovor sa vremenima ({"type": "done"})
+        timings: Dict[str, float] = {}
+        total_start = time.perf_counter()
+
+        result, final_context = self.prepare(query, top_k, timings)
+        if final_context is None:
+            answer = result.pop("final_answer")
+            yield {"type": "retrieval", **result}
+            timings["first_token"] = timings["total"] = time.perf_counter() - total_start
+            yield {"type": "token", "text": answer}
+            yield {"type": "done", "final_answer": answer, "timings": timings}
+            self.log_run(query, {"timings": timings, "cache": result["cache"]}, {})
+            return
+
+        yield {"type": "retrieval", **result}
+
+        gen_start = time.perf_counter()
+        parts: List[str] = []
+        outcome: Dict[str, Any] = {}
+        for token in self.generate_answer_stream(query, final_context, outcome):
+            if not parts:
+                timings["first_token"] = time.perf_counter() - total_start
+            parts.append(token)
+            yield {"type": "token", "text": token}
+        timings["generate"] = time.perf_counter() - gen_start
+        timings["total"] = time.perf_counter() - total_start
+
+        answer = "".join(parts)
+        self.remember_answer(query, {**result, **outcome, "final_answer": answer})
+        # Generator može da se nastavlja iz različitih niti, pa ovde nema RequestTrace-a - samo vremena
+        self.log_run(query, {"timings": timings, "final_answer": answer}, {})
+        yield {"type": "done", "final_answer": answer, "timings": timings, **outcome}
@@ -0,0 +1,62 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+from pipeline.cache import TTLCache, make_key
+from pipeline.common import hash_text
+from pipeline.context_formatter import count_tokens
+
+
+class Reranker(ABC):
+
+    #Apstraktna klasa za rerank modele - ocenjuje relevantnost (upit, chunk) parova, veći skor je bolji
+
+    model_name: str = "reranker"
+
+    @abstractmethod
+    def score_pairs(self, query: str, texts: List[str]) -> List[float]:   #Jedan skor po tekstu, istim redom
+        raise NotImplementedError
+
+    def score(self, query: str, texts: List[str], cache: Optional[TTLCache] = None) -> List[float]:
+        #Skorovi sa kešom po (hash upita, hash chunka, model); model se poziva samo za promašaje, u jednom batch-u
+
+        if not texts:
+            return []
+        if cache is None:
+            return list(self.score_pairs(query, texts))
+
+        q_hash = hash_text(query)
+        keys = [make_key(q_hash, hash_text(t), self.model_name) for t in texts]
+        scores: List[Optional[float]] = [cache.get("rerank", k) for k in keys]
+
+        missing = [i for i, s in enumerate(scores) if s is None]
+        if missing:
+            fresh = self.score_pairs(query, [texts[i] for i in missing])
+            for i, s in zip(missing, fresh):
+                scores[i] = float(s)
+                cache.set("rerank", keys[i], float(s))
+
+        return [float(s) for s in scores]
+
+
+def select_top(texts: List[str],
+               scores: List[float],
+               *,
+               top_n: int,
+               token_budget: Optional[int] = None) -> List[Tuple[str, float]]:
+    #Najbolji chunkovi po skoru, najviše top_n i ukupno najviše token_budget tokena
+    #Chunk koji ne staje u preostali budžet se preskače (manji iza njega možda staje); prvi se uzima uvek
+
+    ranked = sorted(zip(texts, scores), key=lambda x: x[1], reverse=True)
+
+    selected: List[Tuple[str, float]] = []
+    used = 0
+    for text, score in ranked:
+        if len(selected) >= top_n:
+            break
+        tokens = count_tokens(text)
+        if token_budget is not None and selected and used + tokens > token_budget:
+            continue
+        selected.append((text, score))
+        used += tokens
+    return selected
@@ -0,0 +1,44 @@
+from __future__ import annotations
+import threading
+from typing import List, Optional
+
+from sentence_transformers import CrossEncoder
+
+from pipeline.rerank.base import Reranker
+
+
+class LocalCrossEncoderReranker(Reranker):
+
+    #Lokalni cross-encoder (sentence-transformers), višejezični mMiniLM - isti jezici kao embedding model
+    #Model se učitava (i po potrebi preuzima) tek pri prvom score_pairs, ne pri pravljenju pipeline-a
+
+    def __init__(self, model_name: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1",
+                 device: Optional[str] = None,
+                 batch_size: int = 32,
+                 max_length: int = 512) -> None:
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._device = device
+        self._max_length = max_length
+        self._model: Optional[CrossEncoder] = None
+        self._load_lock = threading.Lock()
+
+    def _get_model(self) -> CrossEncoder:
+
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    self._model = CrossEncoder(self.model_name, device=self._device, max_length=self._max_length)
+        return self._model
+
+    def score_pairs(self, query: str, texts: List[str]) -> List[float]:
+        if not texts:
+            return []
+        scores = self._get_model().predict(
+            [(query, t) for t in texts],
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return [float(s) for s in scores]
@@ -0,0 +1,422 @@
+from __future__ import annotations
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import math
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from pipeline.common import tokenize_query
+
+#BM25 (ključne reči) indeks nad istim chunkovima kao FAISS, ključ je ID chunka
+#Hvata tačne termine (šifre predmeta, formule, imena) koje multilingual embeddinzi promaše
+#
+#bm25.bin (pored index.faiss), čita se preko mmap-a kao i metadata.bin:
+#   MAGIC (8 B) | dužina header-a (u64) | header JSON | kolone ... | blob termina
+#   header: k1, b, broj dokumenata / termina, ukupna dužina i pozicije kolona
+#   kolone (CSR): doc_ids int64 (sortirano), doc_lens int32,
+#                 term_offsets int64[V+1] (u blob termina, termini sortirani po UTF-8 bajtovima),
+#                 post_offsets int64[V+1], post_ids int64, post_tfs int32
+#
+#Termin se traži binarnom pretragom direktno po mmap-u, pa ni rečnik ni liste nisu u heap-u procesa;
+#izmene posle učitavanja (add / remove) drže se u memoriji dok se indeks ponovo ne sačuva.
+#
+#bm25.json (stari format, i dalje se čita): {"k1", "b", "doc_len": {id: broj_tokena}, "postings": {term: [[id, tf], ...]}}
+#učitava se ceo u Python rečnike - za veći korpus to je desetine bajtova po (term, chunk) paru u SVAKOM procesu
+
+MAGIC = b"RAGBM251"
+_ALIGN = 8
+
+
+def _pad(n: int) -> int:
+    return (-n) % _ALIGN
+
+
+def tokenize(text: str) -> List[str]:
+
+    return tokenize_query(text)
+
+
+class BM25Index:
+
+    #Invertovani indeks term -> {chunk ID: tf}: mmap osnova sa diska (bm25.bin) + izmene u memoriji;
+    #ažurira se inkrementalno uz add_chunks / delete_document
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        # Chunkovi dodati posle učitavanja (ili svi, za indeks koji nije sa diska / iz bm25.json)
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_len: Dict[int, int] = {}
+        self._total_len = 0
+
+        # mmap osnova - prazna dok se ne učita bm25.bin
+        self._mm: Optional[mmap.mmap] = None
+        self._file = None
+        self._deleted: set = set()
+        self._doc_ids = np.zeros(0, dtype="int64")
+        self._doc_lens = np.zeros(0, dtype="int32")
+        self._term_offsets = np.zeros(1, dtype="int64")
+        self._post_offsets = np.zeros(1, dtype="int64")
+        self._post_ids = np.zeros(0, dtype="int64")
+        self._post_tfs = np.zeros(0, dtype="int32")
+        self._terms_start = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_ids) - len(self._deleted) + len(self.doc_len)
+
+    def __contains__(self, cid: object) -> bool:
+        try:
+            cid = int(cid)  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            return False
+        return cid in self.doc_len or self._base_pos(cid) >= 0
+
+    @property
+    def avg_len(self) -> float:
+        n = len(self)
+        return self._total_len / n if n else 0.0
+
+    def doc_lengths(self) -> Dict[int, int]:   #Broj tokena po chunku (osnova + izmene); za testove i dijagnostiku
+
+        out = {int(c): int(n) for c, n in zip(self._doc_ids.tolist(), self._doc_lens.tolist())
+               if c not in self._deleted}
+        out.update(self.doc_len)
+        return out
+
+
+    # mmap osnova
+
+    def _base_pos(self, cid: int) -> int:   #Pozicija živog chunka u osnovi ili -1
+
+        pos = int(np.searchsorted(self._doc_ids, cid))
+        if pos < len(self._doc_ids) and int(self._doc_ids[pos]) == cid and cid not in self._deleted:
+            return pos
+        return -1
+
+    def _base_term_row(self, term: str) -> int:   #Binarna pretraga po sortiranom blob-u termina; -1 ako ga nema
+
+        if self._mm is None:
+            return -1
+        key = term.encode("utf-8")
+        offsets = self._term_offsets
+        lo, hi = 0, len(offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            cur = self._mm[self._terms_start + int(offsets[mid]):self._terms_start + int(offsets[mid + 1])]
+            if cur < key:
+                lo = mid + 1
+            elif cur > key:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def _base_posting(self, term: str) -> Tuple[np.ndarray, np.ndarray]:   #(ID-jevi, tf) živih chunkova iz osnove
+
+        row = self._base_term_row(term)
+        if row < 0:
+            return self._post_ids[:0], self._post_tfs[:0]
+        start, end = int(self._post_offsets[row]), int(self._post_offsets[row + 1])
+        ids, tfs = self._post_ids[start:end], self._post_tfs[start:end]
+        if self._deleted:
+            keep = ~np.isin(ids, np.fromiter(self._deleted, dtype="int64"))
+            ids, tfs = ids[keep], tfs[keep]
+        return ids, tfs
+
+
+    # Izmene
+
+    def add(self, cid: int, text: str) -> None:
+        #Živ chunk se ne dodaje ponovo: indeks ne zna njegov stari tekst, pa bi stare liste ostale;
+        #pozivalac prvo radi remove(cid, stari_tekst)
+
+        cid = int(cid)
+        if cid in self:
+            raise ValueError(f"chunk {cid} je već u BM25 indeksu; prvo remove(cid, stari_tekst)")
+
+        tokens = tokenize(text)
+        for term, tf in Counter(tokens).items():
+            self.postings.setdefault(term, {})[cid] = tf
+        self.doc_len[cid] = len(tokens)
+        self._total_len += len(tokens)
+
+    def remove(self, cid: int, text: str) -> None:
+        #Tekst chunka je potreban da bi se našle njegove liste (indeks ne čuva tokene po chunku)
+
+        cid = int(cid)
+        length = self.doc_len.pop(cid, None)
+        if length is None:
+            # Chunk iz osnove se samo označi kao obrisan
+            pos = self._base_pos(cid)
+            if pos >= 0:
+                self._deleted.add(cid)
+                self._total_len -= int(self._doc_lens[pos])
+            return
+        self._total_len -= length
+
+        for term in set(tokenize(text)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(cid, None)
+            if not posting:
+                del self.postings[term]
+
+
+    # Pretraga
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:   #(chunk ID, BM25 skor), opadajuće
+
+        n = len(self)
+        if n == 0 or top_k <= 0:
+            return []
+
+        avg_len = self.avg_len or 1.0
+        all_ids: List[np.ndarray] = []
+        all_scores: List[np.ndarray] = []
+        for term in set(tokenize(query)):
+            ids, tfs = self._base_posting(term)
+            extra = self.postings.get(term)
+            if extra:
+                ids = np.concatenate([ids, np.fromiter(extra.keys(), dtype="int64", count=len(extra))])
+                tfs = np.concatenate([tfs, np.fromiter(extra.values(), dtype="int32", count=len(extra))])
+            df = len(ids)
+            if not df:
+                continue
+
+            lens = np.empty(df, dtype="float64")
+            n_base = df - (len(extra) if extra else 0)
+            if n_base:
+                lens[:n_base] = self._doc_lens[np.searchsorted(self._doc_ids, ids[:n_base])]
+            if extra:
+                lens[n_base:] = np.fromiter((self.doc_len[c] for c in extra), dtype="float64", count=len(extra))
+
+            idf = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+            tf = tfs.astype("float64")
+            norm = self.k1 * (1.0 - self.b + self.b * lens / avg_len)
+            all_ids.append(ids)
+            all_scores.append(idf * tf * (self.k1 + 1.0) / (tf + norm))
+
+        if not all_ids:
+            return []
+
+        uniq, inverse = np.unique(np.concatenate(all_ids), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(all_scores), minlength=len(uniq))
+        if top_k < len(uniq):
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            top = np.arange(len(uniq))
+        # Opadajuće po skoru, pri istom skoru manji ID prvi (deterministički redosled)
+        top = top[np.lexsort((uniq[top], -scores[top]))]
+        return [(int(uniq[i]), float(scores[i])) for i in top]
+
+
+    # Disk
+
+    def _merged_postings(self) -> Iterable[Tuple[bytes, np.ndarray, np.ndarray]]:
+        #(termin, ID-jevi, tf) za osnovu + izmene, termini sortirani po UTF-8 bajtovima
+
+        terms = {t.encode("utf-8") for t in self.postings}
+        for row in range(len(self._term_offsets) - 1):
+            terms.add(bytes(self._mm[self._terms_start + int(self._term_offsets[row]):
+                                     self._terms_start + int(self._term_offsets[row + 1])]))
+
+        for key in sorted(terms):
+            term = key.decode("utf-8")
+            ids, tfs = self._base_posting(term)
+            extra = self.postings.get(term)
+            if extra:
+                ids = np.concatenate([ids, np.fromiter(extra.keys(), dtype="int64", count=len(extra))])
+                tfs = np.concatenate([tfs, np.fromiter(extra.values(), dtype="int32", count=len(extra))])
+            if len(ids):
+                order = np.argsort(ids, kind="stable")
+                yield key, ids[order], tfs[order]
+
+    def save(self, path: str) -> None:
+        #bm25.bin (kompaktan CSR, bez obrisanih); putanja sa .json piše stari JSON format
+
+        if path.endswith(".json"):
+            self._save_json(path)
+            return
+
+        lengths = self.doc_lengths()
+        doc_ids = np.array(sorted(lengths), dtype="int64")
+        doc_lens = np.array([lengths[c] for c in doc_ids.tolist()], dtype="int32")
+
+        keys: List[bytes] = []
+        ids_parts: List[np.ndarray] = []
+        tfs_parts: List[np.ndarray] = []
+        for key, ids, tfs in self._merged_postings():
+            keys.append(key)
+            ids_parts.append(ids.astype("int64"))
+            tfs_parts.append(tfs.astype("int32"))
+
+        term_offsets = np.zeros(len(keys) + 1, dtype="int64")
+        term_offsets[1:] = np.cumsum([len(k) for k in keys], dtype="int64")
+        post_offsets = np.zeros(len(keys) + 1, dtype="int64")
+        post_offsets[1:] = np.cumsum([len(p) for p in ids_parts], dtype="int64")
+
+        columns = [
+            ("doc_ids", doc_ids),
+            ("doc_lens", doc_lens),
+            ("term_offsets", term_offsets),
+            ("post_offsets", post_offsets),
+            ("post_ids", np.concatenate(ids_parts) if ids_parts else np.zeros(0, dtype="int64")),
+            ("post_tfs", np.concatenate(tfs_parts) if tfs_parts else np.zeros(0, dtype="int32")),
+        ]
+
+        layout = {}
+        pos = 0
+        for name, arr in columns:
+            layout[name] = {"offset": pos, "dtype": arr.dtype.str, "count": int(arr.size)}
+            pos += arr.nbytes + _pad(arr.nbytes)
+        layout["terms"] = {"offset": pos}
+
+        header = json.dumps({
+            "k1": self.k1,
+            "b": self.b,
+            "n_docs": len(doc_ids),
+            "n_terms": len(keys),
+            "total_len": int(doc_lens.sum()),
+            "columns": layout,
+        }).encode("utf-8")
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            f.write(b"\0" * _pad(len(MAGIC) + 8 + len(header)))
+            for _, arr in columns:
+                f.write(arr.tobytes())
+                f.write(b"\0" * _pad(arr.nbytes))
+            for key in keys:
+                f.write(key)
+        os.replace(tmp_path, path)
+
+    def _save_json(self, path: str) -> None:
+
+        data = {
+            "k1": self.k1,
+            "b": self.b,
+            "doc_len": self.doc_lengths(),
+            "postings": {
+                key.decode("utf-8"): [[int(c), int(t)] for c, t in zip(ids.tolist(), tfs.tolist())]
+                for key, ids, tfs in self._merged_postings()
+            },
+        }
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":   #bm25.bin preko mmap-a; stari bm25.json se učitava u rečnike
+
+        with open(path, "rb") as f:
+            is_binary = f.read(len(MAGIC)) == MAGIC
+        if is_binary:
+            return cls._load_binary(path)
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        index = cls(k1=float(data.get("k1", 1.5)), b=float(data.get("b", 0.75)))
+        index.doc_len = {int(cid): int(n) for cid, n in data["doc_len"].items()}
+        index.postings = {t: {int(cid): int(tf) for cid, tf in p} for t, p in data["postings"].items()}
+        index._total_len = sum(index.doc_len.values())
+        return index
+
+    @classmethod
+    def _load_binary(cls, path: str) -> "BM25Index":
+
+        f = open(path, "rb")
+        size = os.fstat(f.fileno()).st_size
+        mm = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+
+        (header_len,) = struct.unpack("<Q", mm[len(MAGIC):len(MAGIC) + 8])
+        header_start = len(MAGIC) + 8
+        header = json.loads(mm[header_start:header_start + header_len].decode("utf-8"))
+        data_start = header_start + header_len + _pad(header_start + header_len)
+
+        def column(name: str) -> np.ndarray:
+            spec = header["columns"][name]
+            return np.frombuffer(mm, dtype=np.dtype(spec["dtype"]), count=spec["count"],
+                                 offset=data_start + spec["offset"])
+
+        index = cls(k1=float(header["k1"]), b=float(header["b"]))
+        index._file = f
+        index._mm = mm
+        index._doc_ids = column("doc_ids")
+        index._doc_lens = column("doc_lens")
+        index._term_offsets = column("term_offsets")
+        index._post_offsets = column("post_offsets")
+        index._post_ids = column("post_ids")
+        index._post_tfs = column("post_tfs")
+        index._terms_start = data_start + header["columns"]["terms"]["offset"]
+        index._total_len = int(header["total_len"])
+        return index
+
+    def close(self) -> None:
+
+        self._doc_ids = np.zeros(0, dtype="int64")
+        self._doc_lens = np.zeros(0, dtype="int32")
+        self._term_offsets = np.zeros(1, dtype="int64")
+        self._post_offsets = np.zeros(1, dtype="int64")
+        self._post_ids = np.zeros(0, dtype="int64")
+        self._post_tfs = np.zeros(0, dtype="int32")
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @classmethod
+    def from_texts(cls, items: Iterable[Tuple[int, str]], **kwargs) -> "BM25Index":
+
+        index = cls(**kwargs)
+        for cid, text in items:
+            index.add(cid, text)
+        return index
+
+
+def fuse_rankings(dense: List[Tuple[int, float]],
+                  sparse: List[Tuple[int, float]],
+                  *,
+                  method: str = "rrf",
+                  rrf_k: int = 60,
+                  alpha: float = 0.5,
+                  top_k: Optional[int] = None) -> List[Tuple[int, float]]:
+    #Spaja FAISS (ID, L2 distanca - manje je bolje) i BM25 (ID, skor - više je bolje) rangiranja
+    #rrf: zbir 1/(rrf_k + rang); weighted: alpha*dense + (1-alpha)*bm25, oba min-max normalizovana
+
+    fused: Dict[int, float] = {}
+
+    if method == "rrf":
+        for ranking in (dense, sparse):
+            for rank, (cid, _) in enumerate(ranking, 1):
+                fused[cid] = fused.get(cid, 0.0) + 1.0 / (rrf_k + rank)
+
+    elif method == "weighted":
+        def _normalized(pairs: List[Tuple[int, float]], higher_is_better: bool) -> Dict[int, float]:
+            if not pairs:
+                return {}
+            values = [v if higher_is_better else -v for _, v in pairs]
+            lo, hi = min(values), max(values)
+            span = hi - lo
+            return {cid: (v - lo) / span if span else 1.0 for (cid, _), v in zip(pairs, values)}
+
+        for cid, s in _normalized(dense, higher_is_better=False).items():
+            fused[cid] = fused.get(cid, 0.0) + alpha * s
+        for cid, s in _normalized(sparse, higher_is_better=True).items():
+            fused[cid] = fused.get(cid, 0.0) + (1.0 - alpha) * s
+
+    else:
+        raise ValueError(f"Unknown fusion method='{method}', koristi 'rrf' ili 'weighted'.")
+
+    ranked = sorted(fused.items(), key=lambda x: x[1], reverse=True)
+    return ranked[:top_k] if top_k is not None else ranked
@@ -3,119 +3,567 @@ from dataclasses import dataclass
 from typing import List, Dict, Any, Optional, Tuple
 import os
 import json
+import math
+import shutil
+import time
 
 import faiss
 import numpy as np
 
 from pipeline.embeddings.base import EmbeddingModel
+from pipeline.retriever.metadata_store import MetadataStore
+from pipeline.retriever.bm25 import BM25Index, fuse_rankings
+from pipeline.metrics import span
 
 
 @dataclass
 class IndexedDocument:    #Meta informacije o chunku koji je ubačen u FAISS
 
-    doc_id: str           
-    chunk_id: int         
-    text: str             
-    source: str           
+    doc_id: str
+    chunk_id: int
+    text: str
+    source: str
 
 
-class FaissStore:   
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
 
-    #FAISS indeks i lista meta podataka
+# Verzionisani raspored za hot-reload: <root>/versions/<verzija>/ + <root>/CURRENT (ime aktivne verzije)
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+
+def current_version(root: str) -> Optional[str]:
+
+    path = os.path.join(root, CURRENT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().strip() or None
+
+
+def resolve_index_dir(root: str) -> str:
+    #Folder aktivne verzije; bez CURRENT fajla indeks je direktno u root-u (stari raspored)
+
+    version = current_version(root)
+    if version is None:
+        return root
+    return os.path.join(root, VERSIONS_DIR, version)
+
+# Granice za automatski izbor tipa indeksa po broju vektora
+AUTO_IVF_MIN_VECTORS = 50_000
+AUTO_PQ_MIN_VECTORS = 1_000_000
+
+
+def choose_index_type(n_vectors: int) -> str:
+    #Mali korpus - tačna (flat) pretraga; srednji - IVF-Flat; veliki - IVF-PQ (kompresovani vektori)
+    #HNSW se ne bira automatski jer ne podržava brisanje (upsert/delete dokumenata)
+
+    if n_vectors < AUTO_IVF_MIN_VECTORS:
+        return "flat"
+    if n_vectors < AUTO_PQ_MIN_VECTORS:
+        return "ivf_flat"
+    return "ivf_pq"
+
+
+def default_nprobe(nlist: int) -> int:
+    #nprobe=1 (FAISS podrazumevano) pretražuje samo jednu listu i osetno gubi recall;
+    #~1/16 listi, ali najmanje 8 (i najviše nlist)
+
+    return max(1, min(nlist, max(8, nlist // 16)))
+
+
+def build_index(index_type: str,
+                dim: int,
+                n_vectors: int,
+                *,
+                nlist: Optional[int] = None,
+                pq_m: Optional[int] = None,
+                pq_bits: int = 8,
+                hnsw_m: int = 32) -> faiss.Index:
+    #Pravi prazan (još netreniran) indeks zadatog tipa
+
+    if index_type == "flat":
+        return faiss.IndexIDMap2(faiss.IndexFlatL2(dim))
+
+    if index_type == "hnsw":
+        return faiss.IndexIDMap2(faiss.IndexHNSWFlat(dim, hnsw_m))
+
+    if index_type in ("ivf_flat", "ivf_pq"):
+        # ~4*sqrt(n) listi, ali najmanje 39 vektora po centroidu za trening
+        nlist = nlist or max(1, min(int(4 * math.sqrt(max(n_vectors, 1))), n_vectors // 39))
+        if index_type == "ivf_flat":
+            index = faiss.index_factory(dim, f"IVF{nlist},Flat")
+        else:
+            pq_m = pq_m or next(m for m in (dim // 8, dim // 4, dim // 2, dim) if m and dim % m == 0)
+            index = faiss.index_factory(dim, f"IVF{nlist},PQ{pq_m}x{pq_bits}")
+        # IVF sam čuva proizvoljne ID-jeve; hashtable direct map omogućava remove/reconstruct po ID-u
+        faiss.extract_index_ivf(index).set_direct_map_type(faiss.DirectMap.Hashtable)
+        return index
+
+    raise ValueError(f"Unknown index_type='{index_type}', koristi jedan od {INDEX_TYPES} ili 'auto'.")
+
+
+def _ensure_id_map(index: faiss.Index) -> faiss.Index:
+    #Stari indeksi (bez ID mapiranja) se prevode u IndexIDMap2, ID = redni broj vektora
+
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return index
+    if faiss.try_extract_index_ivf(index) is not None:
+        return index
+
+    id_index = faiss.IndexIDMap2(faiss.IndexFlatL2(index.d))
+    if index.ntotal > 0:
+        vectors = index.reconstruct_n(0, index.ntotal)
+        id_index.add_with_ids(vectors, np.arange(index.ntotal, dtype="int64"))
+    return id_index
+
+
+class FaissStore:
+
+    #FAISS indeks (sa ID mapiranjem) i meta podaci po ID-u chunka
+    #Manifest čuva hash sadržaja po doc_id, da se nepromenjeni dokumenti ne indeksiraju ponovo
 
     def __init__(self,
                  embedding_model: EmbeddingModel,
                  index: Optional[faiss.Index] = None,
-                 metadata: Optional[List[IndexedDocument]] = None) -> None:
+                 metadata: Optional[MetadataStore | Dict[int, IndexedDocument] | List[IndexedDocument]] = None,
+                 manifest: Optional[Dict[str, str]] = None,
+                 nprobe: Optional[int] = None,
+                 ef_search: Optional[int] = None,
+                 read_only: bool = False,
+                 bm25: Optional[BM25Index] = None) -> None:
         self.embedding_model = embedding_model
+
+        # mmap-ovan indeks se deli između procesa i ne sme da se menja
+        self.read_only = read_only
+
+        # Parametri pretrage za ANN indekse (ignorišu se za flat)
+        self.nprobe = nprobe
+        self.ef_search = ef_search
         dim = embedding_model.dimension
 
         # Ako index nije prosleđen, kreiramo novi L2 index
-        self.index = index if index is not None else faiss.IndexFlatL2(dim)
-        self.metadata: List[IndexedDocument] = metadata if metadata is not None else []
+        self.index = _ensure_id_map(index if index is not None else faiss.IndexFlatL2(dim))
+
+        if isinstance(metadata, list):
+            metadata = {i: m for i, m in enumerate(metadata)}
+        if isinstance(metadata, dict):
+            metadata = MetadataStore.from_docs(metadata)
+        self.metadata: MetadataStore = metadata if metadata is not None else MetadataStore()
+        self.manifest: Dict[str, str] = manifest if manifest is not None else {}
+
+        # ID-jevi se nikad ne dodeljuju ponovo: obrisani HNSW vektori ostaju u indeksu, pa bi stari vektor
+        # vraćao novi chunk sa istim ID-jem. Brojač se čuva u metadata.bin; za stare fajlove bez njega
+        # uzima se i najveći ID iz HNSW id_map-a
+        self._next_id = max(self.metadata.max_id() + 1, self.metadata.next_id or 0)
+        if self.metadata.next_id is None and self.index_type == "hnsw" and self.index.ntotal:
+            self._next_id = max(self._next_id, int(faiss.vector_to_array(self.index.id_map).max()) + 1)
+
+        # BM25 nad istim chunkovima; novi indeks (ili jednokratna migracija starog, bez bm25 fajla)
+        # ga gradi iz metapodataka - to dekodira tekst SVAKOG chunka, pa load() to ne radi za mmap workere
+        if bm25 is None:
+            bm25 = BM25Index.from_texts((cid, d.text) for cid, d in self.metadata.items())
+        self.bm25 = bm25
 
 
     # Dodavanje dokumenata - generiše embeddinge i dodaje u FAISS na osnovu IndexedDocument
 
-    def add_chunks(self, chunks: List[IndexedDocument]) -> None:
+    def add_chunks(self, chunks: List[IndexedDocument]) -> List[int]:
 
         if not chunks:
-            return
+            return []
+        self._check_writable()
 
-        texts = [c.text for c in chunks]
-        vectors = self.embedding_model.embed_documents(texts)
+        vec_np = self.embedding_model.embed_texts_np([c.text for c in chunks])
 
-        vec_np = np.array(vectors, dtype="float32")
-        if vec_np.ndim == 1:
-            vec_np = np.expand_dims(vec_np, axis=0)
+        ids = np.arange(self._next_id, self._next_id + len(chunks), dtype="int64")
+        self._next_id += len(chunks)
 
-        self.index.add(vec_np)
-        self.metadata.extend(chunks)
+        self.index.add_with_ids(vec_np, ids)
+        for cid, c in zip(ids.tolist(), chunks):
+            self.metadata[cid] = c
+            self.bm25.add(cid, c.text)
 
+        return ids.tolist()
+
+
+    def _check_writable(self) -> None:
+
+        if self.read_only:
+            raise RuntimeError(
+                "FaissStore je učitan u read-only (mmap) režimu; ingest radi u zasebnom procesu, "
+                "a worker preuzima novu verziju preko hot-reload-a."
+            )
 
-    # Pretraga - vraća rezultate za prvih top_k chunkova
-    def search(self, query: str, top_k: int = 5) -> List[Tuple[IndexedDocument, float]]:
 
-        query_vec = self.embedding_model.embed_text(query)
-        query_np = np.array([query_vec], dtype="float32")
+    # Inkrementalni ingest po dokumentu
 
-        distances, indices = self.index.search(query_np, top_k)
+    def is_unchanged(self, doc_id: str, content_hash: str) -> bool:
+        return self.manifest.get(doc_id) == content_hash
+
+    def set_content_hash(self, doc_id: str, content_hash: str) -> None:   #Beleži da je dokument indeksiran sa ovim sadržajem
+        self.manifest[doc_id] = content_hash
+
+    def delete_document(self, doc_id: str) -> int:    #Briše sve chunkove dokumenta, vraća broj obrisanih
+
+        ids = self.metadata.ids_for_doc(doc_id)
+        if not ids:
+            self.manifest.pop(doc_id, None)
+            return 0
+        self._check_writable()
+        self.manifest.pop(doc_id, None)
+
+        try:
+            self.index.remove_ids(np.array(ids, dtype="int64"))
+        except RuntimeError:
+            # HNSW ne podržava brisanje - vektori ostaju, ali bez metapodataka se ne vraćaju
+            # u rezultatima; fizički nestaju pri sledećem rebuild_index()
+            pass
+        for cid in ids:
+            doc = self.metadata.pop(cid, None)
+            if doc is not None:
+                self.bm25.remove(cid, doc.text)
+        return len(ids)
+
+    def upsert_document(self,
+                        doc_id: str,
+                        chunks: List[IndexedDocument],
+                        content_hash: Optional[str] = None) -> bool:
+        #Zamenjuje stare chunkove dokumenta novim; vraća False ako je sadržaj nepromenjen
+
+        if content_hash is not None and self.is_unchanged(doc_id, content_hash):
+            return False
+
+        self.delete_document(doc_id)
+        self.add_chunks(chunks)
+        if content_hash is not None:
+            self.set_content_hash(doc_id, content_hash)
+        return True
+
+
+    def _collect(self, indices: np.ndarray, distances: np.ndarray) -> List[Tuple[IndexedDocument, float]]:
 
         results: List[Tuple[IndexedDocument, float]] = []
-        for idx, dist in zip(indices[0], distances[0]):
+        for idx, dist in zip(indices, distances):
             if idx == -1:
                 continue  # FAISS vraća -1 ako nema dovoljno rezultata
-            if idx >= len(self.metadata):
+            doc = self.metadata.get(int(idx))
+            if doc is None:
                 continue
-            results.append((self.metadata[idx], float(dist)))
-
+            results.append((doc, float(dist)))
         return results
 
-    
-    # Čuvanje / učitavanje - generiše novi folder data/index.faiss
-    def save(self, dir_path: str) -> None:
-        
-        os.makedirs(dir_path, exist_ok=True)
-        index_path = os.path.join(dir_path, "index.faiss")
-        meta_path = os.path.join(dir_path, "metadata.jsonl")
-
-        faiss.write_index(self.index, index_path)
-
-        with open(meta_path, "w", encoding="utf-8") as f:
-            for m in self.metadata:
-                f.write(json.dumps({
-                    "doc_id": m.doc_id,
-                    "chunk_id": m.chunk_id,
-                    "text": m.text,
-                    "source": m.source,
-                }, ensure_ascii=False) + "\n")
 
-    @classmethod
-    def load(cls,
-             dir_path: str,
-             embedding_model: EmbeddingModel) -> "FaissStore":     #Učitavanje iz postojećeg fajla
+    # ANN tipovi indeksa
+
+    @property
+    def index_type(self) -> str:
+
+        ivf = faiss.try_extract_index_ivf(self.index)
+        if ivf is not None:
+            return "ivf_pq" if isinstance(faiss.downcast_index(ivf), faiss.IndexIVFPQ) else "ivf_flat"
+        inner = faiss.downcast_index(self.index.index) if isinstance(self.index, faiss.IndexIDMap) else self.index
+        if isinstance(inner, faiss.IndexHNSW):
+            return "hnsw"
+        return "flat"
+
+    def _search_params(self,
+                       nprobe: Optional[int] = None,
+                       ef_search: Optional[int] = None) -> Optional[faiss.SearchParameters]:
+
+        index_type = self.index_type
+        if index_type.startswith("ivf"):
+            nprobe = nprobe or self.nprobe or default_nprobe(faiss.extract_index_ivf(self.index).nlist)
+            return faiss.SearchParametersIVF(nprobe=nprobe)
+        if index_type == "hnsw":
+            ef_search = ef_search or self.ef_search
+            return faiss.SearchParametersHNSW(efSearch=ef_search) if ef_search else None
+        return None
+
+    def _export_vectors(self) -> Tuple[np.ndarray, np.ndarray]:    #(ids, vektori) svih živih chunkova
+
+        if faiss.try_extract_index_ivf(self.index) is not None:
+            ids = self.metadata.ids()
+            if len(ids) == 0:
+                return ids, np.zeros((0, self.index.d), dtype="float32")
+            return ids, self.index.reconstruct_batch(ids)
+
+        ids = faiss.vector_to_array(self.index.id_map).astype("int64")
+        vectors = faiss.downcast_index(self.index.index).reconstruct_n(0, self.index.ntotal)
+        alive = np.isin(ids, self.metadata.ids())
+        return ids[alive], vectors[alive]
+
+    def rebuild_index(self,
+                      index_type: str = "auto",
+                      *,
+                      sample_size: int = 100_000,
+                      nlist: Optional[int] = None,
+                      pq_m: Optional[int] = None,
+                      pq_bits: int = 8,
+                      hnsw_m: int = 32,
+                      seed: int = 0) -> str:
+        #Pravi novi indeks zadatog tipa od postojećih vektora; IVF se trenira na slučajnom uzorku
+        #Napomena: rebuild iz IVF-PQ indeksa koristi već kompresovane (približne) vektore
+
+        ids, vectors = self._export_vectors()
+        n = len(ids)
+        if index_type == "auto":
+            index_type = choose_index_type(n)
+
+        new_index = build_index(
+            index_type, self.index.d, n,
+            nlist=nlist, pq_m=pq_m, pq_bits=pq_bits, hnsw_m=hnsw_m,
+        )
+
+        if not new_index.is_trained:
+            rng = np.random.default_rng(seed)
+            sample = vectors
+            if n > sample_size:
+                sample = vectors[rng.choice(n, size=sample_size, replace=False)]
+            new_index.train(np.ascontiguousarray(sample))
+
+        if n:
+            new_index.add_with_ids(np.ascontiguousarray(vectors), ids)
+
+        self.index = new_index
+        return index_type
 
-        index_path = os.path.join(dir_path, "index.faiss")
-        meta_path = os.path.join(dir_path, "metadata.jsonl")
 
-        if not os.path.exists(index_path):
-            raise FileNotFoundError(f"No index.faiss found in {dir_path}")
-        if not os.path.exists(meta_path):
-            raise FileNotFoundError(f"No metadata.jsonl found in {dir_path}")
+    # Pretraga - vraća rezultate za prvih top_k chunkova
+    def search(self,
+               query: str,
+               top_k: int = 5,
+               *,
+               nprobe: Optional[int] = None,
+               ef_search: Optional[int] = None) -> List[Tuple[IndexedDocument, float]]:
+
+        query_np = self.embedding_model.embed_texts_np([query])
+
+        with span("faiss_search"):
+            distances, indices = self.index.search(
+                query_np, top_k, params=self._search_params(nprobe, ef_search)
+            )
+
+        return self._collect(indices[0], distances[0])
+
+
+    # Batch pretraga - svi upiti u jednom encode pozivu i jednoj n×d FAISS pretrazi
+    def search_batch(self,
+                     queries: List[str],
+                     top_k: int = 5,
+                     *,
+                     nprobe: Optional[int] = None,
+                     ef_search: Optional[int] = None,
+                     query_vectors: Optional[np.ndarray] = None) -> List[List[Tuple[IndexedDocument, float]]]:
+        #query_vectors: već izračunati embeddinzi upita (n, d) - npr. kad se meri samo pretraga indeksa
+
+        if not queries:
+            return []
+
+        query_np = query_vectors if query_vectors is not None else self.embedding_model.embed_texts_np(list(queries))
+
+        with span("faiss_search"):
+            distances, indices = self.index.search(
+                query_np, top_k, params=self._search_params(nprobe, ef_search)
+            )
+
+        return [self._collect(row_idx, row_dist) for row_idx, row_dist in zip(indices, distances)]
+
+
+    # Hibridna pretraga - FAISS (semantika) + BM25 (tačni termini), spojeno preko RRF ili težinskog zbira
+    def _fuse(self,
+              dense_ids: np.ndarray,
+              dense_dists: np.ndarray,
+              query: str,
+              top_k: int,
+              candidates: int,
+              fusion: str,
+              alpha: float,
+              rrf_k: int,
+              with_distance: bool = False) -> List[Tuple]:
+
+        dense = [(int(i), float(d)) for i, d in zip(dense_ids, dense_dists) if i != -1 and i in self.metadata]
+        with span("bm25_search"):
+            sparse = self.bm25.search(query, top_k=candidates)
+        fused = fuse_rankings(dense, sparse, method=fusion, rrf_k=rrf_k, alpha=alpha, top_k=top_k)
+        if with_distance:
+            # L2 rastojanje postoji samo za chunkove koje je našao i FAISS (samo-BM25 pogodak -> None)
+            dists = dict(dense)
+            return [(self.metadata[cid], score, dists.get(cid)) for cid, score in fused]
+        return [(self.metadata[cid], score) for cid, score in fused]
+
+    def hybrid_search(self,
+                      query: str,
+                      top_k: int = 5,
+                      *,
+                      candidates: Optional[int] = None,
+                      fusion: str = "rrf",
+                      alpha: float = 0.5,
+                      rrf_k: int = 60,
+                      nprobe: Optional[int] = None,
+                      ef_search: Optional[int] = None,
+                      with_distance: bool = False) -> List[Tuple]:
+        #Vraća (chunk, fuzionisani skor) - za razliku od search(), VEĆI skor je bolji
+        #with_distance=True: (chunk, skor, L2 rastojanje ili None ako chunk nije među FAISS kandidatima)
+
+        candidates = candidates or max(4 * top_k, 20)
+        query_np = self.embedding_model.embed_texts_np([query])
+        with span("faiss_search"):
+            distances, indices = self.index.search(
+                query_np, candidates, params=self._search_params(nprobe, ef_search)
+            )
+        return self._fuse(indices[0], distances[0], query, top_k, candidates, fusion, alpha, rrf_k, with_distance)
+
+    def hybrid_search_batch(self,
+                            queries: List[str],
+                            top_k: int = 5,
+                            *,
+                            candidates: Optional[int] = None,
+                            fusion: str = "rrf",
+                            alpha: float = 0.5,
+                            rrf_k: int = 60,
+                            nprobe: Optional[int] = None,
+                            ef_search: Optional[int] = None,
+                            with_distance: bool = False,
+                            query_vectors: Optional[np.ndarray] = None) -> List[List[Tuple]]:
+
+        if not queries:
+            return []
+
+        candidates = candidates or max(4 * top_k, 20)
+        query_np = query_vectors if query_vectors is not None else self.embedding_model.embed_texts_np(list(queries))
+        with span("faiss_search"):
+            distances, indices = self.index.search(
+                query_np, candidates, params=self._search_params(nprobe, ef_search)
+            )
+        return [
+            self._fuse(row_idx, row_dist, q, top_k, candidates, fusion, alpha, rrf_k, with_distance)
+            for q, row_idx, row_dist in zip(queries, indices, distances)
+        ]
+
+
+    # Čuvanje / učitavanje - index.faiss + metadata.bin i bm25.bin (binarni, mmap) + manifest.json
+    @staticmethod
+    def exists(dir_path: str) -> bool:
+
+        dir_path = resolve_index_dir(dir_path)
+        return os.path.exists(os.path.join(dir_path, "index.faiss")) and (
+            os.path.exists(os.path.join(dir_path, "metadata.bin"))
+            or os.path.exists(os.path.join(dir_path, "metadata.jsonl"))
+        )
 
-        index = faiss.read_index(index_path)
+    def save(self, dir_path: str) -> None:
 
-        metadata: List[IndexedDocument] = []
+        os.makedirs(dir_path, exist_ok=True)
+        index_path = os.path.join(dir_path, "index.faiss")
+        meta_path = os.path.join(dir_path, "metadata.bin")
+        legacy_meta_path = os.path.join(dir_path, "metadata.jsonl")
+        manifest_path = os.path.join(dir_path, "manifest.json")
+
+        # Svaki fajl se piše u .tmp pa atomično zamenjuje, da čitalac nikad ne vidi pola fajla
+        faiss.write_index(self.index, index_path + ".tmp")
+        os.replace(index_path + ".tmp", index_path)
+        self.metadata.next_id = self._next_id
+        self.metadata.save(meta_path)
+        self.bm25.save(os.path.join(dir_path, "bm25.bin"))
+
+        # metadata.bin i bm25.bin zamenjuju stare metadata.jsonl i bm25.json
+        for legacy_path in (legacy_meta_path, os.path.join(dir_path, "bm25.json")):
+            if os.path.exists(legacy_path):
+                os.remove(legacy_path)
+
+        with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    def publish(self, root: str, keep: int = 2) -> str:
+        #Čuva novu verziju u <root>/versions/ i atomično prebacuje CURRENT na nju;
+        #procesi koji koriste staru verziju (i njen mmap) nastavljaju nesmetano
+
+        version = f"v{time.time_ns()}"
+        versions_root = os.path.join(root, VERSIONS_DIR)
+        self.save(os.path.join(versions_root, version))
+
+        current_path = os.path.join(root, CURRENT_FILE)
+        with open(current_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(current_path + ".tmp", current_path)
+
+        # Brisanje starih verzija - na Linux-u već mmap-ovani fajlovi ostaju validni
+        old = sorted(v for v in os.listdir(versions_root) if v != version)
+        for v in old[:max(0, len(old) - (keep - 1))]:
+            shutil.rmtree(os.path.join(versions_root, v), ignore_errors=True)
+
+        return version
+
+    @staticmethod
+    def _load_legacy_metadata(meta_path: str) -> MetadataStore:
+
+        metadata: Dict[int, IndexedDocument] = {}
         with open(meta_path, "r", encoding="utf-8") as f:
             for line in f:
                 if not line.strip():
                     continue
                 obj = json.loads(line)
-                metadata.append(IndexedDocument(
+                # stari metadata.jsonl nema "id" - ID je redni broj chunka
+                cid = int(obj.get("id", len(metadata)))
+                metadata[cid] = IndexedDocument(
                     doc_id=obj["doc_id"],
                     chunk_id=int(obj["chunk_id"]),
                     text=obj["text"],
                     source=obj["source"],
-                ))
+                )
+        return MetadataStore.from_docs(metadata)
+
+    @classmethod
+    def load(cls,
+             dir_path: str,
+             embedding_model: EmbeddingModel,
+             mmap: bool = False) -> "FaissStore":     #Učitavanje iz postojećeg fajla
+        #mmap=True: indeks se ne kopira u heap procesa, već se deli preko page cache-a (read-only)
+
+        dir_path = resolve_index_dir(dir_path)
+        index_path = os.path.join(dir_path, "index.faiss")
+        meta_path = os.path.join(dir_path, "metadata.bin")
+        legacy_meta_path = os.path.join(dir_path, "metadata.jsonl")
+        manifest_path = os.path.join(dir_path, "manifest.json")
+        bm25_path = os.path.join(dir_path, "bm25.bin")
+        legacy_bm25_path = os.path.join(dir_path, "bm25.json")
+
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(f"No index.faiss found in {dir_path}")
 
-        return cls(embedding_model=embedding_model, index=index, metadata=metadata)
+        if os.path.exists(meta_path):
+            metadata = MetadataStore.load(meta_path)
+        elif os.path.exists(legacy_meta_path):
+            metadata = cls._load_legacy_metadata(legacy_meta_path)
+        else:
+            raise FileNotFoundError(f"No metadata.bin / metadata.jsonl found in {dir_path}")
+
+        if mmap:
+            flags = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_READ_ONLY
+            index = faiss.read_index(index_path, flags)
+        else:
+            index = faiss.read_index(index_path)
+
+        manifest: Dict[str, str] = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+
+        # bm25.bin je mmap (liste nisu u heap-u procesa); stari bm25.json se učitava ceo u rečnike
+        if os.path.exists(bm25_path):
+            bm25 = BM25Index.load(bm25_path)
+        elif os.path.exists(legacy_bm25_path):
+            bm25 = BM25Index.load(legacy_bm25_path)
+        elif mmap:
+            # Read-only worker ne gradi BM25 iz teksta svih chunkova - indeks mora prvo da se sačuva sa bm25.bin
+            raise FileNotFoundError(
+                f"No bm25.bin found in {dir_path}; učitaj indeks bez mmap-a i sačuvaj ga (save/publish) "
+                "da bi se BM25 izgradio jednom"
+            )
+        else:
+            bm25 = None
+
+        return cls(embedding_model=embedding_model, index=index, metadata=metadata,
+                   manifest=manifest, read_only=mmap, bm25=bm25)
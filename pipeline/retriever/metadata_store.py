@@ -0,0 +1,297 @@
+from __future__ import annotations
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from pipeline.retriever.faiss import IndexedDocument
+
+#Binarni (kolonski) zapis metapodataka chunkova, čita se preko mmap-a
+#
+#metadata.bin:
+#   MAGIC (8 B) | dužina header-a (u64) | header JSON | kolone ... | tekst blob
+#   header: broj redova, tabele stringova (doc_id, source) i pozicije kolona
+#   kolone: ids int64 (sortirano), doc_idx int32, chunk_id int32, source_idx int32, text_offsets int64[n+1]
+#   header.next_id: sledeći slobodan chunk ID (HNSW ne briše vektore, pa ID obrisanog chunka ne sme ponovo da se dodeli)
+#
+#U memoriji su samo kolone (nekoliko bajtova po chunku) i male tabele stringova;
+#tekst chunka se dekodira tek kad se traži (top-k pogodci).
+
+MAGIC = b"RAGMETA1"
+_ALIGN = 8
+
+
+def _pad(n: int) -> int:
+    return (-n) % _ALIGN
+
+
+class MetadataStore:
+
+    #Mapa chunk ID -> IndexedDocument: mmap osnova sa diska + izmene u memoriji (dodati / obrisani)
+
+    def __init__(self) -> None:
+        self._mm: Optional[mmap.mmap] = None
+        self._file = None
+        self._ids = np.zeros(0, dtype="int64")
+        self._doc_idx = np.zeros(0, dtype="int32")
+        self._chunk_ids = np.zeros(0, dtype="int32")
+        self._source_idx = np.zeros(0, dtype="int32")
+        self._offsets = np.zeros(1, dtype="int64")
+        self._text_start = 0
+        self._doc_table: List[str] = []
+        self._doc_lookup: Dict[str, int] = {}
+        self._source_table: List[str] = []
+
+        self._new: Dict[int, "IndexedDocument"] = {}
+        self._deleted: set = set()
+
+        # Sledeći slobodan ID kako ga je FaissStore sačuvao (None za stare fajlove)
+        self.next_id: Optional[int] = None
+
+    # ------------------------------------------------------------------
+    # Čitanje
+
+    def _base_pos(self, cid: int) -> int:    #Pozicija u mmap osnovi ili -1
+
+        pos = int(np.searchsorted(self._ids, cid))
+        if pos < len(self._ids) and int(self._ids[pos]) == cid and cid not in self._deleted:
+            return pos
+        return -1
+
+    def _base_text_bytes(self, pos: int) -> bytes:
+
+        start = self._text_start + int(self._offsets[pos])
+        end = self._text_start + int(self._offsets[pos + 1])
+        return self._mm[start:end]
+
+    def _base_doc(self, pos: int) -> "IndexedDocument":
+
+        from pipeline.retriever.faiss import IndexedDocument
+
+        return IndexedDocument(
+            doc_id=self._doc_table[int(self._doc_idx[pos])],
+            chunk_id=int(self._chunk_ids[pos]),
+            text=self._base_text_bytes(pos).decode("utf-8"),
+            source=self._source_table[int(self._source_idx[pos])],
+        )
+
+    def get(self, cid: int) -> Optional["IndexedDocument"]:
+
+        cid = int(cid)
+        if cid in self._new:
+            return self._new[cid]
+        pos = self._base_pos(cid)
+        if pos < 0:
+            return None
+        return self._base_doc(pos)
+
+    def __getitem__(self, cid: int) -> "IndexedDocument":
+
+        doc = self.get(cid)
+        if doc is None:
+            raise KeyError(cid)
+        return doc
+
+    def __contains__(self, cid: object) -> bool:
+
+        try:
+            cid = int(cid)  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            return False
+        return cid in self._new or self._base_pos(cid) >= 0
+
+    def __len__(self) -> int:
+
+        return len(self._ids) - len(self._deleted) + len(self._new)
+
+    def ids(self) -> np.ndarray:   #Sortirani ID-jevi svih živih chunkova
+
+        base = self._ids
+        if self._deleted:
+            base = base[~np.isin(base, np.fromiter(self._deleted, dtype="int64"))]
+        if not self._new:
+            return base
+        return np.sort(np.concatenate([base, np.fromiter(self._new, dtype="int64")]))
+
+    def __iter__(self) -> Iterator[int]:
+
+        return iter(self.ids().tolist())
+
+    def items(self) -> Iterator[Tuple[int, "IndexedDocument"]]:
+
+        for cid in self.ids().tolist():
+            yield cid, self[cid]
+
+    def max_id(self) -> int:   #-1 ako je prazno
+
+        ids = self.ids()
+        return int(ids[-1]) if len(ids) else -1
+
+    def ids_for_doc(self, doc_id: str) -> List[int]:
+
+        out: List[int] = [cid for cid, d in self._new.items() if d.doc_id == doc_id]
+        k = self._doc_lookup.get(doc_id)
+        if k is None:
+            return out
+        base = self._ids[self._doc_idx == k]
+        out.extend(int(c) for c in base.tolist() if c not in self._deleted)
+        return out
+
+    # ------------------------------------------------------------------
+    # Izmene
+
+    def __setitem__(self, cid: int, doc: "IndexedDocument") -> None:
+
+        cid = int(cid)
+        if self._base_pos(cid) >= 0:
+            self._deleted.add(cid)
+        self._new[cid] = doc
+
+    def pop(self, cid: int, default=None):
+
+        cid = int(cid)
+        if cid in self._new:
+            return self._new.pop(cid)
+        pos = self._base_pos(cid)
+        if pos < 0:
+            return default
+        doc = self._base_doc(pos)
+        self._deleted.add(cid)
+        return doc
+
+    # ------------------------------------------------------------------
+    # Disk
+
+    def save(self, path: str) -> None:
+        #Upisuje kompaktan fajl (bez obrisanih) u tmp pa ga atomično zamenjuje
+
+        ids = self.ids()
+        n = len(ids)
+
+        doc_table: Dict[str, int] = {}
+        source_table: Dict[str, int] = {}
+        doc_idx = np.empty(n, dtype="int32")
+        chunk_ids = np.empty(n, dtype="int32")
+        source_idx = np.empty(n, dtype="int32")
+        offsets = np.empty(n + 1, dtype="int64")
+        offsets[0] = 0
+
+        # Prvi prolaz: kolone i dužine tekstova; tekst se upisuje tek u drugom prolazu,
+        # pa ceo korpus nikad nije u memoriji odjednom
+        for i, cid in enumerate(ids.tolist()):
+            if cid in self._new:
+                d = self._new[cid]
+                doc_id, chunk_id, source = d.doc_id, d.chunk_id, d.source
+                length = len(d.text.encode("utf-8"))
+            else:
+                pos = self._base_pos(cid)
+                doc_id = self._doc_table[int(self._doc_idx[pos])]
+                chunk_id = int(self._chunk_ids[pos])
+                source = self._source_table[int(self._source_idx[pos])]
+                length = int(self._offsets[pos + 1] - self._offsets[pos])
+
+            doc_idx[i] = doc_table.setdefault(doc_id, len(doc_table))
+            source_idx[i] = source_table.setdefault(source, len(source_table))
+            chunk_ids[i] = chunk_id
+            offsets[i + 1] = offsets[i] + length
+
+        columns = [
+            ("ids", ids.astype("int64")),
+            ("doc_idx", doc_idx),
+            ("chunk_id", chunk_ids),
+            ("source_idx", source_idx),
+            ("text_offsets", offsets),
+        ]
+
+        # Pozicije kolona su relativne u odnosu na početak sekcije sa podacima
+        layout = {}
+        pos = 0
+        for name, arr in columns:
+            layout[name] = {"offset": pos, "dtype": arr.dtype.str, "count": int(arr.size)}
+            pos += arr.nbytes + _pad(arr.nbytes)
+        layout["text"] = {"offset": pos}
+
+        header = json.dumps({
+            "n": n,
+            "next_id": self.next_id,
+            "doc_ids": list(doc_table),
+            "sources": list(source_table),
+            "columns": layout,
+        }, ensure_ascii=False).encode("utf-8")
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            f.write(b"\0" * _pad(len(MAGIC) + 8 + len(header)))
+            for _, arr in columns:
+                f.write(arr.tobytes())
+                f.write(b"\0" * _pad(arr.nbytes))
+            for cid in ids.tolist():
+                if cid in self._new:
+                    f.write(self._new[cid].text.encode("utf-8"))
+                else:
+                    f.write(self._base_text_bytes(self._base_pos(cid)))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "MetadataStore":
+
+        store = cls()
+        f = open(path, "rb")
+        size = os.fstat(f.fileno()).st_size
+        mm = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) if size else None
+        if mm is None or mm[:len(MAGIC)] != MAGIC:
+            f.close()
+            raise ValueError(f"{path} nije validan metadata.bin fajl")
+
+        (header_len,) = struct.unpack("<Q", mm[len(MAGIC):len(MAGIC) + 8])
+        header_start = len(MAGIC) + 8
+        header = json.loads(mm[header_start:header_start + header_len].decode("utf-8"))
+        data_start = header_start + header_len + _pad(header_start + header_len)
+
+        def column(name: str) -> np.ndarray:
+            spec = header["columns"][name]
+            return np.frombuffer(mm, dtype=np.dtype(spec["dtype"]), count=spec["count"],
+                                 offset=data_start + spec["offset"])
+
+        store._file = f
+        store._mm = mm
+        store._ids = column("ids")
+        store._doc_idx = column("doc_idx")
+        store._chunk_ids = column("chunk_id")
+        store._source_idx = column("source_idx")
+        store._offsets = column("text_offsets")
+        store._text_start = data_start + header["columns"]["text"]["offset"]
+        store._doc_table = list(header["doc_ids"])
+        store._doc_lookup = {d: i for i, d in enumerate(store._doc_table)}
+        store._source_table = list(header["sources"])
+        store.next_id = header.get("next_id")
+        return store
+
+    def close(self) -> None:
+
+        self._ids = self._ids[:0].copy()
+        self._doc_idx = self._doc_idx[:0].copy()
+        self._chunk_ids = self._chunk_ids[:0].copy()
+        self._source_idx = self._source_idx[:0].copy()
+        self._offsets = np.zeros(1, dtype="int64")
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @classmethod
+    def from_docs(cls, docs: Dict[int, "IndexedDocument"]) -> "MetadataStore":
+
+        store = cls()
+        for cid, d in docs.items():
+            store[cid] = d
+        return store
@@ -1,9 +1,11 @@
 from __future__ import annotations
-from typing import Dict, List
+from typing import Dict, List, Any, Tuple
 from pathlib import Path
 
 from langchain_core.documents import Document
 from pipeline.search_everywhere_api import search_everywhere_api
+from pipeline.http_client import HttpTransport
+from pipeline.cache import TTLCache
 
 def search_everywhere(
     query: str,
@@ -13,7 +15,11 @@ def search_everywhere(
     limits: Dict[str, int] | None = None,
     timeout: int = 20,
     page_level_pdf: bool = True,
-) -> Dict[str, List[Document]]:
+    deadline: float | None = None,
+    return_status: bool = False,
+    transport: HttpTransport | None = None,
+    cache: TTLCache | None = None,
+) -> Dict[str, List[Document]] | Tuple[Dict[str, List[Document]], Dict[str, Dict[str, Any]]]:
     return search_everywhere_api(
         query=query,
         lang=lang,
@@ -21,4 +27,8 @@ def search_everywhere(
         limits=limits,
         timeout=timeout,
         page_level_pdf=page_level_pdf,
+        deadline=deadline,
+        return_status=return_status,
+        transport=transport,
+        cache=cache,
     )
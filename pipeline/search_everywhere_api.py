@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait
 from pathlib import Path
-from typing import Dict, List, Callable
+from typing import Dict, List, Callable, Any, Tuple
 
 from dotenv import load_dotenv
 from langchain_core.documents import Document
@@ -11,23 +14,40 @@ from pipeline.stackoverflow_client import load_stackoverflow_by_query
 from pipeline.openalex_client import load_openalex_by_query
 from pipeline.pdf_search import load_pdfs, search_local_pdfs_by_keywords
 from pipeline.google_client import load_gcs_results
+from pipeline.http_client import HttpTransport
+from pipeline.cache import TTLCache, live_key
+from pipeline.metrics import bind_context, incr, span
 
 load_dotenv(override=True)
 
+logger = logging.getLogger(__name__)
+
 
 DEFAULT_LIMITS: Dict[str, int] = {
-    "gcs": 5, 
+    "gcs": 5,
     "stackoverflow": 3,
     "openalex": 5,
-    "wikipedia": 3,    
+    "wikipedia": 3,
 }
 
 #Glavni modul za pretragu, koristi query i pretražuje uz pomoć svih klijenata
-def _safe_call(loader: Callable[[], List[Document]]) -> List[Document]:
+def _timed_call(name: str, loader: Callable[[], List[Document]]) -> Tuple[List[Document], Dict[str, Any]]:
+    #Poziva loader i beleži status i trajanje, umesto da tiho proguta grešku
+
+    start = time.perf_counter()
     try:
-        return loader()
-    except Exception:
-        return []
+        with span("live_source", source=name):
+            docs = loader()
+    except Exception as e:
+        elapsed = time.perf_counter() - start
+        logger.warning("[SEARCH] %s failed after %.2fs: %r", name, elapsed, e)
+        incr("live_source_requests_total", source=name, status="error")
+        return [], {"status": "error", "elapsed": elapsed, "count": 0, "error": repr(e)}
+
+    elapsed = time.perf_counter() - start
+    incr("live_source_requests_total", source=name, status="ok")
+    incr("live_docs_total", len(docs), source=name)
+    return docs, {"status": "ok", "elapsed": elapsed, "count": len(docs)}
 
 
 def search_everywhere_api(
@@ -38,32 +58,86 @@ def search_everywhere_api(
     limits: Dict[str, int] | None = None,
     timeout: int = 20,
     page_level_pdf: bool = True,
-) -> Dict[str, List[Document]]:
+    deadline: float | None = None,
+    return_status: bool = False,
+    transport: HttpTransport | None = None,
+    cache: TTLCache | None = None,
+) -> Dict[str, List[Document]] | Tuple[Dict[str, List[Document]], Dict[str, Dict[str, Any]]]:
     effective_limits = {**DEFAULT_LIMITS, **(limits or {})}
 
+    # Jedan zajednički rok za ceo upit; pojedinačni HTTP pozivi ne smeju da ga prekorače
+    effective_deadline = float(deadline) if deadline is not None else float(timeout)
+    http_timeout = max(1, min(timeout, int(effective_deadline + 0.999)))
+
+    # Transport se prosleđuje samo ako je eksplicitno zadat, inače klijenti koriste deljeni
+    extra: Dict[str, Any] = {"transport": transport} if transport is not None else {}
+
     loaders: Dict[str, Callable[[], List[Document]]] = {
-        "gcs": lambda: load_gcs_results(        
+        "gcs": lambda: load_gcs_results(
             query,
             top_k=effective_limits["gcs"],
-            timeout=timeout,
+            timeout=http_timeout,
+            **extra,
         ),
         "stackoverflow": lambda: load_stackoverflow_by_query(
             query,
             top_k=effective_limits["stackoverflow"],
-            timeout=timeout,
+            timeout=http_timeout,
             top_answers=2,
+            **extra,
         ),
         "openalex": lambda: load_openalex_by_query(
             query,
             top_k=effective_limits["openalex"],
-            timeout=timeout,
+            timeout=http_timeout,
+            **extra,
         ),
         "wikipedia": lambda: load_wikipedia_by_query(
             query,
             lang=lang,
             top_k=effective_limits["wikipedia"],
-            timeout=timeout,
+            timeout=http_timeout,
+            **extra,
+            **({"cache": cache} if cache is not None else {}),
         ),
     }
 
-    return {name: _safe_call(fn) for name, fn in loaders.items()}
+    # Keš ispred svakog izvora, ključ (izvor, normalizovan upit, jezik, limit)
+    if cache is not None:
+        loaders = {
+            name: (
+                lambda name=name, fn=fn: cache.get_or_load(
+                    name, live_key(query, lang, effective_limits[name]), fn
+                )
+            )
+            for name, fn in loaders.items()
+        }
+
+    results: Dict[str, List[Document]] = {}
+    status: Dict[str, Dict[str, Any]] = {}
+
+    # Svi izvori paralelno - latencija je približno latencija najsporijeg izvora
+    executor = ThreadPoolExecutor(max_workers=len(loaders), thread_name_prefix="live-search")
+    try:
+        futures: Dict[str, Future] = {
+            name: executor.submit(bind_context(_timed_call), name, fn) for name, fn in loaders.items()
+        }
+        wait(list(futures.values()), timeout=effective_deadline)
+
+        for name, fut in futures.items():
+            if fut.done():
+                docs, st = fut.result()
+            else:
+                fut.cancel()
+                logger.warning("[SEARCH] %s missed the %.1fs deadline", name, effective_deadline)
+                incr("live_source_requests_total", source=name, status="timeout")
+                docs, st = [], {"status": "timeout", "elapsed": effective_deadline, "count": 0}
+            results[name] = docs
+            status[name] = st
+    finally:
+        # Ne čekamo spore izvore - njihove niti se završavaju same u pozadini
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if return_status:
+        return results, status
+    return results
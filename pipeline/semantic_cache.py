@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from pipeline.embeddings.base import EmbeddingModel
+from pipeline.metrics import incr
+
+#Semantički keš odgovora: parafraze istog pitanja ("Šta je rekurzija?" / "Objasni rekurziju")
+#vraćaju već generisan odgovor bez rewrite-a, live pretrage i LLM-a
+#Mali FAISS indeks (inner product nad normalizovanim vektorima = kosinusna sličnost) prošlih upita
+
+
+class SemanticCache:
+
+    #Thread-safe; LRU izbacivanje, TTL po unosu, clear() kad se promeni glavni indeks
+
+    def __init__(
+        self,
+        embedding_model: EmbeddingModel,
+        *,
+        threshold: float = 0.9,
+        ttl: float = 24 * 3600,
+        max_entries: int = 2000,
+    ) -> None:
+
+        self.embedding_model = embedding_model
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(embedding_model.dimension))
+        self._entries: "OrderedDict[int, Tuple[float, str, bytes]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _embed(self, query: str) -> np.ndarray:
+
+        vec = np.array(self.embedding_model.embed_texts_np([query]), dtype="float32")   # kopija - normalize_L2 menja niz
+        faiss.normalize_L2(vec)
+        return vec
+
+    def _remove(self, ids: list) -> None:
+
+        if not ids:
+            return
+        self._index.remove_ids(np.array(ids, dtype="int64"))
+        for cid in ids:
+            self._entries.pop(cid, None)
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        #Odgovor najsličnijeg prošlog upita ako je sličnost >= threshold i unos nije istekao
+
+        vec = self._embed(query)
+        now = time.time()
+
+        with self._lock:
+            if self._index.ntotal == 0:
+                self._misses += 1
+                incr("cache_requests_total", cache="semantic", result="miss")
+                return None
+
+            sims, ids = self._index.search(vec, 1)
+            cid, sim = int(ids[0][0]), float(sims[0][0])
+            entry = self._entries.get(cid)
+
+            if entry is not None and entry[0] <= now:
+                self._remove([cid])
+                entry = None
+
+            if entry is None or sim < self.threshold:
+                self._misses += 1
+                incr("cache_requests_total", cache="semantic", result="miss")
+                return None
+
+            self._entries.move_to_end(cid)
+            self._hits += 1
+            incr("cache_requests_total", cache="semantic", result="hit")
+            result = pickle.loads(entry[2])
+
+        result["cache"] = {"matched_query": entry[1], "similarity": sim}
+        return result
+
+    def store(self, query: str, result: Dict[str, Any]) -> None:
+
+        vec = self._embed(query)
+        blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        expires_at = time.time() + self.ttl
+
+        with self._lock:
+            cid = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vec, np.array([cid], dtype="int64"))
+            self._entries[cid] = (expires_at, query, blob)
+
+            if len(self._entries) > self.max_entries:
+                overflow = list(self._entries)[:len(self._entries) - self.max_entries]
+                self._evictions += len(overflow)
+                self._remove(overflow)
+
+    def clear(self) -> None:   #Invalidacija - npr. posle novog ingest-a odgovori mogu da budu zastareli
+
+        with self._lock:
+            self._index.reset()
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+                "entries": len(self._entries),
+                "evictions": self._evictions,
+            }
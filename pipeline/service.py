@@ -0,0 +1,659 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from .metrics import REGISTRY, bind_context, incr, span, trace_request
+
+logger = logging.getLogger(__name__)
+
+#Asinhroni HTTP servis nad RAGPipeline-om - više studenata istovremeno sa jedne mašine
+#
+#   POST /query          {"question": "...", "top_k": 3}            -> JSON rezultat (kao run())
+#   POST /query/stream   {"question": "...", "top_k": 3}            -> NDJSON događaji (kao run_stream())
+#   POST /ingest         {"items": [{"text", "metadata"}], "save": true}
+#                        {"doc_id": "...", "text": "...", "metadata": {...}}   (upsert jednog dokumenta)
+#   GET  /healthz, GET /metrics
+#
+#Podrazumevano sluša samo na 127.0.0.1. Ako je RAG_SERVICE_INGEST_TOKEN zadat, /ingest traži
+#"Authorization: Bearer <token>"; bez tokena /ingest radi samo kad servis sluša na loopback adresi
+#
+#   python -m pipeline.service
+#
+#Event loop samo prima zahteve i piše odgovore; blokirajući delovi idu u pool-ove:
+#- retrieval (rewrite + live izvori + chunking) i generisanje - I/O pool, najviše max_inflight zahteva odjednom
+#- embedding i FAISS - postojeći RAG_STAGE_WORKERS pool pipeline-a (CPU)
+#- LLM pozivi (rewrite i generisanje) - najviše max_llm istovremeno, ostali čekaju red
+#Kad je red pun, novi zahtevi odmah dobijaju 503 + Retry-After umesto da se gomilaju
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class Overloaded(Exception):
+    pass
+
+
+class HttpError(Exception):
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+# Ograničenja po fazi
+
+class ConcurrencyLimitedLLM:
+
+    #Omotač LLM adaptera: najviše `limit` istovremenih poziva ka modelu (npr. lokalni Ollama),
+    #bez obzira da li dolaze iz rewrite-a ili generisanja; stream drži mesto do poslednjeg tokena
+
+    def __init__(self, inner: Any, limit: int) -> None:
+        self._inner = inner
+        self._sem = threading.BoundedSemaphore(max(1, limit))
+        self.limit = max(1, limit)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._inner, name)
+
+    def _acquire(self) -> None:
+        start = time.perf_counter()
+        with span("llm_queue_wait"):
+            self._sem.acquire()
+        if time.perf_counter() - start > 0.001:
+            incr("llm_queued_total")
+
+    def generate(self, prompt: str) -> str:
+
+        self._acquire()
+        try:
+            return self._inner.generate(prompt)
+        finally:
+            self._sem.release()
+
+    def stream(self, prompt: str) -> Iterator[str]:
+
+        self._acquire()
+        try:
+            yield from self._inner.stream(prompt)
+        finally:
+            self._sem.release()
+
+
+class Admission:
+
+    #Najviše max_inflight zahteva se obrađuje, najviše max_queue čeka; sve preko toga je 503
+
+    def __init__(self, max_inflight: int, max_queue: int, queue_timeout: float) -> None:
+        self.max_inflight = max(1, max_inflight)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._sem = asyncio.Semaphore(self.max_inflight)
+        self.inflight = 0
+        self.waiting = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+
+        if self._sem.locked() and self.waiting >= self.max_queue:
+            raise Overloaded("queue full")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._sem.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise Overloaded("queue timeout") from None
+        finally:
+            self.waiting -= 1
+
+        self.inflight += 1
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+            self._sem.release()
+
+
+class IndexLock:
+
+    #Čitaoci (FAISS/BM25 pretraga) i jedan pisac (ingest serija) nad istim FaissStore-om; pisac ima prednost
+    #da ne gladuje. Obe strane se uzimaju u nitima pool-a, nikad u event loop-u.
+    #Pipeline drži read lock samo oko same pretrage indeksa (RAGPipeline.index_lock), ne oko rewrite-a i live izvora
+
+    def __init__(self) -> None:
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+
+        with self._cond:
+            self._cond.wait_for(lambda: not self._writer and not self._writers_waiting)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                self._cond.wait_for(lambda: not self._writer and self._readers == 0)
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+def _is_loopback(host: str) -> bool:
+
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+
+def _json_default(obj: Any) -> Any:   #langchain Document (live_results) i ostalo što json ne zna
+
+    if hasattr(obj, "page_content"):
+        return {"text": obj.page_content, "metadata": getattr(obj, "metadata", {})}
+    return str(obj)
+
+
+def _dumps(obj: Any) -> bytes:
+
+    return json.dumps(obj, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+# Servis
+
+class RAGService:
+
+    def __init__(self,
+                 rag: Any = None,
+                 *,
+                 host: Optional[str] = None,
+                 port: Optional[int] = None,
+                 max_inflight: Optional[int] = None,
+                 max_queue: Optional[int] = None,
+                 queue_timeout: Optional[float] = None,
+                 max_llm: Optional[int] = None,
+                 ingest_batch: Optional[int] = None,
+                 shutdown_timeout: Optional[float] = None,
+                 max_body_bytes: Optional[int] = None,
+                 ingest_token: Optional[str] = None) -> None:
+
+        if rag is None:
+            from .rag_pipeline import RAGPipeline
+            rag = RAGPipeline()
+        self.rag = rag
+
+        self.host = host or os.getenv("RAG_SERVICE_HOST", "127.0.0.1")
+        self.port = port if port is not None else int(os.getenv("RAG_SERVICE_PORT", "8000"))
+        self.max_inflight = max_inflight or int(os.getenv("RAG_SERVICE_MAX_INFLIGHT", "16"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("RAG_SERVICE_MAX_QUEUE", "64"))
+        self.queue_timeout = (
+            queue_timeout if queue_timeout is not None
+            else float(os.getenv("RAG_SERVICE_QUEUE_TIMEOUT", "30"))
+        )
+        self.max_llm = max_llm or int(os.getenv("RAG_SERVICE_MAX_LLM", os.getenv("RAG_MAX_CONCURRENT_GENERATIONS", "2")))
+        self.ingest_batch = ingest_batch or int(os.getenv("RAG_SERVICE_INGEST_BATCH", "64"))
+        self.shutdown_timeout = (
+            shutdown_timeout if shutdown_timeout is not None
+            else float(os.getenv("RAG_SERVICE_SHUTDOWN_TIMEOUT", "30"))
+        )
+        self.max_body_bytes = max_body_bytes or int(os.getenv("RAG_SERVICE_MAX_BODY_BYTES", str(20 * 1024 * 1024)))
+        self.ingest_token = ingest_token or os.getenv("RAG_SERVICE_INGEST_TOKEN") or None
+
+        # LLM limit važi i za rewrite u retrieval fazi, jer oba poziva idu na isti model
+        if not isinstance(self.rag.llm, ConcurrencyLimitedLLM):
+            self.rag.llm = ConcurrencyLimitedLLM(self.rag.llm, self.max_llm)
+
+        # I/O pool: po jedna nit po zahtevu koji se obrađuje (+1 za ingest)
+        self._io_pool = ThreadPoolExecutor(max_workers=self.max_inflight + 1, thread_name_prefix="rag-service")
+
+        # Pretraga indeksa u pipeline-u (i u run_many/run_stream) ide pod read lock-om, ingest pod write lock-om
+        self._index_lock = IndexLock()
+        self.rag.index_lock = self._index_lock
+
+        self._admission: Optional[Admission] = None
+        self._ingest_lock: Optional[asyncio.Lock] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._handlers: set = set()
+        self.draining = False
+
+
+    # Pomoćne funkcije
+
+    async def _call(self, pool: Any, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        #Blokirajući poziv u pool-u; RequestTrace (contextvars) ide sa njim u nit
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, bind_context(functools.partial(fn, *args, **kwargs)))
+
+    def stats(self) -> Dict[str, Any]:
+
+        admission = self._admission
+        return {
+            "status": "draining" if self.draining else "ok",
+            "inflight": admission.inflight if admission else 0,
+            "waiting": admission.waiting if admission else 0,
+            "max_inflight": self.max_inflight,
+            "max_queue": self.max_queue,
+            "max_llm": self.max_llm,
+        }
+
+
+    # Upiti
+
+    async def _prepare(self, question: str, top_k: int, timings: Dict[str, float]) -> Tuple[Dict, Optional[List[str]]]:
+        #(rezultat, kontekst za generisanje); kontekst je None ako je odgovor iz semantičkog keša
+
+        return await self._call(self._io_pool, self.rag.prepare, question, top_k, timings)
+
+    async def query(self, question: str, top_k: int = 3) -> Dict[str, Any]:
+
+        timings: Dict[str, float] = {}
+        total_start = time.perf_counter()
+        with trace_request() as trace:
+            with span("request"):
+                result, context = await self._prepare(question, top_k, timings)
+                if context is not None:
+                    result.update(await self._call(self._io_pool, self.rag.generate_answer, question, context, timings))
+            timings["total"] = time.perf_counter() - total_start
+            result["timings"] = timings
+
+        await self._call(self._io_pool, self._finish, question, result, trace.to_dict(), remember=context is not None)
+        return result
+
+    def _finish(self, question: str, result: Dict, trace: Dict[str, Any], *, remember: bool) -> None:
+        #Upis u semantički keš (embedding upita) i log zahteva - van event loop-a
+
+        if remember:
+            self.rag.remember_answer(question, result)
+        self.rag.log_run(question, result, trace)
+
+    async def query_stream(self, question: str, top_k: int = 3) -> AsyncIterator[Dict[str, Any]]:
+
+        timings: Dict[str, float] = {}
+        total_start = time.perf_counter()
+        result, context = await self._prepare(question, top_k, timings)
+
+        if context is None:
+            answer = result.pop("final_answer")
+            yield {"type": "retrieval", **result}
+            timings["first_token"] = timings["total"] = time.perf_counter() - total_start
+            yield {"type": "token", "text": answer}
+            yield {"type": "done", "final_answer": answer, "timings": timings}
+            await self._call(self._io_pool, self._finish, question,
+                             {"timings": timings, "cache": result.get("cache")}, {}, remember=False)
+            return
+
+        yield {"type": "retrieval", **result}
+
+        gen_start = time.perf_counter()
+        parts: List[str] = []
+        outcome: Dict[str, Any] = {}
+        async for token in self._stream_tokens(question, context, outcome):
+            if not parts:
+                timings["first_token"] = time.perf_counter() - total_start
+            parts.append(token)
+            yield {"type": "token", "text": token}
+        timings["generate"] = time.perf_counter() - gen_start
+        timings["total"] = time.perf_counter() - total_start
+
+        answer = "".join(parts)
+        await self._call(self._io_pool, self._finish, question,
+                         {**result, **outcome, "final_answer": answer, "timings": timings}, {}, remember=True)
+        yield {"type": "done", "final_answer": answer, "timings": timings, **outcome}
+
+    async def _stream_tokens(self, question: str, context: List[str], outcome: Dict[str, Any]) -> AsyncIterator[str]:
+        #Generator LLM-a radi u niti i šalje tokene u asyncio red; prekid klijenta zaustavlja generisanje
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        done = object()
+
+        def produce() -> None:
+            gen = self.rag.generate_answer_stream(question, context, outcome)
+            try:
+                for token in gen:
+                    if cancelled.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, token)
+            except Exception as e:   # greška ide u event loop, ne gubi se u niti
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                gen.close()
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        producer = loop.run_in_executor(self._io_pool, bind_context(produce))
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+            await asyncio.shield(producer)
+
+
+    # Ingest
+
+    def _write_locked(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:   #U niti pool-a, pod write lock-om
+
+        with self._index_lock.write():
+            return fn(*args, **kwargs)
+
+    async def ingest(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        #Jedan ingest u isto vreme; indeks se menja u malim serijama pod write lock-om, pa upiti ne stoje dugo
+
+        if self._ingest_lock.locked():
+            raise Overloaded("ingest in progress")
+
+        save = bool(payload.get("save", True))
+        async with self._ingest_lock:
+            if "doc_id" in payload:
+                if not isinstance(payload.get("text"), str):
+                    raise HttpError(400, "'text' is required")
+                changed = await self._call(
+                    self._io_pool, self._write_locked, self.rag.upsert_document,
+                    str(payload["doc_id"]), payload["text"], payload.get("metadata"), save=False,
+                )
+                chunks = None
+            else:
+                items = payload.get("items")
+                if not isinstance(items, list) or not all(isinstance(it, dict) and isinstance(it.get("text"), str) for it in items):
+                    raise HttpError(400, "'items' must be a list of {text, metadata}")
+                pairs = [(it["text"], it.get("metadata")) for it in items]
+                chunks = 0
+                for i in range(0, len(pairs), self.ingest_batch):
+                    chunks += await self._call(
+                        self._io_pool, self._write_locked, self.rag.ingest_many, pairs[i:i + self.ingest_batch], save=False
+                    )
+                changed = chunks > 0
+
+            if changed:
+                finish = self.rag.save_index if save else self.rag.invalidate_answers
+                await self._call(self._io_pool, self._write_locked, finish)
+
+        incr("ingest_requests_total")
+        out: Dict[str, Any] = {"changed": bool(changed), "saved": bool(changed and save)}
+        if chunks is not None:
+            out["chunks"] = chunks
+        return out
+
+
+    # HTTP
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("empty request")
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "malformed request line") from None
+
+        headers: Dict[str, str] = {}
+        while True:
+            raw = await reader.readline()
+            if raw in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = raw.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", "0") or 0)
+        if length > self.max_body_bytes:
+            raise HttpError(413, f"body larger than {self.max_body_bytes} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter,
+                       status: int,
+                       body: bytes,
+                       content_type: str = "application/json",
+                       extra: Optional[Dict[str, str]] = None) -> None:
+
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}",
+                "Connection: close"]
+        head += [f"{k}: {v}" for k, v in (extra or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def _respond_error(self, writer: asyncio.StreamWriter, status: int, message: str) -> None:
+
+        extra = {"Retry-After": "1"} if status == 503 else None
+        await self._respond(writer, status, _dumps({"error": message}), extra=extra)
+
+    async def _respond_stream(self, writer: asyncio.StreamWriter, events: AsyncIterator[Dict[str, Any]]) -> None:
+        #NDJSON preko chunked transfer encoding-a - jedan događaj po liniji, šalje se čim nastane
+
+        first = await events.__anext__()   # greške pre retrieval-a još mogu da postanu 4xx/5xx
+        head = ("HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                "Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+        writer.write(head.encode("latin-1"))
+
+        async def send(event: Dict[str, Any]) -> None:
+            data = _dumps(event) + b"\n"
+            writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+            await writer.drain()
+
+        try:
+            await send(first)
+            async for event in events:
+                await send(event)
+        except Exception as e:
+            if isinstance(e, (ConnectionError, asyncio.CancelledError)):
+                raise
+            logger.exception("[SERVICE] stream failed")
+            await send({"type": "error", "error": repr(e)})
+        finally:
+            await events.aclose()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def _parse_query(body: bytes) -> Tuple[str, int]:
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HttpError(400, "invalid JSON") from None
+        question = str(payload.get("question") or "").strip()
+        if not question:
+            raise HttpError(400, "'question' is required")
+        try:
+            top_k = int(payload.get("top_k", 3))
+        except (TypeError, ValueError):
+            raise HttpError(400, "'top_k' must be an integer") from None
+        return question, max(1, min(top_k, 20))
+
+    def _check_ingest_auth(self, headers: Dict[str, str]) -> None:
+
+        if self.ingest_token:
+            if not hmac.compare_digest(headers.get("authorization", ""), f"Bearer {self.ingest_token}"):
+                raise HttpError(401, "missing or invalid ingest token")
+        elif not _is_loopback(self.host):
+            raise HttpError(403, "set RAG_SERVICE_INGEST_TOKEN to allow /ingest on a non-loopback address")
+
+    async def _route(self,
+                     method: str,
+                     path: str,
+                     headers: Dict[str, str],
+                     body: bytes,
+                     writer: asyncio.StreamWriter) -> int:
+
+        if path == "/healthz" and method == "GET":
+            await self._respond(writer, 503 if self.draining else 200, _dumps(self.stats()))
+            return 503 if self.draining else 200
+        if path == "/metrics" and method == "GET":
+            await self._respond(writer, 200, REGISTRY.render_prometheus().encode("utf-8"),
+                                content_type="text/plain; version=0.0.4")
+            return 200
+
+        if path not in ("/query", "/query/stream", "/ingest"):
+            raise HttpError(404, f"unknown path {path}")
+        if method != "POST":
+            raise HttpError(405, "use POST")
+        if self.draining:
+            raise Overloaded("shutting down")
+
+        if path == "/ingest":
+            self._check_ingest_auth(headers)
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                raise HttpError(400, "invalid JSON") from None
+            if not isinstance(payload, dict):
+                raise HttpError(400, "JSON object expected")
+            async with self._admission.slot():
+                out = await self.ingest(payload)
+            await self._respond(writer, 200, _dumps(out))
+            return 200
+
+        question, top_k = self._parse_query(body)
+        async with self._admission.slot():
+            if path == "/query":
+                await self._respond(writer, 200, _dumps(await self.query(question, top_k)))
+            else:
+                await self._respond_stream(writer, self.query_stream(question, top_k))
+        return 200
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+
+        start = time.perf_counter()
+        path, status = "?", 500
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            method, path, headers, body = await self._read_request(reader)
+            status = await self._route(method, path, headers, body, writer)
+        except Overloaded as e:
+            status = 503
+            await self._respond_error(writer, 503, f"overloaded: {e}")
+        except HttpError as e:
+            status = e.status
+            await self._respond_error(writer, e.status, str(e))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            status = 499   # klijent je prekinuo vezu
+        except Exception as e:
+            logger.exception("[SERVICE] %s failed", path)
+            try:
+                await self._respond_error(writer, 500, repr(e))
+            except ConnectionError:
+                pass
+        finally:
+            self._handlers.discard(task)
+            incr("service_requests_total", path=path, status=status)
+            REGISTRY.observe("service_request", time.perf_counter() - start, path=path)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+
+    # Pokretanje i gašenje
+
+    async def start(self) -> asyncio.AbstractServer:
+
+        self._admission = Admission(self.max_inflight, self.max_queue, self.queue_timeout)
+        self._ingest_lock = asyncio.Lock()
+        self._stopping = asyncio.Event()
+        self._server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("[SERVICE] listening on http://%s:%d", self.host, self.port)
+        return self._server
+
+    def request_stop(self) -> None:
+
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def stop(self) -> None:
+        #Ne prima nove veze, čeka da se završe zahtevi u toku (najviše shutdown_timeout), pa gasi pool-ove
+
+        self.draining = True
+        if self._server is not None:
+            self._server.close()
+
+        pending = {t for t in self._handlers if t is not asyncio.current_task()}
+        if pending:
+            _, still_running = await asyncio.wait(pending, timeout=self.shutdown_timeout)
+            if still_running:
+                logger.warning("[SERVICE] %d requests still running after %.0fs - shutting down anyway",
+                               len(still_running), self.shutdown_timeout)
+                for t in still_running:
+                    t.cancel()
+
+        if self._server is not None:
+            try:
+                await asyncio.wait_for(self._server.wait_closed(), timeout=1)
+            except asyncio.TimeoutError:
+                pass
+
+        self._io_pool.shutdown(wait=False, cancel_futures=True)
+        transport = getattr(self.rag, "transport", None)
+        if transport is not None:
+            transport.close()
+        logger.info("[SERVICE] stopped")
+
+    async def serve_forever(self) -> None:
+
+        await self.start()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.request_stop)
+            except (NotImplementedError, RuntimeError):   # Windows / ne-glavna nit
+                pass
+        await self._stopping.wait()
+        await self.stop()
+
+
+def main() -> None:
+
+    load_dotenv(override=True)
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    asyncio.run(RAGService().serve_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,12 @@ from __future__ import annotations
 
 import os
 import time
-from typing import List, Sequence, Dict, Any
+from typing import List, Sequence, Dict, Any, Optional
 
-import requests
 from langchain_core.documents import Document
 
 from pipeline.common import MIN_CHARS, UA_JSON, strip_html_to_text, clean_text, hash_text
+from pipeline.http_client import HttpTransport, get_default_transport
 
 from dotenv import load_dotenv
 
@@ -19,6 +19,7 @@ def so_search(
     *,
     top_k: int = 5,
     timeout: int = 20,
+    transport: Optional[HttpTransport] = None,
 ) -> List[int]:
     api = "https://api.stackexchange.com/2.3/search/advanced"
     key = os.getenv("STACKEXCHANGE_KEY")
@@ -33,7 +34,8 @@ def so_search(
     if key:
         params["key"] = key
 
-    r = requests.get(api, params=params, headers=UA_JSON, timeout=timeout)
+    transport = transport or get_default_transport()
+    r = transport.get(api, params=params, headers=UA_JSON, timeout=timeout)
     if r.status_code != 200:
         return []
 
@@ -46,10 +48,13 @@ def so_fetch_qna(
     *,
     top_answers: int = 2,
     timeout: int = 20,
+    transport: Optional[HttpTransport] = None,
 ) -> List[Document]:
     if not question_ids:
         return []
 
+    transport = transport or get_default_transport()
+
     key = os.getenv("STACKEXCHANGE_KEY")
 
     #Pitanja
@@ -64,7 +69,7 @@ def so_fetch_qna(
     }
     if key:
         q_params["key"] = key
-    q_resp = requests.get(q_api, params=q_params, headers=UA_JSON, timeout=timeout)
+    q_resp = transport.get(q_api, params=q_params, headers=UA_JSON, timeout=timeout)
     if q_resp.status_code != 200:
         return []
 
@@ -81,7 +86,7 @@ def so_fetch_qna(
     }
     if key:
         a_params["key"] = key
-    a_resp = requests.get(a_api, params=a_params, headers=UA_JSON, timeout=timeout)
+    a_resp = transport.get(a_api, params=a_params, headers=UA_JSON, timeout=timeout)
     a_items = a_resp.json().get("items", []) if a_resp.status_code == 200 else []
 
     ans_by_q: Dict[int, List[str]] = {}
@@ -138,6 +143,7 @@ def load_stackoverflow_by_query(
     top_k: int = 5,
     timeout: int = 20,
     top_answers: int = 2,
+    transport: Optional[HttpTransport] = None,
 ) -> List[Document]:
-    ids = so_search(query, top_k=top_k, timeout=timeout)
-    return so_fetch_qna(ids, top_answers=top_answers, timeout=timeout)
+    ids = so_search(query, top_k=top_k, timeout=timeout, transport=transport)
+    return so_fetch_qna(ids, top_answers=top_answers, timeout=timeout, transport=transport)
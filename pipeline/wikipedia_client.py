@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import logging
 import time
 import urllib.parse
-from typing import List, Sequence, Dict, Any, Tuple
+from typing import List, Sequence, Dict, Any, Tuple, Optional
 
-import requests
 from langchain_core.documents import Document
 
 from pipeline.common import MIN_CHARS, clean_text, strip_html_to_text, hash_text
+from pipeline.http_client import HttpTransport, get_default_transport
+from pipeline.cache import TTLCache, make_key
+
+logger = logging.getLogger(__name__)
 
 WIKI_HEADERS = {
     "User-Agent": "TamaraDiplomskiRAG/1.0 (https://github.com/TamaraMladenovic; contact: mladenovict58@gmail.com)"
@@ -56,13 +60,14 @@ def wiki_search_smart(
     lang: str = "en",
     top_k: int = 5,
     timeout: int = 20,
+    transport: Optional[HttpTransport] = None,
 ) -> Tuple[List[Dict[str, Any]], str]:
 
     api = f"https://{lang}.wikipedia.org/w/api.php"
+    transport = transport or get_default_transport()
     strategies = _generate_search_strategies(query)
 
-    print(f">>> [WIKI_SMART] original query: {query}")
-    print(f">>> [WIKI_SMART] strategies: {strategies}")
+    logger.debug("[WIKI_SMART] original query: %s, strategies: %s", query, strategies)
 
     for strategy in strategies:
         params = {
@@ -73,8 +78,8 @@ def wiki_search_smart(
             "format": "json",
             "utf8": "1",
         }
-        r = requests.get(api, params=params, headers=WIKI_HEADERS, timeout=timeout)
-        print(f">>> [WIKI_SMART] status={r.status_code} strategy='{strategy}' url={r.url}")
+        r = transport.get(api, params=params, headers=WIKI_HEADERS, timeout=timeout)
+        logger.debug("[WIKI_SMART] status=%s strategy=%r url=%s", r.status_code, strategy, r.url)
 
         if r.status_code != 200:
             # probaj sledeću strategiju
@@ -82,7 +87,7 @@ def wiki_search_smart(
 
         hits = r.json().get("query", {}).get("search", [])
         if hits:
-            print(f">>> [WIKI_SMART] FOUND {len(hits)} hits with strategy='{strategy}'")
+            logger.debug("[WIKI_SMART] found %d hits with strategy=%r", len(hits), strategy)
             return [
                 {
                     "title": h.get("title"),
@@ -95,7 +100,7 @@ def wiki_search_smart(
             ], strategy
 
     # ako nijedna strategija nije uspela
-    print(">>> [WIKI_SMART] No hits for any strategy.")
+    logger.debug("[WIKI_SMART] no hits for any strategy")
     return [], ""
 
 
@@ -105,10 +110,26 @@ def wiki_fetch_plain(
     *,
     lang: str = "en",
     timeout: int = 20,
+    transport: Optional[HttpTransport] = None,
+    cache: Optional[TTLCache] = None,
 ) -> Dict[int, Dict[str, Any]]:
     if not pageids:
         return {}
 
+    # Članci koji su već u kešu se ne skidaju ponovo (deljeni između sličnih upita)
+    out: Dict[int, Dict[str, Any]] = {}
+    if cache is not None:
+        missing = []
+        for p in pageids:
+            hit = cache.get("wikipedia_page", make_key(lang, int(p)))
+            if hit is not None:
+                out[int(p)] = hit
+            else:
+                missing.append(p)
+        pageids = missing
+        if not pageids:
+            return out
+
     api = f"https://{lang}.wikipedia.org/w/api.php"
     params = {
         "action": "query",
@@ -119,14 +140,14 @@ def wiki_fetch_plain(
         "utf8": "1",
         "pageids": "|".join(str(p) for p in pageids),
     }
-    r = requests.get(api, params=params, headers=WIKI_HEADERS, timeout=timeout)
-    print(f">>> [WIKI_FETCH] status={r.status_code} url={r.url}")
+    transport = transport or get_default_transport()
+    r = transport.get(api, params=params, headers=WIKI_HEADERS, timeout=timeout)
+    logger.debug("[WIKI_FETCH] status=%s url=%s", r.status_code, r.url)
     if r.status_code != 200:
-        print(">>> [WIKI_FETCH] body:", r.text[:300])
-        return {}
+        logger.warning("[WIKI_FETCH] HTTP %s: %s", r.status_code, r.text[:300])
+        return out
 
     pages = r.json().get("query", {}).get("pages", {})
-    out: Dict[int, Dict[str, Any]] = {}
     for pid, obj in pages.items():
         try:
             pid_int = int(pid)
@@ -137,6 +158,8 @@ def wiki_fetch_plain(
             "extract": clean_text(obj.get("extract", "")),
             "fullurl": obj.get("canonicalurl") or obj.get("fullurl"),
         }
+        if cache is not None and out[pid_int]["extract"]:
+            cache.set("wikipedia_page", make_key(lang, pid_int), out[pid_int])
     return out
 
 
@@ -148,13 +171,19 @@ def load_wikipedia_by_query(
     top_k: int = 5,
     timeout: int = 20,
     dedup: bool = True,
+    transport: Optional[HttpTransport] = None,
+    cache: Optional[TTLCache] = None,
 ) -> List[Document]:
 
-    hits, used_strategy = wiki_search_smart(query, lang=lang, top_k=top_k, timeout=timeout)
-    print(f">>> [WIKI_LOAD] used_strategy='{used_strategy}', raw_hits={len(hits)}")
+    hits, used_strategy = wiki_search_smart(
+        query, lang=lang, top_k=top_k, timeout=timeout, transport=transport
+    )
+    logger.debug("[WIKI_LOAD] used_strategy=%r, raw_hits=%d", used_strategy, len(hits))
 
     pageids = [h["pageid"] for h in hits if h.get("pageid")]
-    details = wiki_fetch_plain(pageids, lang=lang, timeout=timeout)
+    details = wiki_fetch_plain(
+        pageids, lang=lang, timeout=timeout, transport=transport, cache=cache
+    )
 
     docs: List[Document] = []
     seen = set()
@@ -164,13 +193,13 @@ def load_wikipedia_by_query(
         det = details.get(pid, {})
         text = det.get("extract", "")
         if len(text) < MIN_CHARS:
-            print(f">>> [WIKI_LOAD] Skipping short article: title='{h.get('title')}' len={len(text)}")
+            logger.debug("[WIKI_LOAD] skipping short article: title=%r len=%d", h.get("title"), len(text))
             continue
 
         if dedup:
             hh = hash_text(text)
             if hh in seen:
-                print(f">>> [WIKI_LOAD] Duplicate article skipped: title='{h.get('title')}'")
+                logger.debug("[WIKI_LOAD] duplicate article skipped: title=%r", h.get("title"))
                 continue
             seen.add(hh)
 
@@ -189,5 +218,5 @@ def load_wikipedia_by_query(
         }
         docs.append(Document(page_content=text, metadata=meta))
 
-    print(f">>> [WIKI_LOAD] Final docs count: {len(docs)}")
+    logger.debug("[WIKI_LOAD] final docs count: %d", len(docs))
     return docs
@@ -0,0 +1,139 @@
+# tests/conftest.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import pipeline.rag_pipeline as rp
+from pipeline.cache import TTLCache
+from pipeline.embeddings.base import EmbeddingModel
+from pipeline.rerank.base import Reranker
+from pipeline.retriever.faiss import FaissStore, IndexedDocument
+
+# Zajednički lažni modeli / store / pipeline - testovi ih dobijaju kao fixture, bez importa iz drugih test modula
+
+
+class FakeEmbeddingModel(EmbeddingModel):
+    """
+    Deterministički "embedding" - vektor zavisi samo od reči u tekstu,
+    pa isti tekst uvek daje isti vektor.
+    """
+
+    def __init__(self, dim: int = 16):
+        self._dim = dim
+        self.calls = 0
+
+    @property
+    def dimension(self) -> int:
+        return self._dim
+
+    def _vec(self, text):
+        v = np.zeros(self._dim, dtype="float32")
+        for w in text.lower().split():
+            v[sum(map(ord, w)) % self._dim] += 1.0
+        return v
+
+    def embed_text(self, text):
+        self.calls += 1
+        return self._vec(text).tolist()
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [self._vec(t).tolist() for t in texts]
+
+
+class FakeReranker(Reranker):
+    """
+    Skor = broj reči upita koje se nalaze u tekstu; beleži koliko parova je ocenjeno.
+    """
+    model_name = "fake-ce"
+
+    def __init__(self):
+        self.scored = []
+
+    def score_pairs(self, query, texts):
+        self.scored.extend(texts)
+        words = set(query.lower().split())
+        return [float(len(words & set(t.lower().split()))) for t in texts]
+
+
+class FakeLLM:
+    model_name = "fake"
+
+    def generate(self, prompt):
+        return "odgovor"
+
+
+class SlowStore:
+    def search(self, query, top_k=5):
+        time.sleep(0.3)
+        return [(IndexedDocument(doc_id="d", chunk_id=0, text="faiss tekst", source="pdf"), 0.1)]
+
+
+def _make_store(texts):
+    store = FaissStore(embedding_model=FakeEmbeddingModel())
+    store.add_chunks([
+        IndexedDocument(doc_id=f"doc{i}", chunk_id=0, text=t, source="pdf")
+        for i, t in enumerate(texts)
+    ])
+    return store
+
+
+def _make_pipeline():
+    """
+    RAGPipeline bez učitavanja pravog LLM-a i embedding modela.
+    """
+    rag = rp.RAGPipeline.__new__(rp.RAGPipeline)
+    rag.llm = FakeLLM()
+    rag.store = SlowStore()
+    rag.live_search_deadline = 5
+    rag.transport = None
+    rag.live_cache = None
+    rag.rewrite_cache = TTLCache()
+    rag._executor = ThreadPoolExecutor(max_workers=2)
+    rag.index_dir = "nepostojeci_folder"
+    rag.index_mmap = False
+    rag.index_reload_interval = 0
+    rag._reload_lock = threading.Lock()
+    rag._last_reload_check = 0.0
+    rag.index_lock = None
+    rag._index_version = None
+    rag.retrieval_mode = "dense"
+    rag.hybrid_fusion = "rrf"
+    rag.hybrid_alpha = 0.5
+    rag.reranker = None
+    rag.rerank_candidates = 20
+    rag.rerank_top_n = 4
+    rag.rerank_token_budget = 1500
+    rag.rerank_cache = TTLCache()
+    rag.semantic_cache = None
+    rag.profile_mode = None
+    return rag
+
+
+@pytest.fixture
+def fake_embedding_model():
+    """
+    Klasa lažnog embedding modela: fake_embedding_model(dim=64) pravi model, može i da se nasledi.
+    """
+    return FakeEmbeddingModel
+
+
+@pytest.fixture
+def fake_reranker():
+    return FakeReranker()
+
+
+@pytest.fixture
+def make_store():
+    """
+    make_store(texts) - FaissStore sa po jednim chunkom za svaki tekst (doc_id = doc0, doc1, ...).
+    """
+    return _make_store
+
+
+@pytest.fixture
+def make_pipeline():
+    return _make_pipeline
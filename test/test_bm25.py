@@ -0,0 +1,97 @@
+# tests/test_bm25.py
+import pytest
+
+from pipeline.retriever.bm25 import BM25Index, fuse_rankings
+
+
+def test_bm25_ranks_exact_term_first():
+    index = BM25Index.from_texts([
+        (0, "uvod u programiranje i algoritme"),
+        (1, "predmet CS-101 pokriva rekurziju"),
+        (2, "rekurzija i algoritmi sortiranja"),
+    ])
+
+    results = index.search("cs-101", top_k=3)
+    assert [cid for cid, _ in results] == [1]
+
+    # "algoritme" se pojavljuje samo u kraćem dokumentu 0, "i" u oba (manji idf)
+    assert index.search("i algoritme", top_k=3)[0][0] == 0
+    assert index.search("nepostojeci", top_k=3) == []
+
+
+def test_bm25_remove_and_roundtrip(tmp_path):
+    index = BM25Index.from_texts([(0, "alpha beta"), (1, "alpha gamma")])
+    index.remove(0, "alpha beta")
+
+    assert 0 not in index
+    assert "beta" not in index.postings
+    assert [cid for cid, _ in index.search("alpha")] == [1]
+
+    path = str(tmp_path / "bm25.json")
+    index.save(path)
+    loaded = BM25Index.load(path)
+    assert loaded.doc_len == index.doc_len
+    assert loaded.search("alpha gamma") == index.search("alpha gamma")
+
+
+def test_bm25_readd_of_live_chunk_requires_remove(tmp_path):
+    index = BM25Index.from_texts([(1, "alpha beta")])
+    with pytest.raises(ValueError):
+        index.add(1, "zeta eta")
+
+    index.remove(1, "alpha beta")
+    index.add(1, "zeta eta")
+    assert index.search("alpha") == []
+    assert [cid for cid, _ in index.search("zeta")] == [1]
+
+    # Isto za chunk iz mmap osnove
+    path = str(tmp_path / "bm25.bin")
+    index.save(path)
+    loaded = BM25Index.load(path)
+    with pytest.raises(ValueError):
+        loaded.add(1, "alpha")
+    loaded.remove(1, "zeta eta")
+    loaded.add(1, "alpha")
+    assert loaded.search("zeta") == []
+    assert [cid for cid, _ in loaded.search("alpha")] == [1]
+
+
+def test_bm25_binary_roundtrip_is_mmap_backed_and_accepts_updates(tmp_path):
+    texts = [(0, "alpha beta"), (1, "alpha gamma"), (2, "šifra cs-101 gamma"), (5, "beta beta delta")]
+    index = BM25Index.from_texts(texts)
+
+    path = str(tmp_path / "bm25.bin")
+    index.save(path)
+    loaded = BM25Index.load(path)
+
+    # Liste su u mmap osnovi, ne u Python rečnicima
+    assert loaded.postings == {} and loaded.doc_len == {}
+    assert len(loaded) == 4 and 5 in loaded
+    assert loaded.doc_lengths() == index.doc_lengths()
+    for query in ("alpha", "gamma beta", "šifra", "cs-101", "nepostojeci"):
+        assert loaded.search(query, top_k=3) == index.search(query, top_k=3)
+
+    # Izmene posle učitavanja: isti rezultat kao indeks izgrađen od nule
+    for idx in (index, loaded):
+        idx.remove(1, "alpha gamma")
+        idx.add(7, "gamma epsilon")
+    assert 1 not in loaded
+    assert loaded.search("gamma alpha") == index.search("gamma alpha")
+
+    loaded.save(str(tmp_path / "bm25_2.bin"))
+    again = BM25Index.load(str(tmp_path / "bm25_2.bin"))
+    assert again.doc_lengths() == index.doc_lengths()
+    assert again.search("gamma epsilon beta") == index.search("gamma epsilon beta")
+    loaded.close()
+
+
+def test_fuse_rankings_rrf_and_weighted():
+    dense = [(1, 0.1), (2, 0.5), (3, 0.9)]    # distance - manje je bolje
+    sparse = [(3, 7.0), (1, 2.0)]             # BM25 - više je bolje
+
+    rrf = fuse_rankings(dense, sparse, method="rrf")
+    assert rrf[0][0] == 1          # visoko u oba rangiranja
+    assert {cid for cid, _ in rrf} == {1, 2, 3}
+
+    weighted = fuse_rankings(dense, sparse, method="weighted", alpha=0.0, top_k=1)
+    assert weighted == [(3, 1.0)]
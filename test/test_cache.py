@@ -0,0 +1,95 @@
+# tests/test_cache.py
+from langchain_core.documents import Document
+
+import pipeline.cache as cache_mod
+import pipeline.search_everywhere_api as sea
+from pipeline.cache import TTLCache, live_key
+
+
+def test_cache_lru_eviction_and_counters():
+    c = TTLCache(max_entries=2)
+
+    c.set("wikipedia", "a", [1])
+    c.set("wikipedia", "b", [2])
+    assert c.get("wikipedia", "a") == [1]   # "a" postaje najskorije korišćen
+    c.set("wikipedia", "c", [3])            # izbacuje "b"
+
+    assert c.get("wikipedia", "b") is None
+    assert c.get("wikipedia", "c") == [3]
+
+    stats = c.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["entries"] == 2
+
+
+def test_cache_ttl_per_source(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_mod.time, "time", lambda: now[0])
+
+    c = TTLCache(ttls={"gcs": 10, "wikipedia": 100})
+    c.set("gcs", "k", "g")
+    c.set("wikipedia", "k", "w")
+
+    now[0] += 50
+    assert c.get("gcs", "k") is None
+    assert c.get("wikipedia", "k") == "w"
+
+
+def test_cache_persists_on_disk(tmp_path):
+    path = str(tmp_path / "live.sqlite")
+
+    c1 = TTLCache(path=path)
+    c1.set("openalex", live_key("RAG  Systems", "en", 5), [Document(page_content="x", metadata={})])
+    c1.close()
+
+    c2 = TTLCache(path=path)
+    docs = c2.get("openalex", live_key("rag systems", "en", 5))
+    assert docs is not None
+    assert docs[0].page_content == "x"
+
+
+def test_disk_tier_is_lru_across_namespaces_and_batches_commits(tmp_path, monkeypatch):
+    import sqlite3
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_mod.time, "time", lambda: now[0])
+    path = str(tmp_path / "live.sqlite")
+
+    def disk_keys():
+        with sqlite3.connect(path) as db:
+            return sorted(k for (k,) in db.execute("SELECT key FROM cache"))
+
+    c = TTLCache(path=path, max_entries=1, max_disk_entries=3, flush_every=2, flush_seconds=3600)
+    c.set("gcs", "a", [1])
+    assert disk_keys() == []                  # još nema commit-a
+    c.set("wikipedia", "b", [2])
+    assert disk_keys() == ["a", "b"]
+
+    now[0] += 1
+    assert c.get("gcs", "a") == [1]           # pogodak sa diska osvežava last_used (kratak TTL ne smeta)
+    now[0] += 1
+    c.set("wikipedia", "c", [3])
+    c.set("wikipedia", "d", [4])              # preko max_disk_entries -> briše se najdavnije korišćen
+    assert disk_keys() == ["a", "c", "d"]
+    c.close()
+
+
+def test_search_everywhere_api_uses_cache(monkeypatch):
+    calls = {"wikipedia": 0}
+
+    def fake_wiki(query, lang, top_k, timeout, cache=None):
+        calls["wikipedia"] += 1
+        return [Document(page_content="wiki", metadata={})]
+
+    monkeypatch.setattr(sea, "load_gcs_results", lambda query, top_k, timeout: [])
+    monkeypatch.setattr(sea, "load_wikipedia_by_query", fake_wiki)
+    monkeypatch.setattr(sea, "load_stackoverflow_by_query", lambda query, top_k, timeout, top_answers: [])
+    monkeypatch.setattr(sea, "load_openalex_by_query", lambda query, top_k, timeout: [])
+
+    c = TTLCache()
+    r1 = sea.search_everywhere_api("Recursion", cache=c)
+    r2 = sea.search_everywhere_api("  recursion ", cache=c)
+
+    assert calls["wikipedia"] == 1
+    assert r2["wikipedia"][0].page_content == r1["wikipedia"][0].page_content
@@ -0,0 +1,47 @@
+# tests/test_context_formatter.py
+import pipeline.context_formatter as cf
+
+
+def test_pack_context_strips_overlap_and_drops_near_duplicates(monkeypatch):
+    monkeypatch.setattr(cf, "count_tokens", cf.estimate_tokens)
+
+    overlap = "Rekurzija se završava kada se dostigne bazni slučaj funkcije."
+    first = "Rekurzivna funkcija poziva samu sebe. " + overlap
+    second = overlap + " Svaki poziv dobija novi okvir na steku."
+
+    chunks = [
+        {"text": first, "source": "pdf", "score": 2.0},
+        {"text": first + " ", "source": "wikipedia", "score": 1.5},   # skoro identičan
+        {"text": second, "source": "pdf", "score": 1.0},
+    ]
+
+    packed = cf.pack_context(chunks, max_tokens=1000)
+
+    assert [c["source"] for c in packed] == ["pdf", "pdf"]
+    assert packed[1]["text"] == "Svaki poziv dobija novi okvir na steku."
+
+
+def test_pack_context_truncates_at_sentence_boundary(monkeypatch):
+    monkeypatch.setattr(cf, "count_tokens", cf.estimate_tokens)
+
+    sentence = "Ovo je jedna rečenica o algoritmima i strukturama podataka. "
+    chunks = [{"text": sentence * 20, "source": "pdf"}]
+
+    packed = cf.pack_context(chunks, max_tokens=100)
+    text = packed[0]["text"]
+
+    assert text.endswith(".")
+    assert cf.estimate_tokens(text) <= 100
+    assert len(text) < len(sentence * 20)
+
+
+def test_build_prompt_respects_token_budget(monkeypatch):
+    monkeypatch.setattr(cf, "count_tokens", cf.estimate_tokens)
+
+    chunks = [{"text": f"Chunk broj {i}. " + "sadržaj " * 100, "source": "pdf"} for i in range(10)]
+
+    prompt = cf.build_prompt("Šta je rekurzija?", chunks, max_prompt_tokens=600)
+
+    assert cf.estimate_tokens(prompt) <= 600
+    assert "Chunk broj 0." in prompt
+    assert "Chunk broj 9." not in prompt
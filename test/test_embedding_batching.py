@@ -0,0 +1,116 @@
+# tests/test_embedding_batching.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from pipeline.embeddings.base import EmbeddingModel
+from pipeline.embeddings.batching import BatchingEmbeddingModel, batching_from_env
+
+
+class CountingModel(EmbeddingModel):
+    """
+    Beleži veličinu svakog encode poziva; vektor = [dužina teksta, broj reči].
+    """
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self._lock = threading.Lock()
+
+    @property
+    def dimension(self):
+        return 2
+
+    def embed_texts_np(self, texts):
+        with self._lock:
+            self.calls.append(list(texts))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("encoder pao")
+        return np.array([[len(t), len(t.split())] for t in texts], dtype="float32")
+
+    def embed_text(self, text):
+        return self.embed_texts_np([text])[0].tolist()
+
+    def embed_documents(self, texts):
+        return self.embed_texts_np(texts).tolist()
+
+
+def test_concurrent_queries_share_one_encode():
+    inner = CountingModel(delay=0.05)
+    model = BatchingEmbeddingModel(inner, max_batch=16, max_wait_ms=50)
+    questions = [f"pitanje broj {i}" for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda q: model.embed_texts_np([q]), questions))
+
+    for q, vec in zip(questions, results):
+        assert vec.shape == (1, 2) and vec.dtype == np.float32
+        assert vec[0].tolist() == [len(q), 3.0]
+    assert len(inner.calls) < len(questions)
+    assert model.stats()["largest_batch"] > 1
+    model.close()
+
+
+def test_batch_respects_max_size_and_dedupes():
+    inner = CountingModel(delay=0.05)
+    model = BatchingEmbeddingModel(inner, max_batch=4, max_wait_ms=50)
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(lambda q: model.embed_text(q), ["isto"] * 4 + [f"q{i}" for i in range(6)]))
+
+    assert results[:4] == [[4.0, 1.0]] * 4
+    assert all(len(call) <= 4 for call in inner.calls)
+    assert sum(c.count("isto") for c in inner.calls) <= 2
+    model.close()
+
+
+def test_large_calls_bypass_queue_and_errors_propagate():
+    inner = CountingModel()
+    model = BatchingEmbeddingModel(inner, max_batch=4, max_wait_ms=1)
+
+    docs = [f"chunk {i}" for i in range(10)]
+    assert model.embed_documents(docs)[3] == [7.0, 2.0]
+    assert inner.calls == [docs]
+    assert model.stats()["batches"] == 0
+
+    inner.fail = True
+    with pytest.raises(RuntimeError):
+        model.embed_text("x")
+    model.close()
+
+
+def test_batching_from_env(monkeypatch):
+    inner = CountingModel()
+    assert batching_from_env(inner) is inner
+
+    monkeypatch.setenv("EMBEDDING_MICROBATCH", "1")
+    monkeypatch.setenv("EMBEDDING_MICROBATCH_MAX_BATCH", "8")
+    wrapped = batching_from_env(inner)
+    assert isinstance(wrapped, BatchingEmbeddingModel)
+    assert wrapped.max_batch == 8 and wrapped.dimension == 2
+    assert wrapped.delay == 0.0   # ostali atributi idu na unutrašnji model
+    wrapped.close()
+
+
+def test_worker_survives_bad_encoder_output_and_close_never_hangs():
+    class WrongShapeModel(CountingModel):
+        def embed_texts_np(self, texts):
+            if texts == ["los"]:
+                return np.zeros((0, 2), dtype="float32")
+            return super().embed_texts_np(texts)
+
+    model = BatchingEmbeddingModel(WrongShapeModel(), max_batch=8, max_wait_ms=1)
+
+    with pytest.raises(RuntimeError):
+        model.embed_text("los")
+    assert model.embed_text("dobar") == [5.0, 1.0]   # nit je i dalje živa
+
+    model.close()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(model.embed_text, f"posle {i}") for i in range(4)]
+        assert [f.result(timeout=2) for f in futures] == [[7.0, 2.0]] * 4
@@ -0,0 +1,97 @@
+# tests/test_embedding_cache.py
+import numpy as np
+
+from pipeline.embeddings.cache import EmbeddingCache, embedding_key
+from pipeline.embeddings.local import LocalHFEmbeddingModel
+
+
+class FakeSentenceTransformer:
+    """
+    Beleži koje tekstove je enkodirao; vektor = [dužina teksta, broj reči].
+    """
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, convert_to_numpy=True, batch_size=32):
+        self.encoded.extend(texts)
+        return np.array([[len(t), len(t.split())] for t in texts], dtype="float32")
+
+
+def make_model(cache):
+    model = LocalHFEmbeddingModel.__new__(LocalHFEmbeddingModel)
+    model._model_name = "fake-model"
+    model._model = FakeSentenceTransformer()
+    model._dimension = 2
+    model.cache = cache
+    return model
+
+
+def test_only_misses_are_encoded():
+    model = make_model(EmbeddingCache())
+
+    first = model.embed_documents(["alpha beta", "gamma", "alpha beta"])
+    assert first == [[10.0, 2.0], [5.0, 1.0], [10.0, 2.0]]
+    # duplikat unutar batch-a se enkodira jednom
+    assert model._model.encoded == ["alpha beta", "gamma"]
+
+    second = model.embed_documents(["gamma", "delta epsilon"])
+    assert second == [[5.0, 1.0], [13.0, 2.0]]
+    assert model._model.encoded == ["alpha beta", "gamma", "delta epsilon"]
+
+    assert model.embed_text("alpha beta") == [10.0, 2.0]
+    assert len(model._model.encoded) == 3
+
+
+def test_disk_tier_survives_restart_and_lru_evicts(tmp_path):
+    path = str(tmp_path / "emb.sqlite")
+    cache = EmbeddingCache(max_entries=1, path=path)
+    cache.set_many({"a": np.array([1, 2], dtype="float32"), "b": np.array([3, 4], dtype="float32")})
+    assert cache.stats()["entries"] == 1
+    cache.close()
+
+    fresh = EmbeddingCache(path=path)
+    found = fresh.get_many(["a", "b", "c"])
+    assert sorted(found) == ["a", "b"]
+    assert found["b"].tolist() == [3.0, 4.0]
+    assert fresh.stats()["misses"] == 1
+
+    # ključ zavisi i od modela
+    assert embedding_key("m1", "tekst") != embedding_key("m2", "tekst")
+
+
+def test_disk_writes_are_batched_and_trimmed_lru(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "emb.sqlite")
+    cache = EmbeddingCache(path=path, disk_max_entries=3, flush_every=2, flush_seconds=3600)
+
+    def disk_keys():
+        with sqlite3.connect(path) as db:
+            return sorted(k for (k,) in db.execute("SELECT key FROM embeddings"))
+
+    vec = np.array([1, 2], dtype="float32")
+    cache.set_many({"a": vec, "b": vec})      # flush_every stavki -> jedan commit
+    assert disk_keys() == ["a", "b"]
+
+    cache.set_many({"c": vec})
+    assert disk_keys() == ["a", "b"]          # još nema commit-a
+    assert sorted(cache.get_many(["c"])) == ["c"]
+
+    cache.get_many(["a"])                     # "a" je sveže korišćen
+    cache.set_many({"d": vec})                # preko disk_max_entries -> briše se najdavnije korišćen
+    assert disk_keys() == ["a", "c", "d"]
+
+    cache.set_many({"e": vec})
+    cache.close()                             # close upisuje i ostatak
+    assert "e" in disk_keys()
+
+
+def test_embed_texts_np_returns_contiguous_float32():
+    model = make_model(EmbeddingCache())
+    mat = model.embed_texts_np(["alpha beta", "gamma"])
+
+    assert mat.dtype == np.float32
+    assert mat.flags["C_CONTIGUOUS"]
+    assert mat.shape == (2, 2)
+    assert model.embed_texts_np([]).shape == (0, 2)
@@ -0,0 +1,109 @@
+# tests/test_eval_retrieval.py
+import json
+
+import pytest
+
+from benchmarks.eval_retrieval import (
+    EvalConfig,
+    expand_grid,
+    load_dataset,
+    ndcg_at_k,
+    pareto_front,
+    recall_at_k,
+    reciprocal_rank,
+    run_sweep,
+    synthetic_dataset,
+)
+from benchmarks.fakes import HashingEmbeddingModel
+
+
+def test_ranking_metrics():
+    ranking = ["a", "x", "b", "y"]
+    relevant = {"a", "b", "c"}
+
+    assert recall_at_k(ranking, relevant, 2) == pytest.approx(0.5)
+    assert recall_at_k(ranking, relevant, 4) == pytest.approx(2 / 3)
+    assert recall_at_k(ranking, {"a"}, 4) == 1.0
+    assert reciprocal_rank(["x", "b"], relevant) == 0.5
+    assert reciprocal_rank(["x"], relevant) == 0.0
+    assert ndcg_at_k(["a", "b"], {"a", "b"}, 2) == pytest.approx(1.0)
+    assert ndcg_at_k(["x", "a"], {"a"}, 2) < 1.0
+
+
+def test_pareto_front_drops_dominated_configs():
+    rows = [
+        {"label": "flat", "recall@5": 0.9, "p50_ms": 10.0},
+        {"label": "ivf slow", "recall@5": 0.8, "p50_ms": 12.0},   # gori i sporiji od flat
+        {"label": "ivf fast", "recall@5": 0.7, "p50_ms": 1.0},
+    ]
+    front = pareto_front(rows, quality="recall@5")
+    assert [r["label"] for r in front] == ["ivf fast", "flat"]
+
+
+def test_expand_grid_only_relevant_params():
+    configs = expand_grid(
+        index_types=["flat", "ivf_flat", "hnsw"], nprobes=[1, 8], ef_searches=[16, 64], modes=["dense"]
+    )
+    labels = [c.label for c in configs]
+
+    assert len(configs) == 1 + 2 + 2
+    assert "flat chunk=default dense" in labels
+    assert all(c.nprobe is None for c in configs if c.index_type == "hnsw")
+
+    with pytest.raises(ValueError):
+        expand_grid(index_types=["lsh"])
+
+
+def test_sweep_uses_flat_as_ground_truth():
+    docs, queries = synthetic_dataset(n_docs=40, n_queries=16)
+    configs = [
+        EvalConfig(index_type="flat"),
+        EvalConfig(index_type="flat", mode="hybrid"),
+        EvalConfig(index_type="hnsw", ef_search=64),
+        EvalConfig(index_type="ivf_flat", nprobe=1),
+    ]
+
+    rows = run_sweep(docs, queries, configs, HashingEmbeddingModel(dimension=64), k=5)
+
+    assert len(rows) == 4
+    flat = rows[0]
+    assert flat["ann_recall@5"] == 1.0
+    assert flat["recall@5"] > 0.25   # 8 tema - nasumično bi bilo oko 0.125
+    for row in rows:
+        assert 0.0 <= row["ann_recall@5"] <= 1.0
+        assert row["p50_ms"] > 0 and row["index_mb"] > 0
+    assert "_chunk_ids" not in flat
+
+
+def test_load_dataset_from_jsonl(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    labels = tmp_path / "labels.jsonl"
+    corpus.write_text(json.dumps({"doc_id": 7, "text": "Rekurzija je ..."}) + "\n", encoding="utf-8")
+    labels.write_text(json.dumps({"question": "Šta je rekurzija?", "relevant": [7]}) + "\n", encoding="utf-8")
+
+    docs, queries = load_dataset(str(corpus), str(labels))
+
+    assert docs[0].metadata["doc_id"] == "7"
+    assert queries[0].relevant == {"7"}
+
+
+def test_sweep_embeds_questions_once_and_times_index_only():
+    class CountingEmbedding(HashingEmbeddingModel):
+        def __init__(self):
+            super().__init__(dimension=64)
+            self.query_calls = 0
+
+        def embed_texts_np(self, texts):
+            if len(texts) == 1:
+                self.query_calls += 1
+            return super().embed_texts_np(texts)
+
+    docs, queries = synthetic_dataset(n_docs=20, n_queries=6)
+    model = CountingEmbedding()
+    configs = [EvalConfig(index_type="flat"), EvalConfig(index_type="flat", mode="hybrid"),
+               EvalConfig(index_type="hnsw", ef_search=32)]
+
+    rows = run_sweep(docs, queries, configs, model, k=5)
+
+    assert model.query_calls == len(queries) + 1   # + zagrevanje, bez obzira na broj konfiguracija
+    assert all(r["embed_p50_ms"] == rows[0]["embed_p50_ms"] for r in rows)
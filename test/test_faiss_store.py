@@ -0,0 +1,207 @@
+# tests/test_faiss_store.py
+import numpy as np
+
+from pipeline.retriever.faiss import FaissStore, IndexedDocument
+
+
+def test_search_batch_matches_single_search(make_store):
+    store = make_store(["alpha beta", "gamma delta", "epsilon zeta", "alpha gamma"])
+    queries = ["alpha", "delta", "zeta"]
+
+    store.embedding_model.calls = 0
+    batch = store.search_batch(queries, top_k=2)
+
+    # jedan encode poziv za sve upite
+    assert store.embedding_model.calls == 1
+    assert len(batch) == 3
+
+    for q, res in zip(queries, batch):
+        single = store.search(q, top_k=2)
+        assert [d.doc_id for d, _ in res] == [d.doc_id for d, _ in single]
+
+
+def test_search_batch_empty(make_store):
+    store = make_store(["alpha"])
+    assert store.search_batch([], top_k=3) == []
+
+
+def test_upsert_replaces_and_skips_unchanged(tmp_path, fake_embedding_model):
+    store = FaissStore(embedding_model=fake_embedding_model())
+
+    v1 = [IndexedDocument(doc_id="lekcija.pdf", chunk_id=i, text=t, source="pdf")
+          for i, t in enumerate(["alpha beta", "gamma delta"])]
+    assert store.upsert_document("lekcija.pdf", v1, content_hash="h1")
+    assert not store.upsert_document("lekcija.pdf", v1, content_hash="h1")
+    assert store.index.ntotal == 2
+
+    v2 = [IndexedDocument(doc_id="lekcija.pdf", chunk_id=0, text="epsilon zeta", source="pdf")]
+    assert store.upsert_document("lekcija.pdf", v2, content_hash="h2")
+    assert store.index.ntotal == 1
+    assert [d.text for d, _ in store.search("alpha", top_k=5)] == ["epsilon zeta"]
+
+    store.save(str(tmp_path))
+    loaded = FaissStore.load(str(tmp_path), embedding_model=fake_embedding_model())
+    assert loaded.is_unchanged("lekcija.pdf", "h2")
+
+    assert loaded.delete_document("lekcija.pdf") == 1
+    assert loaded.index.ntotal == 0
+    assert loaded.search("alpha", top_k=5) == []
+
+
+def test_load_legacy_index_without_ids(tmp_path, fake_embedding_model):
+    """
+    Stari format (IndexFlatL2 + metadata.jsonl bez "id") mora i dalje da se učita.
+    """
+    import json
+    import faiss
+
+    model = fake_embedding_model()
+    texts = ["alpha beta", "gamma delta"]
+    flat = faiss.IndexFlatL2(model.dimension)
+    flat.add(np.array(model.embed_documents(texts), dtype="float32"))
+    faiss.write_index(flat, str(tmp_path / "index.faiss"))
+    with open(tmp_path / "metadata.jsonl", "w", encoding="utf-8") as f:
+        for i, t in enumerate(texts):
+            f.write(json.dumps({"doc_id": f"d{i}", "chunk_id": 0, "text": t, "source": "pdf"}) + "\n")
+
+    store = FaissStore.load(str(tmp_path), embedding_model=model)
+    assert store.search("gamma", top_k=1)[0][0].doc_id == "d1"
+
+
+def test_rebuild_index_ann_types_keep_results_and_ids(make_store):
+    """
+    Rebuild u IVF/HNSW indeks treba da zadrži ID-jeve (metapodatke),
+    i da upsert/delete i dalje rade.
+    """
+    rng = np.random.default_rng(0)
+    words = [f"w{i}" for i in range(200)]
+    texts = [" ".join(rng.choice(words, size=5)) for _ in range(500)]
+    store = make_store(texts)
+
+    expected = store.search(texts[7], top_k=1)[0][0].doc_id
+
+    for index_type in ("ivf_flat", "ivf_pq", "hnsw", "flat"):
+        assert store.rebuild_index(index_type, nlist=4, pq_bits=4) == index_type
+        assert store.index_type == index_type
+        assert store.index.ntotal == 500
+
+        hits = store.search(texts[7], top_k=5, nprobe=4, ef_search=64)
+        assert expected in [d.doc_id for d, _ in hits]
+
+    store.rebuild_index("ivf_flat", nlist=4)
+    store.delete_document("doc7")
+    assert "doc7" not in [d.doc_id for d, _ in store.search(texts[7], top_k=5, nprobe=4)]
+    store.add_chunks([IndexedDocument(doc_id="novi", chunk_id=0, text=texts[7], source="pdf")])
+    assert store.search(texts[7], top_k=1, nprobe=4)[0][0].doc_id == "novi"
+
+
+def test_ivf_default_nprobe_is_not_one(make_store):
+    import faiss
+    from pipeline.retriever.faiss import default_nprobe
+
+    assert default_nprobe(4) == 4
+    assert default_nprobe(64) == 8
+    assert default_nprobe(1024) == 64
+
+    rng = np.random.default_rng(0)
+    words = [f"w{i}" for i in range(200)]
+    store = make_store([" ".join(rng.choice(words, size=5)) for _ in range(500)])
+    store.rebuild_index("ivf_flat", nlist=16)
+    params = store._search_params()
+    assert isinstance(params, faiss.SearchParametersIVF) and params.nprobe == 8
+    assert store._search_params(nprobe=2).nprobe == 2
+
+
+def test_hnsw_ids_are_not_reused_after_delete_and_reload(tmp_path, make_store, fake_embedding_model):
+    """
+    HNSW ne briše vektore - posle reload-a novi chunk ne sme da dobije ID obrisanog.
+    """
+    texts = ["alpha beta", "gamma delta", "epsilon zeta"]
+    store = make_store(texts)
+    store.rebuild_index("hnsw")
+    store.delete_document("doc2")
+    store.save(str(tmp_path))
+
+    loaded = FaissStore.load(str(tmp_path), embedding_model=fake_embedding_model())
+    new_ids = loaded.add_chunks([IndexedDocument(doc_id="novi", chunk_id=0, text="eta theta", source="pdf")])
+    assert new_ids == [3]
+    assert loaded.index.ntotal == 4    # mrtvi vektor (ID 2) je još u indeksu, ali bez metapodataka
+
+
+def test_choose_index_type_by_corpus_size():
+    from pipeline.retriever.faiss import choose_index_type
+
+    assert choose_index_type(1_000) == "flat"
+    assert choose_index_type(200_000) == "ivf_flat"
+    assert choose_index_type(5_000_000) == "ivf_pq"
+
+
+def test_publish_and_mmap_load(tmp_path, make_store, fake_embedding_model):
+    """
+    publish() pravi novu verziju i prebacuje CURRENT; mmap učitavanje je read-only.
+    """
+    import pytest
+    from pipeline.retriever.faiss import current_version
+
+    root = str(tmp_path)
+    store = make_store(["alpha beta", "gamma delta"])
+    v1 = store.publish(root)
+    assert current_version(root) == v1
+
+    loaded = FaissStore.load(root, embedding_model=fake_embedding_model(), mmap=True)
+    assert loaded.read_only
+    assert loaded.search("gamma", top_k=1)[0][0].doc_id == "doc1"
+    with pytest.raises(RuntimeError):
+        loaded.add_chunks([IndexedDocument(doc_id="x", chunk_id=0, text="x", source="pdf")])
+
+    store.add_chunks([IndexedDocument(doc_id="doc2", chunk_id=0, text="epsilon", source="pdf")])
+    v2 = store.publish(root)
+    v3 = store.publish(root)
+    assert current_version(root) == v3 != v2 != v1
+
+    # stari mmap i dalje radi iako je njegova verzija obrisana
+    assert loaded.search("alpha", top_k=1)[0][0].doc_id == "doc0"
+    assert sorted((tmp_path / "versions").iterdir())[-1].name == v3
+    assert len(list((tmp_path / "versions").iterdir())) == 2
+
+
+def test_hybrid_search_finds_exact_term_and_tracks_deletes(tmp_path, make_store, fake_embedding_model):
+    store = make_store(["uvod u algoritme", "ispit iz predmeta cs-101", "algoritmi i strukture"])
+
+    res = store.hybrid_search("cs-101", top_k=1)
+    assert res[0][0].doc_id == "doc1"
+    batch = store.hybrid_search_batch(["cs-101", "algoritme"], top_k=1)
+    assert batch[0][0][0].doc_id == "doc1"
+
+    store.delete_document("doc1")
+    assert all(d.doc_id != "doc1" for d, _ in store.hybrid_search("cs-101", top_k=3))
+
+    # bm25.bin se čuva uz index.faiss i učitava nazad (mmap)
+    store.save(str(tmp_path))
+    assert (tmp_path / "bm25.bin").exists()
+    loaded = FaissStore.load(str(tmp_path), embedding_model=fake_embedding_model())
+    assert loaded.bm25.doc_lengths() == store.bm25.doc_lengths()
+    assert [c for c, _ in loaded.bm25.search("algoritme")] == [c for c, _ in store.bm25.search("algoritme")]
+
+
+def test_store_uses_numpy_embedding_path(fake_embedding_model):
+    """
+    FaissStore ne sme da ide preko listi float-ova kad model ima embed_texts_np.
+    """
+
+    class NumpyOnlyModel(fake_embedding_model):
+        def embed_texts_np(self, texts):
+            return np.stack([self._vec(t) for t in texts])
+
+        def embed_text(self, text):
+            raise AssertionError("embed_text ne treba da se zove")
+
+        def embed_documents(self, texts):
+            raise AssertionError("embed_documents ne treba da se zove")
+
+    store = FaissStore(embedding_model=NumpyOnlyModel())
+    store.add_chunks([IndexedDocument(doc_id="d", chunk_id=0, text="alpha beta", source="pdf")])
+
+    assert store.search("alpha beta", top_k=1)[0][0].doc_id == "d"
+    assert store.search_batch(["alpha"], top_k=1)[0][0][0].doc_id == "d"
+    assert store.hybrid_search("alpha", top_k=1)[0][0].doc_id == "d"
@@ -0,0 +1,58 @@
+# tests/test_http_client.py
+from pipeline.http_client import HttpTransport
+import pipeline.wikipedia_client as wiki
+
+
+def test_transport_reuses_one_session_per_host():
+    """
+    Isti host treba da dobije istu (keep-alive) sesiju, a različit host novu.
+    """
+    t = HttpTransport(pool_maxsize=8, max_retries=3)
+
+    s1 = t.session_for("https://en.wikipedia.org/w/api.php")
+    s2 = t.session_for("https://en.wikipedia.org/wiki/Python")
+    s3 = t.session_for("https://api.openalex.org/works")
+
+    assert s1 is s2
+    assert s1 is not s3
+
+    adapter = s1.get_adapter("https://en.wikipedia.org/")
+    assert adapter._pool_maxsize == 8
+    assert adapter.max_retries.total == 3
+    assert 429 in adapter.max_retries.status_forcelist
+    assert "gzip" in s1.headers["Accept-Encoding"]
+
+    t.close()
+
+
+def test_clients_use_injected_transport():
+    """
+    Klijent treba da koristi prosleđeni transport umesto globalnog requests.get.
+    """
+
+    class FakeResponse:
+        status_code = 200
+        url = "fake"
+        text = ""
+
+        def __init__(self, payload):
+            self._payload = payload
+
+        def json(self):
+            return self._payload
+
+    class FakeTransport:
+        def __init__(self):
+            self.urls = []
+
+        def get(self, url, *, params=None, headers=None, timeout=20):
+            self.urls.append(url)
+            if params.get("list") == "search":
+                return FakeResponse({"query": {"search": [{"title": "Python", "pageid": 1}]}})
+            return FakeResponse({"query": {"pages": {"1": {"title": "Python", "extract": "p" * 100}}}})
+
+    fake = FakeTransport()
+    docs = wiki.load_wikipedia_by_query("python", top_k=1, transport=fake)
+
+    assert len(docs) == 1
+    assert len(fake.urls) == 2
@@ -0,0 +1,48 @@
+# tests/test_metadata_store.py
+from pipeline.retriever.faiss import IndexedDocument
+from pipeline.retriever.metadata_store import MetadataStore
+
+
+def _doc(doc_id, i, text):
+    return IndexedDocument(doc_id=doc_id, chunk_id=i, text=text, source="pdf")
+
+
+def test_roundtrip_and_overlay_changes(tmp_path):
+    path = str(tmp_path / "metadata.bin")
+
+    store = MetadataStore()
+    store[0] = _doc("a.pdf", 0, "prvi chunk")
+    store[1] = _doc("a.pdf", 1, "drugi chunk — ćčžšđ")
+    store[5] = _doc("b.pdf", 0, "")
+    store.save(path)
+
+    loaded = MetadataStore.load(path)
+    assert len(loaded) == 3
+    assert loaded.get(1).text == "drugi chunk — ćčžšđ"
+    assert loaded.get(5).text == ""
+    assert loaded.get(2) is None
+    assert sorted(loaded.ids_for_doc("a.pdf")) == [0, 1]
+
+    # izmene preko mmap osnove
+    loaded.pop(0)
+    loaded[7] = _doc("c.pdf", 0, "novi")
+    assert 0 not in loaded
+    assert loaded.ids().tolist() == [1, 5, 7]
+    assert loaded.max_id() == 7
+
+    loaded.save(path)
+    again = MetadataStore.load(path)
+    assert [(cid, d.doc_id, d.text) for cid, d in again.items()] == [
+        (1, "a.pdf", "drugi chunk — ćčžšđ"),
+        (5, "b.pdf", ""),
+        (7, "c.pdf", "novi"),
+    ]
+
+
+def test_empty_store_roundtrip(tmp_path):
+    path = str(tmp_path / "metadata.bin")
+    MetadataStore().save(path)
+
+    loaded = MetadataStore.load(path)
+    assert len(loaded) == 0
+    assert loaded.max_id() == -1
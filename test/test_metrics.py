@@ -0,0 +1,83 @@
+# tests/test_metrics.py
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pipeline import metrics
+from pipeline.metrics import bind_context, incr, log_request, profile_request, span, trace_request
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    metrics.REGISTRY.reset()
+    yield
+    metrics.REGISTRY.reset()
+
+
+def test_span_and_counter_rendered_as_prometheus():
+    with span("faiss_search"):
+        pass
+    incr("http_bytes_fetched_total", 1024, host="en.wikipedia.org")
+    incr("http_bytes_fetched_total", 512, host="en.wikipedia.org")
+
+    text = metrics.REGISTRY.render_prometheus()
+
+    assert '# TYPE rag_stage_seconds histogram' in text
+    assert 'rag_stage_seconds_count{stage="faiss_search"} 1' in text
+    assert 'rag_stage_seconds_bucket{stage="faiss_search",le="+Inf"} 1' in text
+    assert 'rag_http_bytes_fetched_total{host="en.wikipedia.org"} 1536' in text
+
+
+def test_prometheus_label_values_are_escaped():
+    incr("cache_hits_total", namespace='a"b\\c\nd')
+
+    text = metrics.REGISTRY.render_prometheus()
+
+    assert 'rag_cache_hits_total{namespace="a\\"b\\\\c\\nd"} 1' in text
+    assert not any(line.startswith("d") for line in text.splitlines())   # newline ne prelama liniju
+
+
+def test_trace_follows_request_into_thread_pool():
+    def work():
+        with span("live_source", source="wikipedia"):
+            incr("live_docs_total", 3)
+
+    with trace_request() as trace:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(bind_context(work)).result()
+            pool.submit(work).result()   # bez bind_context nit ne vidi trace
+
+    data = trace.to_dict()
+    assert [s["stage"] for s in data["spans"]] == ["live_source"]
+    assert data["spans"][0]["source"] == "wikipedia"
+    assert data["counters"] == {"live_docs_total": 3}
+    assert metrics.current_trace() is None
+
+
+def test_log_request_appends_json_lines(tmp_path, monkeypatch):
+    path = tmp_path / "logs" / "requests.jsonl"
+    monkeypatch.setenv("METRICS_LOG_PATH", str(path))
+
+    log_request({"query": "Šta je rekurzija?", "timings": {"total": 0.5}})
+    log_request({"query": "q2", "timings": {}})
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])["query"] == "Šta je rekurzija?"
+
+
+def test_profile_request_writes_cprofile_dump(tmp_path, monkeypatch):
+    monkeypatch.setenv("RAG_PROFILE_DIR", str(tmp_path))
+
+    with profile_request("cprofile", name="run"):
+        sum(range(1000))
+    with profile_request(None):
+        pass
+
+    dumps = list(tmp_path.glob("run-*.prof"))
+    assert len(dumps) == 1
+
+    with pytest.raises(ValueError):
+        with profile_request("perf"):
+            pass
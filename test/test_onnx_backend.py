@@ -0,0 +1,83 @@
+# tests/test_onnx_backend.py
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from pipeline.embeddings.base import EmbeddingModel
+from pipeline.embeddings import onnx_backend as ob
+
+
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]",
+         "sta", "je", "rekurzija", "stek", "red", "graf", "algoritam", "binarna", "pretraga", "?", "."]
+
+
+class TorchMeanPooling(EmbeddingModel):
+    """
+    Referentni enkoder: isti HF model u PyTorch-u + mean pooling (kao sentence-transformers).
+    """
+
+    def __init__(self, model_dir):
+        self.tok = transformers.AutoTokenizer.from_pretrained(model_dir)
+        self.model = transformers.AutoModel.from_pretrained(model_dir).eval()
+
+    @property
+    def dimension(self):
+        return self.model.config.hidden_size
+
+    def embed_texts_np(self, texts):
+        enc = self.tok(texts, padding=True, return_tensors="pt")
+        with torch.no_grad():
+            hidden = self.model(**enc).last_hidden_state
+        mask = enc["attention_mask"].unsqueeze(-1).float()
+        return ((hidden * mask).sum(1) / mask.sum(1)).numpy().astype("float32")
+
+    def embed_text(self, text):
+        return self.embed_texts_np([text])[0].tolist()
+
+    def embed_documents(self, texts):
+        return self.embed_texts_np(texts).tolist()
+
+
+@pytest.fixture(scope="module")
+def tiny_model_dir(tmp_path_factory):
+    src = tmp_path_factory.mktemp("tiny_bert")
+    (src / "vocab.txt").write_text("\n".join(VOCAB), encoding="utf-8")
+    transformers.BertTokenizerFast(vocab_file=str(src / "vocab.txt")).save_pretrained(str(src))
+
+    torch.manual_seed(0)
+    config = transformers.BertConfig(
+        vocab_size=len(VOCAB), hidden_size=32, num_hidden_layers=2,
+        num_attention_heads=2, intermediate_size=64,
+    )
+    transformers.BertModel(config).save_pretrained(str(src))
+    return src
+
+
+def test_export_parity_and_benchmark(tiny_model_dir, tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_CACHE_ENABLED", "0")
+    out = str(tmp_path / "onnx")
+    paths = ob.export_onnx(str(tiny_model_dir), out, quantize=True)
+    assert set(paths) == {"fp32", "int8"}
+
+    reference = TorchMeanPooling(str(tiny_model_dir))
+    texts = ["sta je rekurzija ?", "binarna pretraga .", "stek red graf algoritam"]
+
+    fp32 = ob.OnnxEmbeddingModel(out, model_file=ob.FP32_FILE, num_threads=1)
+    assert fp32.cache is None
+    assert fp32.dimension == 32
+
+    report = ob.parity_check(reference, fp32, texts, threshold=0.999)
+    assert report["passed"], report
+
+    int8 = ob.OnnxEmbeddingModel(out, model_file=ob.INT8_FILE, num_threads=1)
+    assert ob.parity_check(reference, int8, texts, threshold=0.9)["passed"]
+
+    # padding u batch-u ne sme da menja vektor pojedinačnog teksta
+    single = fp32.embed_texts_np([texts[0]])[0]
+    assert np.allclose(fp32.embed_texts_np(texts)[0], single, atol=1e-5)
+
+    bench = ob.benchmark({"fp32": fp32, "int8": int8}, texts * 4, repeats=1, queries=3)
+    assert set(bench["int8"]) == {"texts_per_sec", "query_latency_ms"}
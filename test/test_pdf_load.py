@@ -0,0 +1,157 @@
+# tests/test_pdf_load.py
+import pipeline.pdf_load as pdf_load
+import pipeline.pdf_search as pdf_search
+
+
+class FakeStore:
+    def __init__(self):
+        self.saves = 0
+        self.manifest = {}
+        self.deleted = []
+
+    def is_unchanged(self, doc_id, content_hash):
+        return self.manifest.get(doc_id) == content_hash
+
+    def set_content_hash(self, doc_id, content_hash):
+        self.manifest[doc_id] = content_hash
+
+    def delete_document(self, doc_id):
+        self.deleted.append(doc_id)
+        return 0
+
+    def save(self, dir_path):
+        self.saves += 1
+
+
+class FakeRAG:
+    def __init__(self):
+        self.store = FakeStore()
+        self.batches = []
+        self.publishes = 0
+
+    def save_index(self):
+        self.publishes += 1
+
+    def ingest_many(self, items, save=True):
+        self.batches.append(list(items))
+        return len(items)
+
+
+def _fake_pdfs(tmp_path, names):
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir(exist_ok=True)
+    for n in names:
+        (pdf_dir / n).write_bytes(b"%PDF-fake")
+    return pdf_dir
+
+
+def test_ingest_batches_pages_and_resumes(monkeypatch, tmp_path):
+    """
+    Stranice se skupljaju u veće batch-eve, a ponovljen ingest preskače
+    fajlove zabeležene u checkpoint-u.
+    """
+    page = "tekst stranice " * 10
+    monkeypatch.setattr(
+        pdf_search, "extract_pdf_pages", lambda pdf: [(i, page) for i in range(1, 6)]
+    )
+
+    pdf_dir = _fake_pdfs(tmp_path, ["a.pdf", "b.pdf"])
+    index_dir = str(tmp_path / "index")
+
+    rag = FakeRAG()
+    pages = pdf_load.ingest_pdf_dir(rag, pdf_dir, index_dir, workers=1, batch_pages=4, checkpoint_every=5)
+
+    assert pages == 10
+    assert [len(b) for b in rag.batches] == [4, 1, 4, 1]
+    assert rag.store.saves >= 2
+    assert rag.batches[0][0][1] == {"source": "pdf", "doc_id": "a.pdf", "page": 1}
+
+    # drugi prolaz - sve je već u checkpoint-u
+    rag2 = FakeRAG()
+    assert pdf_load.ingest_pdf_dir(rag2, pdf_dir, index_dir, workers=1) == 0
+    assert rag2.batches == []
+
+    # novi fajl se ingestuje, stari ne
+    _fake_pdfs(tmp_path, ["c.pdf"])
+    rag3 = FakeRAG()
+    assert pdf_load.ingest_pdf_dir(rag3, pdf_dir, index_dir, workers=1) == 5
+
+
+def test_ingest_skips_unchanged_content_and_replaces_changed(monkeypatch, tmp_path):
+    """
+    Fajl kome se promenio samo mtime (isti sadržaj) se preskače,
+    a fajl sa novim sadržajem prvo briše stare chunkove.
+    """
+    content = {"a.pdf": "prvi sadrzaj " * 10, "b.pdf": "drugi sadrzaj " * 10}
+    monkeypatch.setattr(
+        pdf_search, "extract_pdf_pages", lambda pdf: [(1, content[pdf.name])]
+    )
+
+    pdf_dir = _fake_pdfs(tmp_path, ["a.pdf", "b.pdf"])
+    index_dir = str(tmp_path / "index")
+
+    rag = FakeRAG()
+    assert pdf_load.ingest_pdf_dir(rag, pdf_dir, index_dir, workers=1) == 2
+
+    # "touch" oba fajla (checkpoint više ne važi), ali menja se samo b.pdf
+    _fake_pdfs(tmp_path, ["a.pdf"])
+    (pdf_dir / "b.pdf").write_bytes(b"%PDF-changed")
+    content["b.pdf"] = "izmenjen sadrzaj " * 10
+
+    rag.batches.clear()
+    assert pdf_load.ingest_pdf_dir(rag, pdf_dir, index_dir, workers=1) == 1
+    assert rag.store.deleted[-1] == "b.pdf"
+    assert rag.batches[0][0][1]["doc_id"] == "b.pdf"
+
+
+def test_same_file_name_in_subfolders_gets_separate_doc_ids(monkeypatch, tmp_path):
+    """
+    doc_id je putanja relativna u odnosu na PDF_DIR, pa se isto ime fajla
+    u dva foldera ne briše i ne prepisuje u manifestu.
+    """
+    monkeypatch.setattr(
+        pdf_search, "extract_pdf_pages", lambda pdf: [(1, f"sadrzaj iz {pdf.parent.name} " * 10)]
+    )
+
+    pdf_dir = tmp_path / "pdfs"
+    for folder in ("os", "mreze"):
+        (pdf_dir / folder).mkdir(parents=True)
+        (pdf_dir / folder / "predavanje1.pdf").write_bytes(b"%PDF-fake")
+    index_dir = str(tmp_path / "index")
+
+    rag = FakeRAG()
+    assert pdf_load.ingest_pdf_dir(rag, pdf_dir, index_dir, workers=1) == 2
+
+    assert sorted(rag.store.manifest) == ["mreze/predavanje1.pdf", "os/predavanje1.pdf"]
+    assert sorted(b[1]["doc_id"] for batch in rag.batches for b in batch) == sorted(rag.store.manifest)
+    # svaki doc_id se briše samo jednom (pre svog ingest-a) - drugi fajl ne briše prvi
+    assert rag.store.deleted.count("os/predavanje1.pdf") == 1
+    assert rag.store.deleted.count("mreze/predavanje1.pdf") == 1
+
+    # ponovljen ingest bez checkpoint-a ne indeksira ništa ponovo
+    import os
+    os.remove(os.path.join(index_dir, pdf_load.CHECKPOINT_FILE))
+    rag.batches.clear()
+    assert pdf_load.ingest_pdf_dir(rag, pdf_dir, index_dir, workers=1) == 0
+
+
+def test_checkpoints_save_work_dir_and_publish_once(monkeypatch, tmp_path):
+    """
+    Checkpoint-i prepisuju radni folder; nova verzija indeksa se objavljuje jednom po ingest-u.
+    """
+    import os
+
+    monkeypatch.setattr(
+        pdf_search, "extract_pdf_pages", lambda pdf: [(i, "tekst stranice " * 10) for i in range(1, 4)]
+    )
+    pdf_dir = _fake_pdfs(tmp_path, [f"{n}.pdf" for n in "abcdef"])
+    index_dir = str(tmp_path / "index")
+
+    saved_to = []
+    rag = FakeRAG()
+    rag.store.save = saved_to.append
+    assert pdf_load.ingest_pdf_dir(rag, pdf_dir, index_dir, workers=1, checkpoint_every=3) == 18
+
+    assert rag.publishes == 1
+    assert len(saved_to) >= 5
+    assert set(saved_to) == {os.path.join(index_dir, pdf_load.WORK_DIR)}
@@ -70,3 +70,42 @@ def test_search_ranks_by_keyword_frequency(monkeypatch):
     assert len(results) == 2
     assert results[0].metadata["id"] == 1
     assert results[1].metadata["id"] == 2
+
+
+def test_load_pdfs_reuses_cached_text_until_file_changes(monkeypatch, tmp_path):
+    """
+    Nepromenjen PDF se ne parsira ponovo; promena fajla (veličina/mtime) invalidira keš.
+    """
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    pdf = pdf_dir / "a.pdf"
+    pdf.write_bytes(b"%PDF-fake")
+
+    calls = []
+
+    def fake_extract(path):
+        calls.append(Path(path).name)
+        return [(1, "prva stranica " * 10), (2, "kratko")]
+
+    monkeypatch.setattr(pdf_search, "extract_pdf_pages", fake_extract)
+
+    db = str(tmp_path / "pdf_text.sqlite")
+    cache = pdf_search.PdfTextCache(db)
+
+    docs = list(pdf_search.load_pdfs(pdf_dir, cache=cache, workers=1))
+    assert [d.metadata["page"] for d in docs] == [1]
+    assert calls == ["a.pdf"]
+
+    list(pdf_search.load_pdfs(pdf_dir, cache=cache, workers=1))
+    # novi proces - keš se čita iz SQLite fajla
+    fresh = pdf_search.PdfTextCache(db)
+    again = list(pdf_search.load_pdfs(pdf_dir, cache=fresh, workers=1))
+    assert calls == ["a.pdf"]
+    assert again[0].page_content == docs[0].page_content
+
+    pdf.write_bytes(b"%PDF-fake-izmenjen")
+    list(pdf_search.load_pdfs(pdf_dir, cache=fresh, workers=1))
+    assert calls == ["a.pdf", "a.pdf"]
+
+    cache.close()
+    fresh.close()
@@ -0,0 +1,71 @@
+# tests/test_query_rewriter.py
+from pipeline.cache import TTLCache
+from pipeline.query_rewriter import is_short_english_phrase, rewrite_query_for_search
+
+
+class FakeLLM:
+    model_name = "fake-model"
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        return self.answer
+
+
+def test_short_english_phrase_bypasses_llm():
+    llm = FakeLLM("should not be used")
+
+    assert rewrite_query_for_search(llm, "  quantum entanglement ") == "quantum entanglement"
+    assert llm.calls == 0
+
+
+def test_bypass_heuristic():
+    assert is_short_english_phrase("Redis use cases")
+    assert not is_short_english_phrase("Šta je rekurzija")
+    assert not is_short_english_phrase("What is recursion?")
+    assert not is_short_english_phrase("What are the main use cases of Redis in web applications")
+
+
+def test_bypass_heuristic_rejects_serbian_without_diacritics():
+    for q in ("Prvi svetski rat", "Objasni rekurziju", "Sta je rekurzija", "binarno stablo pretrage"):
+        assert not is_short_english_phrase(q), q
+
+    for q in ("quantum entanglement", "binary search tree", "TCP handshake", "how to use git"):
+        assert is_short_english_phrase(q), q
+
+
+def test_rewrite_is_memoized_per_question_and_model():
+    cache = TTLCache()
+    llm = FakeLLM("recursion (computer science)")
+
+    q = "Objasni mi šta je rekurzija u programiranju?"
+    first = rewrite_query_for_search(llm, q, cache=cache)
+    second = rewrite_query_for_search(llm, "objasni mi  šta je rekurzija u programiranju?", cache=cache)
+
+    assert first == second == "recursion (computer science)"
+    assert llm.calls == 1
+
+    other = FakeLLM("recursion")
+    other.model_name = "other-model"
+    rewrite_query_for_search(other, q, cache=cache)
+    assert other.calls == 1
+
+
+def test_rewrite_error_falls_back_to_question_and_is_not_cached():
+    from pipeline.llm.base import LLMGenerationError
+
+    class FailingLLM(FakeLLM):
+        def generate(self, prompt):
+            self.calls += 1
+            raise LLMGenerationError("Privremeno je dostignut limit cloud LLM servisa.")
+
+    cache = TTLCache()
+    llm = FailingLLM(None)
+    q = "Kada je počeo Prvi svetski rat?"
+
+    assert rewrite_query_for_search(llm, q, cache=cache) == q
+    assert rewrite_query_for_search(llm, q, cache=cache) == q
+    assert llm.calls == 2
@@ -0,0 +1,204 @@
+# tests/test_rag_pipeline.py
+import time
+
+from langchain_core.documents import Document
+
+import pipeline.rag_pipeline as rp
+from pipeline.retriever.faiss import IndexedDocument
+
+
+def test_run_overlaps_faiss_with_live_search(monkeypatch, make_pipeline):
+    """
+    FAISS pretraga i live pretraga traju po 0.3s; paralelno ukupno treba da bude ispod 0.6s.
+    """
+
+    def slow_search_everywhere(**kwargs):
+        time.sleep(0.3)
+        docs = {"wikipedia": [Document(page_content="wiki tekst " * 20, metadata={})]}
+        return docs, {"wikipedia": {"status": "ok", "elapsed": 0.3, "count": 1}}
+
+    monkeypatch.setattr(rp, "search_everywhere", slow_search_everywhere)
+
+    rag = make_pipeline()
+    start = time.perf_counter()
+    result = rag.run("recursion")
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.55
+    assert result["final_answer"] == "odgovor"
+    assert len(result["retrieved_chunks"]) == 1
+    assert {"rewrite", "live_search", "faiss", "chunking", "generate", "total"} <= set(result["timings"])
+
+
+def test_run_stream_yields_retrieval_then_tokens(monkeypatch, make_pipeline):
+    class StreamingLLM:
+        model_name = "fake"
+
+        def generate(self, prompt):
+            return "odgovor"
+
+        def stream(self, prompt):
+            yield "od"
+            yield "go"
+            yield "vor"
+
+    monkeypatch.setattr(
+        rp,
+        "search_everywhere",
+        lambda **kwargs: ({"wikipedia": []}, {"wikipedia": {"status": "ok", "elapsed": 0.0, "count": 0}}),
+    )
+
+    rag = make_pipeline()
+    rag.llm = StreamingLLM()
+    events = list(rag.run_stream("recursion"))
+
+    assert events[0]["type"] == "retrieval"
+    assert len(events[0]["retrieved_chunks"]) == 1
+    assert [e["text"] for e in events if e["type"] == "token"] == ["od", "go", "vor"]
+    assert events[-1]["type"] == "done"
+    assert events[-1]["final_answer"] == "odgovor"
+    assert "first_token" in events[-1]["timings"]
+
+
+def test_run_many_uses_batched_faiss_search(monkeypatch, make_pipeline):
+    class BatchStore:
+        def __init__(self):
+            self.batch_calls = 0
+
+        def search(self, query, top_k=5):
+            raise AssertionError("run_many treba da koristi search_batch")
+
+        def search_batch(self, queries, top_k=5):
+            self.batch_calls += 1
+            return [
+                [(IndexedDocument(doc_id=q, chunk_id=0, text=q, source="pdf"), 0.0)]
+                for q in queries
+            ]
+
+    monkeypatch.setattr(
+        rp,
+        "search_everywhere",
+        lambda **kwargs: ({}, {}),
+    )
+
+    rag = make_pipeline()
+    rag.store = BatchStore()
+    results = rag.run_many(["prvo pitanje", "drugo pitanje", "treće pitanje"], max_concurrency=2)
+
+    assert rag.store.batch_calls == 1
+    assert [r["retrieved_chunks"][0]["doc_id"] for r in results] == [
+        "prvo pitanje", "drugo pitanje", "treće pitanje"
+    ]
+    assert all(r["final_answer"] == "odgovor" for r in results)
+
+
+def test_reload_index_swaps_store_when_new_version_published(tmp_path, make_pipeline, make_store,
+                                                             fake_embedding_model):
+    root = str(tmp_path)
+    make_store(["alpha beta"]).publish(root)
+
+    rag = make_pipeline()
+    rag.index_dir = root
+    rag.embedding_model = fake_embedding_model()
+    rag.index_mmap = True
+    assert rag.reload_index_if_changed()
+    first = rag.store
+    assert not rag.reload_index_if_changed()
+
+    make_store(["alpha beta", "gamma delta"]).publish(root)
+    assert rag.reload_index_if_changed()
+    assert rag.store is not first
+    assert len(rag.store.metadata) == 2
+
+
+def test_select_context_reranks_live_and_faiss_candidates(make_pipeline, fake_reranker):
+    rag = make_pipeline()
+    rag.reranker = fake_reranker
+    rag.rerank_top_n = 2
+
+    live = ["istorija wikipedije", "rekurzija je poziv funkcije same sebe", "razno"]
+    faiss = ["primer rekurzije u pythonu", "rekurzija funkcije i stek poziva"]
+
+    timings = {}
+    ctx = rag.select_context("rekurzija funkcije", live, faiss, timings)
+
+    assert ctx == ["rekurzija je poziv funkcije same sebe", "rekurzija funkcije i stek poziva"]
+    assert "rerank" in timings
+
+
+def test_run_returns_semantic_cache_hit_without_live_search(monkeypatch, make_pipeline, fake_embedding_model):
+    from pipeline.semantic_cache import SemanticCache
+
+    calls = []
+
+    def fake_search_everywhere(**kwargs):
+        calls.append(kwargs["query"])
+        return {"wikipedia": []}, {"wikipedia": {"status": "ok", "elapsed": 0.0, "count": 0}}
+
+    monkeypatch.setattr(rp, "search_everywhere", fake_search_everywhere)
+
+    rag = make_pipeline()
+    rag.semantic_cache = SemanticCache(fake_embedding_model(dim=64), threshold=0.9)
+
+    first = rag.run("sta je rekurzija")
+    second = rag.run("rekurzija je sta")
+
+    assert len(calls) == 1
+    assert second["final_answer"] == first["final_answer"]
+    assert second["cache"]["matched_query"] == "sta je rekurzija"
+    assert "generate" not in second["timings"]
+
+
+def test_llm_error_is_shown_but_not_cached(monkeypatch, make_pipeline, fake_embedding_model):
+    from pipeline.llm.base import LLMGenerationError
+    from pipeline.semantic_cache import SemanticCache
+
+    class FailingLLM:
+        model_name = "fake"
+
+        def generate(self, prompt):
+            raise LLMGenerationError("Privremeno je dostignut limit cloud LLM servisa.")
+
+        def stream(self, prompt):
+            yield "od"
+            raise LLMGenerationError("Došlo je do greške pri generisanju odgovora.")
+
+    monkeypatch.setattr(
+        rp,
+        "search_everywhere",
+        lambda **kwargs: ({"wikipedia": []}, {"wikipedia": {"status": "ok", "elapsed": 0.0, "count": 0}}),
+    )
+
+    rag = make_pipeline()
+    rag.llm = FailingLLM()
+    rag.semantic_cache = SemanticCache(fake_embedding_model(dim=64), threshold=0.9)
+
+    result = rag.run("sta je rekurzija")
+    events = list(rag.run_stream("sta je rekurzija"))
+
+    assert result["final_answer"].startswith("Privremeno je dostignut limit")
+    assert result["error"] == "llm"
+    assert [e["text"] for e in events if e["type"] == "token"] == ["od", "Došlo je do greške pri generisanju odgovora."]
+    assert events[-1]["error"] == "llm"
+    assert rag.semantic_cache.lookup("sta je rekurzija") is None
+
+
+def test_hybrid_mode_keeps_l2_distance_and_adds_score(monkeypatch, make_pipeline, make_store):
+
+    monkeypatch.setattr(rp, "search_everywhere", lambda **kwargs: ({}, {}))
+
+    rag = make_pipeline()
+    rag.store = make_store(["uvod u algoritme", "ispit iz predmeta cs-101", "algoritmi i strukture"])
+    dense = {d.doc_id: dist for d, dist in rag.store.search("ispit cs-101", top_k=3)}
+
+    rag.retrieval_mode = "hybrid"
+    chunks = rag.run("ispit cs-101")["retrieved_chunks"]
+
+    assert chunks[0]["doc_id"] == "doc1"
+    for ch in chunks:
+        assert ch["distance"] == dense.get(ch["doc_id"])   # L2, ne fuzionisani skor
+        assert ch["score"] > 0
+    assert [c["score"] for c in chunks] == sorted((c["score"] for c in chunks), reverse=True)
+
+    rag.retrieval_mode = "dense"
+    assert all("score" not in ch for ch in rag.run("ispit cs-101")["retrieved_chunks"])
@@ -0,0 +1,51 @@
+# tests/test_rerank.py
+from pipeline.cache import TTLCache
+from pipeline.rerank.base import select_top
+
+
+def test_score_uses_cache_for_seen_pairs(fake_reranker):
+    reranker = fake_reranker
+    cache = TTLCache()
+
+    first = reranker.score("binarno stablo", ["binarno stablo pretrage", "hash tabela"], cache=cache)
+    assert first == [2.0, 0.0]
+
+    second = reranker.score("binarno stablo", ["hash tabela", "binarno drvo"], cache=cache)
+    assert second == [0.0, 1.0]
+    # "hash tabela" je već bio ocenjen za isti upit
+    assert reranker.scored == ["binarno stablo pretrage", "hash tabela", "binarno drvo"]
+
+
+def test_select_top_respects_top_n_and_token_budget():
+    texts = ["a" * 400, "b" * 40, "c" * 40, "d" * 40]
+    scores = [3.0, 2.0, 1.0, 0.5]
+
+    assert [t[0][0] for t in select_top(texts, scores, top_n=2)] == ["a", "b"]
+
+    # 400 znakova ~ 100 tokena; budžet 115 - posle "a" staje samo jedan kratak chunk
+    picked = select_top(texts, scores, top_n=4, token_budget=115)
+    assert [t[0][0] for t in picked] == ["a", "b"]
+
+    # prvi chunk se uzima čak i ako sam prelazi budžet
+    assert [t[0][0] for t in select_top(texts, scores, top_n=4, token_budget=10)] == ["a"]
+
+
+def test_local_reranker_loads_model_on_first_use(monkeypatch):
+    import pipeline.rerank.local as local
+
+    loaded = []
+
+    class FakeCrossEncoder:
+        def __init__(self, name, device=None, max_length=512):
+            loaded.append(name)
+
+        def predict(self, pairs, **kwargs):
+            return [float(len(t)) for _, t in pairs]
+
+    monkeypatch.setattr(local, "CrossEncoder", FakeCrossEncoder)
+
+    reranker = local.LocalCrossEncoderReranker("fake-ce")
+    assert loaded == []
+    assert reranker.score_pairs("q", ["ab", "abc"]) == [2.0, 3.0]
+    reranker.score_pairs("q", ["a"])
+    assert loaded == ["fake-ce"]
@@ -98,3 +98,68 @@ def test_search_everywhere_respects_limits(monkeypatch):
         "anything",
         limits={"openalex": 1, "pdf": 2},
     )
+
+
+def _patch_all_empty(monkeypatch):
+    monkeypatch.setattr(sea, "load_gcs_results", lambda query, top_k, timeout: [])
+    monkeypatch.setattr(sea, "load_wikipedia_by_query", lambda query, lang, top_k, timeout: [])
+    monkeypatch.setattr(sea, "load_stackoverflow_by_query", lambda query, top_k, timeout, top_answers: [])
+    monkeypatch.setattr(sea, "load_openalex_by_query", lambda query, top_k, timeout: [])
+
+
+def test_search_everywhere_runs_sources_concurrently(monkeypatch):
+    """
+    Izvori se pozivaju paralelno, pa ukupno trajanje treba da bude
+    približno trajanje najsporijeg izvora, a ne zbir.
+    """
+    import time
+
+    def slow(*args, **kwargs):
+        time.sleep(0.3)
+        return [Document(page_content="x", metadata={})]
+
+    monkeypatch.setattr(sea, "load_gcs_results", slow)
+    monkeypatch.setattr(sea, "load_wikipedia_by_query", slow)
+    monkeypatch.setattr(sea, "load_stackoverflow_by_query", slow)
+    monkeypatch.setattr(sea, "load_openalex_by_query", slow)
+
+    start = time.perf_counter()
+    results, status = sea.search_everywhere_api("q", return_status=True)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.9
+    assert all(len(docs) == 1 for docs in results.values())
+    assert all(st["status"] == "ok" for st in status.values())
+
+
+def test_search_everywhere_reports_timeout_and_error(monkeypatch):
+    """
+    Spor izvor posle roka vraća praznu listu sa statusom "timeout",
+    a izuzetak se prijavljuje kao "error" umesto da se tiho proguta.
+    """
+    import threading
+
+    release = threading.Event()
+    _patch_all_empty(monkeypatch)
+
+    def hanging_wiki(query, lang, top_k, timeout):
+        release.wait(5)
+        return [Document(page_content="late", metadata={})]
+
+    def broken_so(query, top_k, timeout, top_answers):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(sea, "load_wikipedia_by_query", hanging_wiki)
+    monkeypatch.setattr(sea, "load_stackoverflow_by_query", broken_so)
+
+    try:
+        results, status = sea.search_everywhere_api("q", deadline=0.2, return_status=True)
+    finally:
+        release.set()
+
+    assert results["wikipedia"] == []
+    assert status["wikipedia"]["status"] == "timeout"
+    assert results["stackoverflow"] == []
+    assert status["stackoverflow"]["status"] == "error"
+    assert "boom" in status["stackoverflow"]["error"]
+    assert status["openalex"]["status"] == "ok"
@@ -0,0 +1,37 @@
+# tests/test_semantic_cache.py
+import time
+
+from pipeline.semantic_cache import SemanticCache
+
+
+def test_lookup_hits_on_similar_query_and_misses_on_different(fake_embedding_model):
+    cache = SemanticCache(fake_embedding_model(dim=64), threshold=0.9)
+    cache.store("sta je rekurzija", {"final_answer": "rekurzija je ...", "retrieved_chunks": []})
+
+    hit = cache.lookup("rekurzija je sta")      # iste reči, drugi redosled
+    assert hit["final_answer"] == "rekurzija je ..."
+    assert hit["cache"]["matched_query"] == "sta je rekurzija"
+
+    assert cache.lookup("binarna pretraga niza") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_ttl_eviction_and_clear(fake_embedding_model):
+    cache = SemanticCache(fake_embedding_model(dim=64), ttl=0.05, max_entries=2)
+    cache.store("prvo pitanje", {"final_answer": "1"})
+    time.sleep(0.1)
+    assert cache.lookup("prvo pitanje") is None     # isteklo
+    assert cache.stats()["entries"] == 0
+
+    cache.ttl = 60
+    for q in ("alfa", "beta", "gama"):
+        cache.store(q, {"final_answer": q})
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+    assert cache.lookup("alfa") is None
+    assert cache.lookup("gama")["final_answer"] == "gama"
+
+    cache.clear()
+    assert cache.lookup("gama") is None
@@ -0,0 +1,220 @@
+# tests/test_service.py
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+from langchain_core.documents import Document
+
+import pipeline.rag_pipeline as rp
+from pipeline.service import ConcurrencyLimitedLLM, RAGService
+
+
+class SlowLLM:
+    model_name = "slow"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def _exit(self):
+        with self._lock:
+            self.active -= 1
+
+    def generate(self, prompt):
+        self._enter()
+        try:
+            time.sleep(self.delay)
+            return "odgovor"
+        finally:
+            self._exit()
+
+    def stream(self, prompt):
+        self._enter()
+        try:
+            for part in ("od", "go", "vor"):
+                time.sleep(self.delay / 3)
+                yield part
+        finally:
+            self._exit()
+
+
+def fake_search_everywhere(**kwargs):
+    docs = {"wikipedia": [Document(page_content="wiki tekst " * 20, metadata={"title": "Wiki"})]}
+    return docs, {"wikipedia": {"status": "ok", "elapsed": 0.0, "count": 1}}
+
+
+@pytest.fixture
+def make_service(monkeypatch, make_pipeline):
+
+    def _make(*, delay=0.0, **kwargs):
+        monkeypatch.setattr(rp, "search_everywhere", fake_search_everywhere)
+        rag = make_pipeline()
+        rag.llm = SlowLLM(delay)
+        return RAGService(rag, host="127.0.0.1", port=0, **kwargs)
+
+    return _make
+
+
+async def _with_service(service, fn):
+    await service.start()
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{service.port}", timeout=10) as client:
+            return await fn(client)
+    finally:
+        await service.stop()
+
+
+def test_query_and_stream_endpoints(make_service):
+    service = make_service()
+
+    async def scenario(client):
+        r = await client.post("/query", json={"question": "recursion"})
+        s = await client.post("/query/stream", json={"question": "recursion"})
+        bad = await client.post("/query", json={})
+        health = await client.get("/healthz")
+        return r, s, bad, health
+
+    r, s, bad, health = asyncio.run(_with_service(service, scenario))
+
+    assert r.status_code == 200
+    body = r.json()
+    assert body["final_answer"] == "odgovor"
+    assert body["live_results"]["wikipedia"][0]["metadata"]["title"] == "Wiki"
+    assert {"live_search", "faiss", "generate", "total"} <= set(body["timings"])
+
+    events = [json.loads(line) for line in s.text.splitlines()]
+    assert [e["type"] for e in events] == ["retrieval", "token", "token", "token", "done"]
+    assert events[-1]["final_answer"] == "odgovor"
+
+    assert bad.status_code == 400
+    assert health.json()["status"] == "ok"
+
+
+def test_llm_concurrency_is_limited(make_service):
+    service = make_service(delay=0.2, max_inflight=4, max_llm=1)
+
+    async def scenario(client):
+        return await asyncio.gather(*(client.post("/query", json={"question": "recursion"}) for _ in range(3)))
+
+    responses = asyncio.run(_with_service(service, scenario))
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert isinstance(service.rag.llm, ConcurrencyLimitedLLM)
+    assert service.rag.llm._inner.peak == 1
+
+
+def test_full_queue_returns_503(make_service):
+    service = make_service(delay=0.4, max_inflight=1, max_queue=0)
+
+    async def scenario(client):
+        first = asyncio.create_task(client.post("/query", json={"question": "recursion"}))
+        await asyncio.sleep(0.1)
+        second = await client.post("/query", json={"question": "recursion"})
+        return await first, second
+
+    first, second = asyncio.run(_with_service(service, scenario))
+
+    assert first.status_code == 200
+    assert second.status_code == 503
+    assert second.headers["Retry-After"] == "1"
+
+
+def test_stop_waits_for_inflight_requests(make_service):
+    service = make_service(delay=0.3, shutdown_timeout=5)
+
+    async def scenario():
+        await service.start()
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{service.port}", timeout=10) as client:
+            pending = asyncio.create_task(client.post("/query", json={"question": "recursion"}))
+            await asyncio.sleep(0.1)
+            await service.stop()
+            return await pending
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 200
+    assert service.draining
+
+
+def test_ingest_batches_under_write_lock(make_service):
+    service = make_service()
+    calls = []
+    service.rag.ingest_many = lambda items, save=False: calls.append(len(items)) or len(items)
+    service.rag.save_index = lambda: calls.append("save")
+    service.ingest_batch = 2
+
+    async def scenario(client):
+        ok = await client.post("/ingest", json={"items": [{"text": f"t{i}"} for i in range(5)]})
+        bad = await client.post("/ingest", json={"items": "x"})
+        return ok, bad
+
+    ok, bad = asyncio.run(_with_service(service, scenario))
+
+    assert ok.json() == {"changed": True, "saved": True, "chunks": 5}
+    assert calls == [2, 2, 1, "save"]
+    assert bad.status_code == 400
+
+
+def test_ingest_does_not_wait_for_slow_live_search(monkeypatch, make_service):
+    service = make_service()
+
+    def slow_search_everywhere(**kwargs):
+        time.sleep(0.6)
+        return fake_search_everywhere(**kwargs)
+
+    monkeypatch.setattr(rp, "search_everywhere", slow_search_everywhere)
+    service.rag.ingest_many = lambda items, save=False: len(items)
+    service.rag.save_index = lambda: None
+
+    async def scenario(client):
+        query = asyncio.create_task(client.post("/query", json={"question": "recursion"}))
+        await asyncio.sleep(0.2)   # FAISS je gotov, live pretraga još traje
+        start = time.perf_counter()
+        ingest = await client.post("/ingest", json={"items": [{"text": "novi tekst"}]})
+        elapsed = time.perf_counter() - start
+        return await query, ingest, elapsed
+
+    query, ingest, ingest_elapsed = asyncio.run(_with_service(service, scenario))
+
+    assert query.status_code == 200 and ingest.status_code == 200
+    assert ingest_elapsed < 0.3
+
+
+def test_ingest_requires_token_or_loopback(monkeypatch, make_service):
+    import pytest
+    from pipeline.service import HttpError
+
+    service = make_service(ingest_token="tajna")
+    service.rag.ingest_many = lambda items, save=False: len(items)
+    service.rag.save_index = lambda: None
+
+    async def scenario(client):
+        body = {"items": [{"text": "t"}]}
+        anonymous = await client.post("/ingest", json=body)
+        wrong = await client.post("/ingest", json=body, headers={"Authorization": "Bearer x"})
+        ok = await client.post("/ingest", json=body, headers={"Authorization": "Bearer tajna"})
+        return anonymous, wrong, ok
+
+    anonymous, wrong, ok = asyncio.run(_with_service(service, scenario))
+
+    assert anonymous.status_code == wrong.status_code == 401
+    assert ok.status_code == 200
+
+    monkeypatch.delenv("RAG_SERVICE_HOST", raising=False)
+    monkeypatch.delenv("RAG_SERVICE_INGEST_TOKEN", raising=False)
+    public = RAGService(make_service().rag, port=0)
+    assert public.host == "127.0.0.1"
+    public.host = "0.0.0.0"
+    with pytest.raises(HttpError) as exc:
+        public._check_ingest_auth({})
+    assert exc.value.status == 403
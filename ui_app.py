@@ -37,12 +37,15 @@ def main() -> None:
             st.warning("Unesite pitanje pre nego što pokrenete upit.")
             return
 
-        with st.spinner("Razmišljam..."):
-            result = rag.run(question)
+        events = rag.run_stream(question)
 
-        # Prikaz glavnog odgovora
+        # Retrieval (live izvori + FAISS) stiže pre prvog tokena odgovora
+        with st.spinner("Tražim izvore..."):
+            result = next(events)
+
+        # Prikaz glavnog odgovora, token po token
         st.subheader("🧠 Odgovor")
-        st.write(result.get("final_answer", ""))
+        st.write_stream(ev["text"] for ev in events if ev["type"] == "token")
 
         # Sekcija sa kontekstom / izvorima
         st.markdown("---")
@@ -69,12 +72,17 @@ def main() -> None:
                 st.write("_Nema rezultata iz FAISS indeksa (možda još nisi ingestovao dokumente?)._")
             else:
                 for ch in retrieved_chunks:
-                    st.markdown(
+                    # distance je L2 (manje je bolje, nema ga za samo-BM25 pogodak), score je hybrid skor (veće je bolje)
+                    dist = ch.get("distance")
+                    line = (
                         f"**Doc:** `{ch.get('doc_id')}` | "
                         f"Source: `{ch.get('source')}` | "
                         f"Chunk: `{ch.get('chunk_id')}` | "
-                        f"Dist: `{ch.get('distance', 0.0):.4f}`"
+                        f"Dist: `{f'{dist:.4f}' if dist is not None else '-'}`"
                     )
+                    if ch.get("score") is not None:
+                        line += f" | Score: `{ch['score']:.4f}`"
+                    st.markdown(line)
                     st.write(ch.get("text", ""))
                     st.markdown("---")
 